@@ -1,13 +1,163 @@
-from easul.step import *
-from easul.state import *
-from easul.decision import *
-from easul.plan import *
-from easul.source import *
-from easul.action import *
-from easul.visual import *
-from easul.visual.element import *
-from easul.visual.element.journey import *
-from easul.expression import *
-from easul.algorithm import *
-from easul.data import *
-from easul.process import *
\ No newline at end of file
+"""
+EASUL public namespace. Classes and functions are imported lazily from their modules when first accessed so that
+importing part of the package (e.g. easul.plan or easul.engine in a run-engine worker) does not pull in the visual
+and machine learning dependencies. Other names which were previously available through star imports of the
+submodules (see _STAR_MODULES) are still resolved, from the same modules, when first accessed.
+"""
+import importlib
+
+_LAZY_MODULES = {
+    "easul.action": [
+        "Action", "CompleteJourneyAction", "IgnoreMissingData", "IgnoreMissingTimebasedData",
+        "PassPreviousResultAction", "PreRunStateAction", "ResultStoreAction", "StopFlow"
+    ],
+    "easul.algorithm": [
+        "factor", "logic", "predictive", "result"
+    ],
+    "easul.algorithm.algorithm": [
+        "Algorithm", "StoredAlgorithm"
+    ],
+    "easul.algorithm.factor": [
+        "Factor", "FactorMatch"
+    ],
+    "easul.algorithm.logic": [
+        "Binary", "ExpressionAlgorithm", "ScoreAlgorithm", "SelectCaseAlgorithm"
+    ],
+    "easul.algorithm.predictive": [
+        "ClassifierAlgorithm", "PredictionContext", "PredictiveAlgorithm", "PredictiveTypes", "RegressionAlgorithm",
+        "get_prediction_context"
+    ],
+    "easul.algorithm.result": [
+        "CaseResult", "ClassifierResult", "DefaultResult", "Probability", "RegressionResult", "Result",
+        "ScoreResult"
+    ],
+    "easul.data": [
+        "CATEGORY_TYPE", "DFDataInput", "DataInput", "DataSchema", "DataValidator", "InputEncoder", "MultiDataInput",
+        "SingleDataInput", "check_and_encode_data", "combine_input_datasets", "create_input_dataset",
+        "create_input_datasets", "get_field_options_from_schema", "np_random_splitter", "one_hot_encoding", "to_boolean",
+        "to_float"
+    ],
+    "easul.decision": [
+        "BinaryDecision", "CompareInputAndResultDecision", "Decision", "PassThruDecision", "RankedDecision",
+        "SelectCaseDecision", "StepResultDecision", "get_result_value"
+    ],
+    "easul.error": [
+        "ConversionError", "InvalidStepData", "MissingValue", "StepDataError", "StepDataNotAvailable",
+        "ValidationError", "VisualDataMissing"
+    ],
+    "easul.expression": [
+        "BetweenExpression", "Case", "DecisionCase", "EmptyExpression", "Expression", "FieldExpression",
+        "MultiExpression", "NullExpression", "OperatorExpression", "OrExpression", "QueryCountExpression",
+        "RegexExpression"
+    ],
+    "easul.outcome": [
+        "EndOutcome", "InvalidDataOutcome", "MissingDataOutcome", "Outcome", "PauseOutcome", "ResultOutcome"
+    ],
+    "easul.plan._plan": [
+        "CollatedReplace", "CompiledPlan", "OverlayPlan", "Plan", "run_step_logic"
+    ],
+    "easul.process": [
+        "Age", "CombineDateTime", "ConvertRowsToDictionary", "ConvertToFloat", "ConvertToInt", "DefaultValues",
+        "ExcludeFields", "ExcludeRowsWithExpression", "ExtractRowsWithExpression", "FieldApply", "FormatDateTime",
+        "GetProperty", "HandleLtSign", "IfElseTest", "MapDataItems", "MapValues", "MultiRowProcess", "ParseDate",
+        "ParseDateTime", "ParseTime", "RecordApply", "ReformatDate", "RemoveNonNumeric", "RenameField", "SortList",
+        "calculate_age", "materialise_rows"
+    ],
+    "easul.run": [
+        "run_step_chain"
+    ],
+    "easul.source": [
+        "BrokerSource", "CollatedSource", "ConstantSource", "DataFrameSource", "DbSource", "Source", "StateSource",
+        "StaticSource", "StepResultSource", "TimebasedDbSource"
+    ],
+    "easul.state": [
+        "State"
+    ],
+    "easul.step": [
+        "ActionEvent", "ActionStep", "AlgorithmStep", "CheckEndStep", "EndStep", "NO_VISUAL_IN_STEP_MESSAGE",
+        "PauseStep", "PreStep", "StartStep", "Step", "StepStatuses", "VisualStep"
+    ],
+    "easul.util": [
+        "DeferredCatalog", "DeferredItem", "FrozenCatalog", "TimeIndex", "Utf8EncodedImage", "get_current_result",
+        "get_start_step", "is_successful_outcome", "single_field_data_to_np_values", "to_np_values"
+    ],
+    "easul.visual.draw.flowchart": [
+        "JourneyChartSettings", "MermaidCLIFlowChart", "SvgFlowChart"
+    ],
+    "easul.visual.draw.style": [
+        "suggest_text_color_from_fill"
+    ],
+    "easul.visual.element.element": [
+        "Container", "EITHER_SCOPE", "ERR_ATTRIBUTE", "ERR_CONTENT", "ERR_CONTEXT", "Element", "EncodedImageElement",
+        "FigureElement", "Html", "LIST_TYPES", "MODEL_SCOPE", "Prediction", "ROW_SCOPE", "TrafficLightSwatch",
+        "ValueElement"
+    ],
+    "easul.visual.element.journey": [
+        "JourneyMap"
+    ],
+    "easul.visual.render": [
+        "PlainRenderer", "from_html_template", "iter_html_template"
+    ],
+    "easul.visual.visual": [
+        "FileMetadata", "METADATA_BLOCK_ALIGNMENT", "METADATA_MAGIC", "METADATA_VERSION_KEY", "Metadata",
+        "MetadataFileReader", "StoredMetadataEntry", "Visual", "get_dataset_fingerprint", "get_value_digest"
+    ],
+}
+
+# modules which were star imported into the namespace (in order, so later modules take priority)
+_STAR_MODULES = [
+    "easul.step", "easul.state", "easul.decision", "easul.plan", "easul.source", "easul.action", "easul.visual",
+    "easul.visual.element", "easul.visual.element.journey", "easul.expression", "easul.algorithm.algorithm",
+    "easul.algorithm.predictive", "easul.algorithm.logic", "easul.data", "easul.process"
+]
+
+_LAZY_NAMES = {name: module_name for module_name, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = sorted(_LAZY_NAMES)
+
+def __getattr__(name):
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        value = _get_star_imported(__name__, globals(), name, _STAR_MODULES)
+    else:
+        value = getattr(importlib.import_module(module_name), name)
+
+    globals()[name] = value
+
+    return value
+
+def _get_star_imported(package_name, package_globals, name, module_names):
+    """
+    Get value of name as it would be provided by star imports of the modules (in order). Submodules of the package
+    are imported and returned directly so that 'from package import submodule' does not import the other modules.
+    Args:
+        package_name: name of package the name is being obtained for
+        package_globals: globals of the package (submodules are added when the modules are imported)
+        name:
+        module_names:
+
+    Returns:
+
+    Raises:
+        AttributeError: if none of the modules provide the name
+    """
+    import importlib.util
+
+    if not name.startswith("_"):
+        if importlib.util.find_spec(f"{package_name}.{name}") is not None:
+            return importlib.import_module(f"{package_name}.{name}")
+
+        for module_name in reversed(module_names):
+            module = importlib.import_module(module_name)
+            public_names = getattr(module, "__all__", None) or [n for n in vars(module) if not n.startswith("_")]
+
+            if name in public_names:
+                return getattr(module, name)
+
+        if name in package_globals:
+            return package_globals[name]
+
+    raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,4 +1,39 @@
-from .algorithm import *
-from .predictive import *
-from .logic import *
+import importlib
 
+_LAZY_MODULES = {
+    "easul.algorithm.algorithm": ["Algorithm", "StoredAlgorithm"],
+    "easul.algorithm.factor": ["Factor", "FactorMatch"],
+    "easul.algorithm.logic": ["Binary", "ExpressionAlgorithm", "ScoreAlgorithm", "SelectCaseAlgorithm"],
+    "easul.algorithm.predictive": [
+        "ClassifierAlgorithm", "PredictionContext", "PredictiveAlgorithm", "PredictiveTypes", "RegressionAlgorithm",
+        "get_prediction_context"
+    ],
+    "easul.algorithm.result": [
+        "CaseResult", "ClassifierResult", "Probability", "RegressionResult", "Result", "ScoreResult"
+    ],
+    "easul.data": ["DataInput", "create_input_dataset", "get_field_options_from_schema"],
+    "easul.expression": ["Case", "Expression"]
+}
+
+# modules which were star imported into the namespace (other names from them are resolved when first accessed)
+_STAR_MODULES = ["easul.algorithm.algorithm", "easul.algorithm.predictive", "easul.algorithm.logic"]
+
+_LAZY_NAMES = {name: module_name for module_name, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = sorted(_LAZY_NAMES)
+
+def __getattr__(name):
+    # algorithms are loaded when first used so that importing easul.algorithm.result (e.g. for decisions) does not
+    # import the data handling and machine learning modules
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        from easul import _get_star_imported
+        value = _get_star_imported(__name__, globals(), name, _STAR_MODULES)
+    else:
+        value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
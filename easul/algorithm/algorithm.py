@@ -1,5 +1,5 @@
 import os
-from typing import Any
+from typing import Any, List, Optional
 
 from easul import util
 from easul.algorithm.result import Result
@@ -7,7 +7,7 @@ from abc import abstractmethod
 import dill
 import hashlib
 from attrs import define, field
-from easul.data import create_input_dataset, DataInput
+from easul.data import create_input_dataset, create_input_datasets, DataInput
 import logging
 logging.basicConfig(level=logging.INFO)
 LOG = logging.getLogger(__name__)
@@ -54,9 +54,32 @@ class Algorithm:
         """
         pass
 
+    def batch_results(self, datasets:List[Any])->List[Result]:
+        """
+        Execute algorithm for multiple inputs (e.g. the same step for a cohort of journeys). Sub-classes which can
+        process the inputs together (e.g. with a single model prediction) override this.
+        Args:
+            datasets: list of input data
+
+        Returns: list of algorithm result objects (in the same order as the datasets)
+
+        """
+        return [self.single_result(dataset) for dataset in datasets]
+
     def create_input_dataset(self, data:Any)->DataInput:
         return create_input_dataset(data=data, schema=self.schema, encoder=self.encoder)
 
+    def create_input_datasets(self, data_rows:List[Any])->List[Optional[DataInput]]:
+        """
+        Create input datasets for multiple rows (e.g. the same step for a cohort of journeys).
+        Args:
+            data_rows: list of input data
+
+        Returns: list of input datasets (or None for rows which cannot be converted or are invalid)
+
+        """
+        return create_input_datasets(data_rows=data_rows, schema=self.schema, encoder=self.encoder)
+
     def save(self, filename:str):
         """
         Save algorithm
@@ -81,6 +81,15 @@ class RegressionAlgorithm(PredictiveAlgorithm):
 
         return RegressionResult(value=pns[0], data=dset)
 
+    def batch_results(self, datasets):
+        dsets = [ds.create_input_dataset(data, self.schema, allow_multiple=False, encoder=self.encoder) for data in datasets]
+        if not dsets:
+            return []
+
+        pns = self.model.predict(np.concatenate([dset.X for dset in dsets]))
+
+        return [RegressionResult(value=pn, data=dset) for pn, dset in zip(pns, dsets)]
+
 
 @define(kw_only=True, eq=False)
 class ClassifierAlgorithm(PredictiveAlgorithm):
@@ -90,14 +99,147 @@ class ClassifierAlgorithm(PredictiveAlgorithm):
     """
     def single_result(self, data, round_dp=2):
         dset = ds.create_input_dataset(data, self.schema, allow_multiple=False, encoder=self.encoder)
-        pns = self.model.predict(dset.X)
-        prob_rows = self.model.predict_proba(dset.X)
+
+        return self._create_results([dset], dset.X, round_dp)[0]
+
+    def batch_results(self, datasets, round_dp=2):
+        dsets = [ds.create_input_dataset(data, self.schema, allow_multiple=False, encoder=self.encoder) for data in datasets]
+        if not dsets:
+            return []
+
+        return self._create_results(dsets, np.concatenate([dset.X for dset in dsets]), round_dp)
+
+    def _create_results(self, dsets, X, round_dp):
+        pns = self.model.predict(X)
+        prob_rows = self.model.predict_proba(X)
         field_name = self.schema.y_names[0]
         option_list = get_field_options_from_schema(field_name, self.schema)
 
         if round_dp:
             prob_rows = np.round_(prob_rows, round_dp)
 
-        probs = [Probability(*args) for args in zip(prob_rows[0], option_list.values(), option_list.keys())]
+        results = []
+        for pn, prob_row, dset in zip(pns, prob_rows, dsets):
+            probs = [Probability(*args) for args in zip(prob_row, option_list.values(), option_list.keys())]
+            results.append(ClassifierResult(value=pn, label=option_list.get(pn), probabilities=probs, data=dset))
+
+        return results
+
+
+class PredictionContext:
+    """
+    Predictions from an algorithm's model for a whole dataset. Each prediction is made once (when first needed) and
+    shared between the elements which calculate metadata from it, so a visual costs one predict and one predict_proba.
+    """
+    def __init__(self, algorithm, dataset):
+        self.algorithm = algorithm
+        self.dataset = dataset
+        self._values = {}
+
+    def _get_value(self, name, value_fn):
+        if name not in self._values:
+            self._values[name] = value_fn()
+
+        return self._values[name]
+
+    def is_for(self, algorithm, dataset):
+        return self.algorithm is algorithm and self.dataset is dataset
+
+    @property
+    def X(self):
+        return self._get_value("X", lambda: self.dataset.X)
+
+    @property
+    def y_true(self):
+        return self._get_value("y_true", lambda: np.asarray(self.dataset.Y))
+
+    @property
+    def y_pred(self):
+        return self._get_value("y_pred", lambda: np.asarray(self.algorithm.model.predict(self.X)))
+
+    @property
+    def y_probs(self):
+        return self._get_value("y_probs", lambda: self.algorithm.model.predict_proba(self.X))
+
+    @property
+    def y_pos_probs(self):
+        return self.y_probs[:, 1]
+
+    @property
+    def confusion_counts(self):
+        """
+        Counts of the binary confusion matrix cells as a dictionary with 'tn', 'fp', 'fn' and 'tp' keys.
+        """
+        def _count_cells():
+            actual = self.y_true == 1
+            predicted = self.y_pred == 1
+
+            return {
+                "tn": int(np.count_nonzero(~actual & ~predicted)),
+                "fp": int(np.count_nonzero(~actual & predicted)),
+                "fn": int(np.count_nonzero(actual & ~predicted)),
+                "tp": int(np.count_nonzero(actual & predicted))
+            }
+
+        return self._get_value("confusion_counts", _count_cells)
+
+    @property
+    def accuracy(self):
+        return float(np.mean(self.y_true == self.y_pred))
+
+    @property
+    def score(self):
+        """
+        Score from the model - accuracy for classifiers, otherwise the model's own score (e.g. R2 for regressors).
+        """
+        if hasattr(self.algorithm.model, "classes_"):
+            return self.accuracy
+
+        return self.algorithm.model.score(self.X, self.y_true)
+
+    @property
+    def matthews_corrcoef(self):
+        counts = self.confusion_counts
+        tp, tn, fp, fn = counts["tp"], counts["tn"], counts["fp"], counts["fn"]
+        denominator = np.sqrt(float(tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
+
+        if denominator == 0:
+            return 0.0
+
+        return float((tp * tn - fp * fn) / denominator)
+
+    def ratio(self, numerator_cell, part_denom_cell):
+        """
+        Ratio of the 'numerator_cell' count to the sum of it with the 'part_denom_cell' count, or None if both are zero.
+        Args:
+            numerator_cell:
+            part_denom_cell:
+
+        Returns:
+
+        """
+        counts = self.confusion_counts
+        numer = counts[numerator_cell]
+        denom = numer + counts[part_denom_cell]
+
+        if denom == 0:
+            return None
+
+        return numer / denom
+
+
+def get_prediction_context(algorithm, dataset, prediction_context=None):
+    """
+    Return the supplied 'prediction_context' if it was created for the algorithm and dataset, otherwise create one.
+    Args:
+        algorithm:
+        dataset:
+        prediction_context:
+
+    Returns:
+
+    """
+    if prediction_context is not None and prediction_context.is_for(algorithm, dataset):
+        return prediction_context
 
-        return ClassifierResult(value=pns[0], label=option_list.get(pns[0]), probabilities=probs, data=dset)
+    return PredictionContext(algorithm, dataset)
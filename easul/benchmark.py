@@ -0,0 +1,459 @@
+"""
+Helper functions for benchmarking parts of EASUL (e.g. visual rendering) and a suite (run_benchmarks) which covers
+plan runs, engine replay, clients, codecs and visual rendering with machine-readable output for comparing commits.
+"""
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import logging
+LOG = logging.getLogger(__name__)
+
+def summarise_timings(timings):
+    """
+    Summarise list of timings (in seconds).
+    Args:
+        timings:
+
+    Returns:
+        dictionary containing count, mean, median, min and max
+    """
+    return {
+        "count": len(timings),
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "max": max(timings)
+    }
+
+def time_visual_render(visual, repeat=10, renderer=None, **render_kwargs):
+    """
+    Time rendering of a visual. Each repeat renders the complete visual as a stream of chunks with the time to the
+    first chunk recorded separately from the time for the whole render.
+    Args:
+        visual: Visual to render
+        repeat: number of times to render the visual
+        renderer: renderer to use (PlainRenderer if not supplied)
+        **render_kwargs: arguments supplied to Visual.iter_render (e.g. driver, steps, result)
+
+    Returns:
+        dictionary containing 'render' and 'first_chunk' timing summaries and the 'size' of the HTML output
+    """
+    from easul.visual.render import precompile_templates
+
+    precompile_templates()
+
+    render_timings = []
+    first_chunk_timings = []
+    size = 0
+
+    for idx in range(repeat):
+        start_time = time.perf_counter()
+        first_chunk_time = None
+        size = 0
+
+        for chunk in visual.iter_render(renderer=renderer, **render_kwargs):
+            if first_chunk_time is None:
+                first_chunk_time = time.perf_counter() - start_time
+
+            size += len(chunk)
+
+        render_timings.append(time.perf_counter() - start_time)
+        first_chunk_timings.append(first_chunk_time or 0)
+
+    LOG.info(f"Rendered visual {repeat} times (mean {statistics.mean(render_timings):.4f}s)")
+
+    return {
+        "render": summarise_timings(render_timings),
+        "first_chunk": summarise_timings(first_chunk_timings),
+        "size": size
+    }
+
+def time_import(*module_names):
+    """
+    Time importing modules in a fresh interpreter (so that nothing is already loaded).
+    Args:
+        *module_names: names of modules to import (e.g. 'easul.plan')
+
+    Returns:
+        dictionary containing the 'time' taken in seconds and the top-level packages which were 'loaded' as a result
+    """
+    code = "\n".join([
+        "import json, sys, time",
+        "existing = set(sys.modules)",
+        "start_time = time.perf_counter()",
+        *[f"import {module_name}" for module_name in module_names],
+        "duration = time.perf_counter() - start_time",
+        "loaded = sorted(set(name.split('.')[0] for name in set(sys.modules) - existing))",
+        "print(json.dumps({'time': duration, 'loaded': loaded}))"
+    ])
+
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _rate(count, duration):
+    return count / duration if duration > 0 else None
+
+@contextmanager
+def _log_level(level):
+    logger = logging.getLogger("easul")
+    previous_level = logger.level
+    logger.setLevel(level)
+
+    try:
+        yield
+    finally:
+        logger.setLevel(previous_level)
+
+def create_synthetic_cohort(size, stay_hours=4, seed=0, start_ts=dt.datetime(2023, 1, 1, 8, 0), reading_delay=None):
+    """
+    Create sources for a synthetic cohort of journeys which can be replayed with create_example_plan (or other plans
+    using 'catheter' and 'progression' sources) in a LocalEngine.
+    Args:
+        size: number of journeys
+        stay_hours: length of each admission
+        seed: random seed
+        start_ts: earliest admission timestamp
+        reading_delay: optional timedelta after admission at which the catheter and progression readings become
+            available (journeys wait at the steps until then), otherwise they are available throughout
+
+    Returns:
+        dictionary of 'admissions', 'catheter' and 'progression' sources
+    """
+    import random
+    import pandas as pd
+    from easul.source import DataFrameSource, StaticSource
+    from easul.tests.example import prog_input_data, no_prog_input_data
+
+    rng = random.Random(seed)
+    admissions = []
+    catheter = {}
+    progression = {}
+
+    for idx in range(size):
+        reference = f"S{idx}"
+        admission_ts = start_ts + dt.timedelta(minutes=rng.randrange(0, 60 * 24 * 30))
+        admissions.append({"admission_id": reference, "admission_ts": admission_ts,
+                           "discharge_ts": admission_ts + dt.timedelta(hours=stay_hours)})
+        catheter[reference] = {"systolic_bp": rng.randint(70, 110)}
+        progression[reference] = dict(rng.choice([prog_input_data, no_prog_input_data]))
+
+    admission_source = DataFrameSource(title="Admissions", reference_field="admission_id", data=pd.DataFrame(admissions))
+
+    if reading_delay is None:
+        return {
+            "admissions": admission_source,
+            "catheter": StaticSource(title="Catheter", source_data=catheter),
+            "progression": StaticSource(title="Progression", source_data=progression)
+        }
+
+    reading_ts = {admission["admission_id"]: (admission["admission_ts"] + reading_delay).strftime("%Y-%m-%d %H:%M:%S")
+                  for admission in admissions}
+
+    return {
+        "admissions": admission_source,
+        "catheter": _create_reading_source("Catheter", "catheter", catheter, reading_ts),
+        "progression": _create_reading_source("Progression", "progression", progression, reading_ts)
+    }
+
+def _create_reading_source(title, table_name, readings, reading_ts):
+    from easul.engine.db import SqliteDb
+    from easul.process import MultiRowProcess, ParseDateTime
+    from easul.source import TimebasedDbSource
+
+    rows = [{"admission_id": reference, "reading_ts": reading_ts[reference], **values}
+            for reference, values in readings.items()]
+
+    db = SqliteDb(":memory:")
+    db.create_table_from_values(table_name, rows[0])
+    db.insert_rows(table_name, rows)
+
+    return TimebasedDbSource(title=title, db=db, table_name=table_name, reference_field="admission_id",
+                             timestamp_field="reading_ts", multiple_rows=True, window=dt.timedelta(days=1),
+                             processes=[MultiRowProcess(processes=[ParseDateTime(field_name="reading_ts",
+                                                                                 format="%Y-%m-%d %H:%M:%S")])])
+
+def benchmark_single_journey(plan=None, repeat=20):
+    """
+    Time runs of single journeys through a plan (complex_plan_with_ml if not supplied) from admission to the end step.
+    Args:
+        plan: plan with 'catheter' and 'progression' sources
+        repeat: number of journeys
+
+    Returns:
+        timing summary
+    """
+    from easul.driver import MemoryDriver, LocalClock
+    from easul.tests.example import complex_plan_with_ml, prog_input_data
+
+    if plan is None:
+        plan = complex_plan_with_ml()
+
+    references = [f"L{idx}" for idx in range(repeat)]
+    plan.replace_source("catheter", {reference: {"systolic_bp": 95} for reference in references})
+    plan.replace_source("progression", {reference: prog_input_data for reference in references})
+
+    timings = []
+    for reference in references:
+        driver = MemoryDriver.from_reference(reference, autocreate=True, clock=LocalClock())
+
+        start_time = time.perf_counter()
+        plan.run(driver)
+        timings.append(time.perf_counter() - start_time)
+
+    return summarise_timings(timings)
+
+def benchmark_engine_replay(sizes=(1000, 10000, 100000), plan_factory=None, engine_cls=None, reading_delay=None,
+                            **engine_kwargs):
+    """
+    Time LocalEngine replay of synthetic cohorts (see create_synthetic_cohort) through a plan.
+    Args:
+        sizes: numbers of journeys in each cohort
+        plan_factory: function which creates the plan (create_example_plan if not supplied)
+        engine_cls: engine class (LocalEngine if not supplied, e.g. BatchedLocalEngine)
+        reading_delay: optional delay before the cohort's readings are available (see create_synthetic_cohort)
+        **engine_kwargs: additional arguments for LocalEngine (e.g. skip_idle_ticks)
+
+    Returns:
+        dictionary keyed by size containing the 'journeys', 'time' and 'journeys_per_second'
+    """
+    from easul.engine.local import LocalEngine
+    from easul.engine.memory import MemoryClient, MemoryBroker
+
+    if plan_factory is None:
+        from easul.examples import create_example_plan
+        plan_factory = create_example_plan
+
+    results = {}
+    for size in sizes:
+        engine = (engine_cls or LocalEngine)(sources=create_synthetic_cohort(size, reading_delay=reading_delay),
+                             reference_name="admissions",
+                             start_ts_field="admission_ts", end_ts_field="discharge_ts", client=MemoryClient(),
+                             broker=MemoryBroker(), **engine_kwargs)
+        plan = plan_factory()
+
+        start_time = time.perf_counter()
+        engine.run(plan)
+        duration = time.perf_counter() - start_time
+
+        LOG.info(f"Replayed {size} journeys in {duration:.2f}s")
+        results[str(size)] = {"journeys": size, "time": duration, "journeys_per_second": _rate(size, duration)}
+
+    return results
+
+def benchmark_batched_engine_replay(sizes=(1000, 10000, 100000), plan_factory=None, reading_delay=dt.timedelta(hours=2),
+                                    **engine_kwargs):
+    """
+    Compare replay of the same synthetic cohorts with LocalEngine and BatchedLocalEngine. By default the readings
+    arrive after admission so that the journeys wait at the algorithm steps and are run in batches.
+    Args:
+        sizes: numbers of journeys in each cohort
+        plan_factory: function which creates the plan (create_example_plan if not supplied)
+        reading_delay: delay before the cohort's readings are available (see create_synthetic_cohort)
+        **engine_kwargs: additional arguments for both engines
+
+    Returns:
+        dictionary keyed by size containing the 'journeys', 'serial_time', 'batched_time' and 'speedup'
+    """
+    from easul.engine.local import LocalEngine, BatchedLocalEngine
+
+    serial = benchmark_engine_replay(sizes=sizes, plan_factory=plan_factory, engine_cls=LocalEngine,
+                                     reading_delay=reading_delay, **engine_kwargs)
+    batched = benchmark_engine_replay(sizes=sizes, plan_factory=plan_factory, engine_cls=BatchedLocalEngine,
+                                      reading_delay=reading_delay, **engine_kwargs)
+
+    results = {}
+    for size, serial_result in serial.items():
+        batched_time = batched[size]["time"]
+        results[size] = {"journeys": serial_result["journeys"], "serial_time": serial_result["time"],
+                         "batched_time": batched_time, "speedup": _rate(serial_result["time"], batched_time)}
+
+    return results
+
+def benchmark_client_writes(count=1000, batch_size=1000):
+    """
+    Time writing journeys with a step and a state to the memory, SQLite and batched SQLite clients. The batched client
+    is flushed to the database within the timing.
+    Args:
+        count: number of journeys
+        batch_size: batch size for batched client
+
+    Returns:
+        dictionary keyed by client containing the 'journeys', 'time' and 'journeys_per_second'
+    """
+    from easul.engine.memory import MemoryClient
+    from easul.engine.sqlite import SqliteClient, BatchedSqliteClient
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        clients = {
+            "memory": MemoryClient,
+            "sqlite": lambda: SqliteClient(os.path.join(tempdir, "client.db")),
+            "batched_sqlite": lambda: BatchedSqliteClient(os.path.join(tempdir, "batched_client.db"), batch_size)
+        }
+
+        timestamp = dt.datetime(2023, 1, 1, 8, 0)
+
+        for name, client_factory in clients.items():
+            client = client_factory()
+
+            start_time = time.perf_counter()
+            for idx in range(count):
+                journey = client.create_journey(reference=f"W{idx}", source="benchmark")
+                client.set_current_step("admission", "COMPLETE", journey_id=journey["id"], timestamp=timestamp)
+                client.set_current_state("admission", "admitted", journey_id=journey["id"], timestamp=timestamp)
+
+            if isinstance(client, BatchedSqliteClient):
+                client.db._persist_batch()
+
+            duration = time.perf_counter() - start_time
+            results[name] = {"journeys": count, "time": duration, "journeys_per_second": _rate(count, duration)}
+
+    return results
+
+def _example_outcome():
+    from easul.tests.example import prog_input_data
+    import numpy as np
+
+    return {
+        "outcome_step": "progression_check", "next_step": "progression_low", "reason": "negative",
+        "result": {"value": np.int64(0), "label": "No progression", "data": prog_input_data, "probabilities": [
+            {"label": "No progression", "probability": np.float64(0.81), "value": 0},
+            {"label": "Progression", "probability": np.float64(0.19), "value": 1}
+        ]},
+        "input_data": prog_input_data, "timestamp": dt.datetime(2023, 1, 1, 8, 0)
+    }
+
+def benchmark_codecs(repeat=1000, data=None):
+    """
+    Time encoding and decoding of data (an example step outcome if not supplied) with the JSON and MsgPack codecs.
+    Args:
+        repeat: number of times to encode/decode
+        data:
+
+    Returns:
+        dictionary keyed by codec containing 'encode' and 'decode' rates and the encoded 'size'
+    """
+    from easul.engine.codec import JsonCodec, MsgPack
+
+    if data is None:
+        data = _example_outcome()
+
+    results = {}
+    for name, codec in {"json": JsonCodec, "msgpack": MsgPack}.items():
+        start_time = time.perf_counter()
+        for idx in range(repeat):
+            encoded = codec.encode(data)
+        encode_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for idx in range(repeat):
+            codec.decode(encoded)
+        decode_duration = time.perf_counter() - start_time
+
+        results[name] = {
+            "encode": {"time": encode_duration, "per_second": _rate(repeat, encode_duration)},
+            "decode": {"time": decode_duration, "per_second": _rate(repeat, decode_duration)},
+            "size": len(encoded)
+        }
+
+    return results
+
+def benchmark_visual_render(plan=None, step_name="overview", repeat=10, use_render_cache=False):
+    """
+    Time rendering of a step visual (the model overview in complex_plan_with_ml if not supplied).
+    Args:
+        plan:
+        step_name:
+        repeat:
+        use_render_cache: if False figures are drawn on every render
+
+    Returns:
+        timings from time_visual_render
+    """
+    from easul.driver import MemoryDriver
+    from easul.visual.cache import get_render_cache, set_render_cache, RenderCache
+    from easul.tests.example import complex_plan_with_ml
+
+    if plan is None:
+        plan = complex_plan_with_ml()
+
+    step = plan.steps[step_name]
+    driver = MemoryDriver.from_reference("BENCHMARK", autocreate=True)
+
+    previous_cache = get_render_cache()
+    set_render_cache(RenderCache() if use_render_cache else None)
+
+    try:
+        return time_visual_render(step.visual, repeat=repeat, driver=driver, steps=plan.steps, step=step)
+    finally:
+        set_render_cache(previous_cache)
+
+def _get_git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.stdout.strip()
+
+def run_benchmarks(sizes=(1000, 10000, 100000), repeat=20, count=1000, log_level=logging.ERROR):
+    """
+    Run the benchmark suite: single journey latency, engine replay throughput (serial and batched), client write
+    rates, codecs and visual rendering.
+    Args:
+        sizes: cohort sizes for engine replay
+        repeat: repeats for single journey, codec and render benchmarks
+        count: number of journeys written to each client
+        log_level: level for EASUL logging during the benchmarks (logging every tick otherwise dominates the timings)
+
+    Returns:
+        dictionary of results which can be output as JSON (see write_benchmarks)
+    """
+    with _log_level(log_level):
+        benchmarks = {
+            "single_journey": benchmark_single_journey(repeat=repeat),
+            "engine_replay": benchmark_engine_replay(sizes=sizes),
+            "batched_engine_replay": benchmark_batched_engine_replay(sizes=sizes),
+            "client_writes": benchmark_client_writes(count=count),
+            "codecs": benchmark_codecs(repeat=repeat * 50),
+            "visual_render": benchmark_visual_render(repeat=repeat)
+        }
+
+    return {
+        "commit": _get_git_commit(),
+        "timestamp": dt.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks
+    }
+
+def write_benchmarks(results, output=None):
+    """
+    Write benchmark results as JSON to 'output' file (or stdout if not supplied).
+    Args:
+        results:
+        output:
+
+    Returns:
+
+    """
+    content = json.dumps(results, indent=2)
+
+    if output is None:
+        print(content)
+        return
+
+    with open(output, "w") as outfile:
+        outfile.write(content)
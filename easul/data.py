@@ -229,13 +229,14 @@ class DataInput:
 
         return dt.datetime.strptime(value, config.get("format", "%Y-%m-%dT%H:%M:%S"))
 
-    def __init__(self, data, schema: DataSchema, convert:bool=True, validate:bool=True, encoded_with=None, encoder=None):
+    def __init__(self, data, schema: DataSchema, convert:bool=True, validate:bool=True, encoded_with=None, encoder=None, validator=None):
         if encoded_with is not None and encoded_with != encoder:
             raise AttributeError("Data input encoded with different encoder than the defined one")
 
         self.schema = schema
         self._convert = convert
         self._validate = validate
+        self._validator = validator
         self.encoded_with = encoded_with
         self.encoder = encoder
         self._data = None
@@ -326,7 +327,8 @@ class DataInput:
             if not field_name in data:
                 raise error.ValidationError(f"Field '{field_name}' is not present in the input data")
 
-        v = self.validator_cls(fields, allow_unknown=False)
+        # validator shared between datasets with the same schema (see create_input_datasets)
+        v = self._validator or self.validator_cls(fields, allow_unknown=False)
 
         if type(data) is list:
             for row in data:
@@ -383,6 +385,28 @@ class DataInput:
 
         return data
 
+    @property
+    def fingerprint(self):
+        """
+
+        Returns: Digest of the schema and data values. Used to tell whether values derived from the data
+        (e.g. visual metadata) are out of date.
+
+        """
+        import hashlib
+
+        hasher = hashlib.sha256()
+        hasher.update(repr(dict(self.schema)).encode("utf-8"))
+        hasher.update(repr(list(self.data.columns)).encode("utf-8"))
+
+        try:
+            hasher.update(pd.util.hash_pandas_object(self.data, index=True).values.tobytes())
+        except TypeError:
+            from easul.util import to_serialized
+            hasher.update(to_serialized(self.data))
+
+        return hasher.hexdigest()
+
     @property
     def X_data(self):
         """
@@ -570,10 +594,12 @@ class MultiDataInput(DataInput):
     This is used to handle multiple element predictions/interpretations from user supplied values.
     """
     def _init_data(self, data):
-        if isinstance(data, list):
-            data = pd.DataFrame(data=data, index=[0])
+        if isinstance(data, pd.DataFrame):
+            data = data.to_dict("records")
 
-        self._data = self._convert_data(data, self.schema.x)
+        rows = self._convert_data([dict(row) for row in data], self.schema.x)
+
+        self._data = pd.DataFrame(data=rows)
 
     @property
     def Y(self):
@@ -615,6 +641,52 @@ def check_and_encode_data(data, encoder):
     encoder.encode_dataset(data)
     return data
 
+def create_input_datasets(data_rows, schema, encoder=None):
+    """
+    Create a SingleDataInput for each row of input data which follows the same schema (e.g. the input for a step from
+    each journey in a cohort). Rows are converted and validated as they are by create_input_dataset, but a single
+    validator is shared between them.
+    Args:
+        data_rows: list of dictionaries
+        schema:
+        encoder:
+
+    Returns:
+        list containing a SingleDataInput for each row (or None if the row cannot be converted or is invalid)
+    """
+    from easul.process import materialise_rows
+
+    validator = SingleDataInput.validator_cls(schema.x, allow_unknown=False)
+    datasets = []
+
+    for data in data_rows:
+        try:
+            dataset = SingleDataInput(materialise_rows(data), schema, convert=True, validator=validator)
+            datasets.append(check_and_encode_data(dataset, encoder))
+        except (error.ConversionError, error.ValidationError):
+            datasets.append(None)
+
+    return datasets
+
+def combine_input_datasets(datasets):
+    """
+    Combine input datasets with the same schema (e.g. the input for a step from each journey in a cohort) into a
+    single DFDataInput. The rows have already been converted and validated so this is not repeated.
+    Args:
+        datasets: list of DataInput
+
+    Returns:
+
+    """
+    if not datasets:
+        raise AttributeError("At least one dataset is required")
+
+    first = datasets[0]
+    data = pd.concat([dataset.data for dataset in datasets], ignore_index=True)
+
+    return DFDataInput(data=data, schema=first.schema, convert=False, validate=False, encoded_with=first.encoded_with,
+                       encoder=first.encoder)
+
 def create_input_dataset(data, schema=None, allow_multiple=False, encoder=None):
     """
     Create input dataset according to input data. If it already a DataInput class. And if a dictionary then returns a
@@ -630,6 +702,9 @@ def create_input_dataset(data, schema=None, allow_multiple=False, encoder=None):
 
     """
     from easul import data as dat
+    from easul.process import materialise_rows
+
+    data = materialise_rows(data)
 
     if allow_multiple is False and (isinstance(data, dat.MultiDataInput) or isinstance(data, list)):
         raise AttributeError("data must represent a single row (e.g. a SingleInputDataSet or a dictionary)")
@@ -2,7 +2,7 @@ from abc import abstractmethod
 
 from attrs import define, field
 
-from easul.algorithm import Result
+from easul.algorithm.result import Result
 from easul.outcome import Outcome, ResultOutcome
 from easul.expression import DecisionCase
 
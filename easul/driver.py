@@ -1,4 +1,5 @@
 import logging
+from contextlib import contextmanager
 
 from easul.engine.memory import MemoryClient, MemoryBroker
 from easul.util import is_successful_outcome
@@ -26,12 +27,14 @@ class LocalClock(Clock):
     def __call__(self, engine):
         return LocalClock(engine)
 
-class HourlyClock(Clock):
+class IntervalClock(Clock):
     """
-    Clock which has defined start and end, and increments by an hour when advanced.
+    Clock which has defined start and end, and increments by a fixed 'interval' (a timedelta) when advanced.
+    The start is floored to the interval and moved back by one interval, and the end is ceiled to the interval and
+    moved forward by one interval.
     """
-    def __init__(self, start_ts, end_ts):
-        secs = 3600
+    def __init__(self, start_ts, end_ts, interval=dt.timedelta(hours=1)):
+        secs = interval.total_seconds()
         start_ts_unix = int((start_ts.timestamp() / secs) - 1) * secs
         start_ts = dt.datetime.fromtimestamp(start_ts_unix)
 
@@ -41,7 +44,15 @@ class HourlyClock(Clock):
         self.start_ts = start_ts
         self.end_ts = end_ts
         self.timestamp = self.start_ts
-        self.increment_by = dt.timedelta(seconds=secs)
+        self.increment_by = interval
+
+    @property
+    def tick_index(self):
+        return int((self.timestamp - self.start_ts) / self.increment_by)
+
+    @property
+    def tick_count(self):
+        return int((self.end_ts - self.start_ts) / self.increment_by) + 1
 
     def advance(self):
         self.timestamp+=self.increment_by
@@ -52,11 +63,86 @@ class HourlyClock(Clock):
 
         return False
 
+class HourlyClock(IntervalClock):
+    """
+    Clock which has defined start and end, and increments by an hour when advanced.
+    """
+    def __init__(self, start_ts, end_ts):
+        super().__init__(start_ts, end_ts, interval=dt.timedelta(hours=1))
+
+class EventClock(IntervalClock):
+    """
+    IntervalClock which skips ticks in which nothing can change for a journey. Event timestamps (e.g. when source
+    data becomes available) are aligned to the clock's ticks. When advanced without a pending step the clock
+    jumps straight to the next tick with an event (or past the end if there are none left).
+    """
+    def __init__(self, start_ts, end_ts, event_timestamps=None, interval=dt.timedelta(hours=1)):
+        super().__init__(start_ts, end_ts, interval=interval)
+        self._event_ticks = []
+
+        if event_timestamps:
+            self.add_events(event_timestamps)
+
+    def add_events(self, event_timestamps):
+        """
+        Add event timestamps to the clock's timeline.
+        Args:
+            event_timestamps:
+
+        Returns:
+
+        """
+        import pandas as pd
+
+        ticks = set(self._event_ticks)
+        for event_ts in event_timestamps:
+            if event_ts is None or pd.isnull(event_ts):
+                continue
+
+            ticks.add(self._tick_at_or_after(pd.Timestamp(event_ts).to_pydatetime()))
+
+        self._event_ticks = sorted(ticks)
+
+    def _tick_at_or_after(self, event_ts):
+        import math
+
+        if event_ts <= self.start_ts:
+            return self.start_ts
+
+        return self.start_ts + math.ceil((event_ts - self.start_ts) / self.increment_by) * self.increment_by
+
+    @property
+    def event_ticks(self):
+        return list(self._event_ticks)
+
+    def advance(self, pending=True):
+        """
+        Advance the clock. If there is a 'pending' step it moves on by a single tick, otherwise it jumps to the next
+        tick containing an event.
+        Args:
+            pending:
+
+        Returns:
+
+        """
+        if pending:
+            super().advance()
+            return
+
+        from bisect import bisect_right
+
+        idx = bisect_right(self._event_ticks, self.timestamp)
+        self.timestamp = self._event_ticks[idx] if idx < len(self._event_ticks) else self.end_ts + self.increment_by
+
 class Driver:
     """
     Provides a wrapper for methods from both the broker and the client to help 'drive' the
     journey. The clock provides temporal support and indicates timestamps used in persistence etc.
     """
+    source_overrides = None
+    batch_results = None
+    _snapshot_depth = 0
+
     def __init__(self, journey, client, broker, clock):
         self._client = client
         self._broker = broker
@@ -64,6 +150,10 @@ class Driver:
         self.journey = journey
         self.clock = clock
 
+    @property
+    def client(self):
+        return self._client
+
     @classmethod
     def from_reference(cls, reference, source, client, broker, label=None, clock=None):
         """
@@ -84,7 +174,7 @@ class Driver:
         if not journey:
             raise ValueError(f"No journey with reference '{reference}'")
 
-        return Driver(journey=journey, client=client, broker=broker, clock=clock)
+        return cls(journey=journey, client=client, broker=broker, clock=clock)
 
     @classmethod
     def from_journey(cls, journey, client, broker, clock=None):
@@ -102,7 +192,7 @@ class Driver:
         if type(journey) is not dict:
             journey = vars(journey)
 
-        return Driver(journey, client, broker, clock=clock)
+        return cls(journey, client, broker, clock=clock)
 
     def store_state(self, state_label, state, from_step, reason=None):
         """
@@ -241,10 +331,139 @@ class Driver:
 
         self._broker.send_message(channel_name, full_data)
 
+    def get_step_source(self, step):
+        """
+        Get the source used by a step in this run. This is the step's own source unless it has been overridden for the
+        run (e.g. by an OverlayPlan).
+        Args:
+            step:
+
+        Returns:
+
+        """
+        if self.source_overrides and step.name in self.source_overrides:
+            return self.source_overrides[step.name]
+
+        return step.source
+
+    @contextmanager
+    def override_sources(self, step_sources):
+        """
+        Context manager which overrides step sources (keyed by step name) for the duration of a run. Existing overrides
+        take priority so that nested overlays keep the outermost sources.
+        Args:
+            step_sources:
+
+        Returns:
+
+        """
+        previous = self.source_overrides
+        self.source_overrides = {**step_sources, **previous} if previous else step_sources
+
+        try:
+            yield self
+        finally:
+            self.source_overrides = previous
+
+    @contextmanager
+    def journey_snapshot(self):
+        """
+        Context manager which loads the client's runtime snapshot of the journey for the duration of a run and
+        persists it afterwards. Nested runs share the outermost snapshot.
+        Returns:
+
+        """
+        if self.journey_id is None:
+            yield self
+            return
+
+        if self._snapshot_depth == 0:
+            self._client.load_snapshot(self.journey_id)
+
+        self._snapshot_depth += 1
+
+        try:
+            yield self
+        finally:
+            self._snapshot_depth -= 1
+
+            if self._snapshot_depth == 0:
+                self._client.save_snapshot(self.journey_id)
+
+    def pop_batch_result(self, step_name):
+        """
+        Get (and remove) the input data, algorithm result and visual context prepared in advance for the step as part
+        of a batch (see easul.engine.local.BatchedLocalEngine), so the step does not retrieve or convert its data again.
+        Args:
+            step_name:
+
+        Returns:
+            tuple of source data, input dataset, result and context or None if there is no batch result
+        """
+        if not self.batch_results:
+            return None
+
+        return self.batch_results.pop(step_name, None)
+
+    def flush(self):
+        """
+        Write any pending changes to the client. Called at the end of each plan run. The base driver writes changes
+        immediately so there is nothing to do.
+        Returns:
+
+        """
+        pass
+
     def __repr__(self):
         return f"<Driver journey_id={self.journey_id}, client={self._client}, broker={self._broker}>"
 
 
+class CoalescingDriver(Driver):
+    """
+    Driver which coalesces the status changes of a step (e.g. INIT followed by COMPLETE) into a single client write.
+    The client updates a step with the same name and timestamp in place, so only the final status needs to be written
+    and the stored history is the same as with the base Driver. The pending step is written as soon as another step is
+    stored, before reads of steps/route from the client and at the end of the run. Outcomes are only converted to
+    dictionaries when written.
+    """
+    def __init__(self, journey, client, broker, clock):
+        super().__init__(journey, client, broker, clock)
+        self._pending_step = None
+        self.coalesced_writes = 0
+
+    def store_step(self, step_name, status, status_info=None, outcome=None, timestamp=None):
+        key = (step_name, timestamp)
+
+        if self._pending_step is not None:
+            if self._pending_step[0] == key:
+                self.coalesced_writes += 1
+            else:
+                self.flush()
+
+        self._pending_step = (key, status, status_info, outcome)
+
+    def flush(self):
+        if self._pending_step is None:
+            return
+
+        (step_name, timestamp), status, status_info, outcome = self._pending_step
+        self._pending_step = None
+
+        super().store_step(step_name, status, status_info=status_info, outcome=outcome, timestamp=timestamp)
+
+    def get_current_journey_step(self):
+        self.flush()
+        return super().get_current_journey_step()
+
+    def get_specific_step(self, step_name):
+        self.flush()
+        return super().get_specific_step(step_name)
+
+    def get_route(self):
+        self.flush()
+        return super().get_route()
+
+
 class MemoryDriver(Driver):
     """
     A Driver which handles everything as data structures in memory including client and broker data.
@@ -1,4 +1,5 @@
 import operator
+import re
 import sqlite3
 from typing import Any
 
@@ -11,14 +12,17 @@ from abc import abstractmethod
 
 class SqliteDb:
     """
-    SQliteDb wrapper which provides helper functions for creating tables and dealing with rows.
+    SQliteDb wrapper which provides helper functions for creating tables and dealing with rows. The connection can be
+    used from threads other than the one which created it (e.g. the DebouncedJourneyCallback worker) but access must
+    not be concurrent.
     """
     def __init__(self, db_file):
-        self.conn = sqlite3.connect(db_file, isolation_level="IMMEDIATE")
+        self.conn = sqlite3.connect(db_file, isolation_level="IMMEDIATE", check_same_thread=False)
         self.conn.row_factory = SqliteDb._dict_factory
         sqlite3.register_adapter(dt.time, SqliteDb._adapt_time)
         sqlite3.register_adapter(Timestamp, SqliteDb._adapt_timestamp)
         self.existing_tables = {}
+        self._column_types = {}
 
     @staticmethod
     def _adapt_time(t):
@@ -35,16 +39,49 @@ class SqliteDb:
             d[col[0]] = row[idx]
         return d
 
+    def get_column_types(self, table_name):
+        """
+        Declared types of the table's columns (upper case) keyed by column name.
+        Args:
+            table_name:
+
+        Returns:
+
+        """
+        if table_name not in self._column_types:
+            curs = self.create_cursor(f"PRAGMA table_info('{table_name}')")
+            self._column_types[table_name] = {row["name"]: (row["type"] or "").upper() for row in curs.fetchall()}
+            curs.close()
+
+        return self._column_types[table_name]
+
+    def to_stored_row(self, table_name, values):
+        """
+        Convert values written to the table into the row which would be read back (e.g. datetimes as strings and numbers
+        according to the column affinity) without querying the database. Columns without a value are None.
+        Args:
+            table_name:
+            values:
+
+        Returns:
+
+        """
+        return {name: _to_stored_value(values.get(name), column_type)
+                for name, column_type in self.get_column_types(table_name).items()}
+
     def does_table_exist(self, table_name):
         if table_name not in self.existing_tables:
             self.existing_tables[table_name] = self.has_row("sqlite_master", {"type": "table", "name": table_name})
 
         return self.existing_tables[table_name]
 
-    def create_table_from_values(self, table_name, values, has_id_field=False, indexes=None):
+    def create_table_from_values(self, table_name, values, has_id_field=False, indexes=None, unique_indexes=None):
         if not indexes:
             indexes = {}
 
+        if not unique_indexes:
+            unique_indexes = {}
+
         create_fields = []
 
         if has_id_field:
@@ -73,6 +110,9 @@ class SqliteDb:
         for idx_name, idx_fields in indexes.items():
             self.conn.execute(f"CREATE INDEX {idx_name} ON '{table_name}' ({idx_fields})")
 
+        for idx_name, idx_fields in unique_indexes.items():
+            self.conn.execute(f"CREATE UNIQUE INDEX {idx_name} ON '{table_name}' ({idx_fields})")
+
         self.existing_tables[table_name] = True
 
     def has_row(self, table_name, values):
@@ -131,6 +171,29 @@ class SqliteDb:
         curs.close()
         return rows
 
+    def get_columns_with_sql(self, sql, values):
+        """
+        Run query and return the results as columns (dictionary of column name to list of values) without creating a
+        dictionary for each row.
+        Args:
+            sql:
+            values:
+
+        Returns:
+
+        """
+        curs = self.conn.cursor()
+        curs.row_factory = None
+        curs.execute(sql, values if values else {})
+
+        names = [description[0] for description in curs.description]
+        rows = curs.fetchall()
+        curs.close()
+
+        columns = zip(*rows) if rows else [[] for name in names]
+
+        return {name: list(values) for name, values in zip(names, columns)}
+
     def get_rows(self, table_name, values=None, order_by=None):
         curs = self._select_cursor(table_name, values, order_by=order_by)
         rows = curs.fetchall()
@@ -172,6 +235,24 @@ class SqliteDb:
 
         return values
 
+    def replace_row(self, table_name, values):
+        """
+        Insert row or replace the existing row which has the same values in a unique index.
+        Args:
+            table_name:
+            values:
+
+        Returns:
+
+        """
+        sql = self._get_insert_sql(table_name, list(values.keys())).replace("INSERT INTO", "INSERT OR REPLACE INTO", 1)
+
+        curs = self.create_cursor(sql, values)
+        curs.close()
+        self.conn.commit()
+
+        return values
+
     def update_row(self, table_name, old_values, new_values):
         if "id" in old_values:
             old_values = {"id": old_values['id']}
@@ -215,6 +296,57 @@ class SqliteDb:
         return " AND ".join(clauses), params
 
 
+_NUMERIC_TEXT = re.compile(r"^\s*[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*$")
+
+
+def _get_affinity(column_type):
+    # SQLite column affinity rules (https://www.sqlite.org/datatype3.html)
+    if "INT" in column_type:
+        return "INTEGER"
+
+    if "CHAR" in column_type or "CLOB" in column_type or "TEXT" in column_type:
+        return "TEXT"
+
+    if "BLOB" in column_type or not column_type:
+        return "BLOB"
+
+    if "REAL" in column_type or "FLOA" in column_type or "DOUB" in column_type:
+        return "REAL"
+
+    return "NUMERIC"
+
+
+def _to_stored_value(value, column_type):
+    if value is None:
+        return None
+
+    adapter = sqlite3.adapters.get((type(value), sqlite3.PrepareProtocol))
+    if adapter:
+        value = adapter(value)
+
+    if isinstance(value, bool):
+        value = int(value)
+
+    affinity = _get_affinity(column_type)
+
+    if affinity == "TEXT":
+        return str(value) if isinstance(value, (int, float)) else value
+
+    if affinity == "BLOB":
+        return value
+
+    if isinstance(value, str) and _NUMERIC_TEXT.match(value):
+        value = float(value) if any(char in value for char in ".eE") else int(value)
+
+    if affinity == "REAL" and isinstance(value, int):
+        return float(value)
+
+    if affinity in ("INTEGER", "NUMERIC") and isinstance(value, float) and value.is_integer():
+        return int(value)
+
+    return value
+
+
 class BatchedSqliteDb:
     """
     Decorator for SQLiteDb with support for batching of rows. Data is stored in data structures until it reaches a certain number of
@@ -260,6 +392,13 @@ class BatchedSqliteDb:
     def has_row(self, table_name:str, values:Any):
         return True if len(self._filter_data(table_name, values))>0 else False
 
+    def get_rows_with_sql(self, sql, values):
+        # queries can only see rows which have been persisted to the database
+        return self._db.get_rows_with_sql(sql, values)
+
+    def get_columns_with_sql(self, sql, values):
+        return self._db.get_columns_with_sql(sql, values)
+
     def get_row(self, table_name, values):
         rows = self.get_rows(table_name, values)
         if len(rows)==0:
@@ -303,6 +442,10 @@ class BatchedSqliteDb:
 
         return values
 
+    def to_stored_row(self, table_name, values):
+        # rows are kept as they were written until they are persisted
+        return values
+
     def update_row(self, table_name, old_values, new_values):
         if "id" in old_values:
             old_values = {"id": old_values['id']}
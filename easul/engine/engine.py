@@ -62,6 +62,106 @@ class Client:
     @abstractmethod
     def complete_journey(self, journey_id=None, reference=None):
         pass
+
+    @abstractmethod
+    def get_outcome_columns(self, kind):
+        """
+        Get step or state outcomes for all journeys as columns.
+        Args:
+            kind: 'step' or 'state'
+
+        Returns:
+            dictionary of column name to list of values (see OUTCOME_COLUMNS)
+        """
+        pass
+
+    def load_snapshot(self, journey_id):
+        """
+        Load the runtime snapshot (see easul.engine.snapshot.JourneySnapshot) for a journey so that the current step,
+        step results and current states are read from it rather than the step/state history. Clients which do not
+        support snapshots do nothing.
+        Args:
+            journey_id:
+
+        Returns:
+
+        """
+        pass
+
+    def save_snapshot(self, journey_id):
+        """
+        Persist the runtime snapshot for a journey (if it has changed) and release it.
+        Args:
+            journey_id:
+
+        Returns:
+
+        """
+        pass
+
+    def get_outcome_table(self, kind="step"):
+        """
+        Get step or state outcomes for all journeys as a pandas DataFrame (in the order they were stored) with
+        timestamps converted to datetimes.
+        Args:
+            kind: 'step' or 'state'
+
+        Returns:
+
+        """
+        import pandas as pd
+
+        if kind not in OUTCOME_COLUMNS:
+            raise ValueError(f"Outcome kind must be one of {list(OUTCOME_COLUMNS.keys())} not '{kind}'")
+
+        table = pd.DataFrame(self.get_outcome_columns(kind), columns=OUTCOME_COLUMNS[kind])
+        table["timestamp"] = pd.to_datetime(table["timestamp"])
+
+        return table
+
+    def step_status_summary(self, latest_only=True):
+        """
+        Distribution of step statuses.
+        Args:
+            latest_only: only include the latest status of each step in each journey
+
+        Returns:
+            DataFrame with a row for each step name, a column for each status and the number of steps as values
+        """
+        import pandas as pd
+
+        steps = self.get_outcome_table("step")
+        if latest_only:
+            steps = steps.drop_duplicates(subset=["journey", "name"], keep="last")
+
+        return pd.crosstab(steps["name"], steps["status"])
+
+    def time_to_state(self, state_label, state):
+        """
+        Time taken for each journey to first reach a state (from the first state stored for the journey). Journeys
+        which do not reach the state have a missing (NaT) time.
+        Args:
+            state_label:
+            state:
+
+        Returns:
+            DataFrame indexed by journey reference with 'start', 'reached' and 'time_to_state' columns
+        """
+        states = self.get_outcome_table("state")
+        start = states.groupby("reference")["timestamp"].min().rename("start")
+
+        matched = states[(states["label"] == state_label) & (states["state"] == state)]
+        reached = matched.groupby("reference")["timestamp"].min().rename("reached")
+
+        summary = start.to_frame().join(reached)
+        summary["time_to_state"] = summary["reached"] - summary["start"]
+
+        return summary
+
+OUTCOME_COLUMNS = {
+    "step": ["reference", "journey", "name", "status", "value", "next_step", "timestamp"],
+    "state": ["reference", "journey", "label", "state", "timestamp"]
+}
 #
 # @dataclass
 # class BrokerData:
@@ -109,6 +209,7 @@ class Engine:
     """
     broker = None
     client = None
+    driver_cls = None
 
     @classmethod
     def run(cls, plan):
@@ -124,7 +225,9 @@ class Engine:
     def new_driver(cls, reference, source=None):
         from easul.driver import Driver
 
-        return Driver.from_reference(reference=reference, source=source, client=cls.client,
+        driver_cls = cls.driver_cls or Driver
+
+        return driver_cls.from_reference(reference=reference, source=source, client=cls.client,
                               broker=cls.broker, clock=cls.clock)
 
 
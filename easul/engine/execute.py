@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 from abc import abstractmethod
 from datetime import datetime as dt, timedelta as td
 
@@ -7,6 +9,7 @@ from easul.util import create_package_class
 import logging
 from easul.error import StepDataNotAvailable
 from easul.driver import Driver
+from easul.metrics import count_collapsed_messages
 logging.basicConfig(level=logging.INFO)
 
 LOG = logging.getLogger(__name__)
@@ -50,3 +53,123 @@ class JourneyCallback:
     def handle_data_not_available(self, ex):
         LOG.warning(f"[{ex.journey.get('reference')}:{ex.step_name}] Data not available" + (
             f" REATTEMPT ({ ex.delay }s delay)" if ex.retry else ""))
+
+
+class DebouncedJourneyCallback(JourneyCallback):
+    """
+    JourneyCallback which debounces bursts of messages. The first message for a reference (and start step) schedules a
+    plan run after 'window' seconds and further messages received before it runs are collapsed into it, so a burst
+    produces a single run which uses the latest data. Runs are executed one at a time by a single worker thread, so the
+    plan and client are never used concurrently; messages received during a run schedule another one. Collapsed
+    messages are counted in the metrics.
+    """
+    def __init__(self, plan, engine, window=0.5):
+        super().__init__(plan, engine)
+        self.window = window
+        self.collapsed_messages = 0
+        self._pending = {}
+        self._running = False
+        self._worker = None
+        self._condition = threading.Condition()
+
+    def __call__(self, params, broker):
+        key = (params.get("reference"), self._get_start_step(params))
+
+        with self._condition:
+            pending = self._pending.get(key)
+
+            if pending is not None:
+                pending["params"] = params
+                pending["broker"] = broker
+                pending["collapsed"] += 1
+                self.collapsed_messages += 1
+                count_collapsed_messages(self.plan.title)
+                return
+
+            self._pending[key] = {"params": params, "broker": broker, "collapsed": 0,
+                                  "due": time.monotonic() + self.window}
+            self._start_worker()
+            self._condition.notify_all()
+
+    def _get_start_step(self, params):
+        data_type = params.get("data_type")
+        return data_type if data_type in self.plan.config.get("watch_messages", []) else None
+
+    def _start_worker(self):
+        if self._worker is not None:
+            return
+
+        self._worker = threading.Thread(target=self._work, name="easul-debounced-callback", daemon=True)
+        self._worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                key, pending = self._next_due()
+                if key is None:
+                    return
+
+                self._running = True
+
+            try:
+                self._run_pending(key, pending)
+            finally:
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
+
+    def _next_due(self):
+        # waits (holding the condition) until a pending run is due, returns (None, None) once the worker is replaced
+        # or stopped
+        while self._worker is threading.current_thread():
+            if not self._pending:
+                self._condition.wait()
+                continue
+
+            key = min(self._pending, key=lambda pending_key: self._pending[pending_key]["due"])
+            delay = self._pending[key]["due"] - time.monotonic()
+
+            if delay <= 0:
+                return key, self._pending.pop(key)
+
+            self._condition.wait(delay)
+
+        return None, None
+
+    def _run_pending(self, key, pending):
+        if pending["collapsed"]:
+            LOG.info(f"[{key[0]}] {pending['collapsed']} message(s) collapsed into plan run")
+
+        try:
+            super().__call__(pending["params"], pending["broker"])
+        except Exception:
+            LOG.exception(f"[{key[0]}] Plan run failed")
+
+    def flush(self):
+        """
+        Make pending runs due immediately and wait until the worker has run them (e.g. when shutting down).
+        Returns:
+
+        """
+        with self._condition:
+            for pending in self._pending.values():
+                pending["due"] = 0
+
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: self._worker is None or (not self._pending and not self._running))
+
+    def close(self):
+        """
+        Run pending runs and stop the worker thread.
+        Returns:
+
+        """
+        self.flush()
+
+        with self._condition:
+            worker = self._worker
+            self._worker = None
+            self._condition.notify_all()
+
+        if worker is not None:
+            worker.join()
@@ -1,7 +1,7 @@
 from easul import DataFrameSource
 from easul.engine import Engine
 from easul.engine.memory import MemoryBroker, MemoryClient
-from easul.driver import HourlyClock
+from easul.driver import HourlyClock, EventClock, IntervalClock
 
 from datetime import timedelta as td
 import logging
@@ -9,60 +9,137 @@ LOG = logging.getLogger(__name__)
 
 class LocalEngine(Engine):
     """
-    Local engine which will run a specific
+    Local engine which will run a specific plan over the journeys in the reference source. Each journey is replayed
+    hour by hour between its start and end timestamps. If 'skip_idle_ticks' is set, an EventClock is used and hours
+    without new source data or a pending step are skipped (the route, states and outcomes are the same as the hourly
+    replay but repeated re-checks of waiting steps are not run). The 'interval' (a timedelta) changes the clock
+    resolution from the default of an hour. For each journey, sources precompute the rows available at each tick.
+    The 'driver_cls' changes the driver used for each journey (e.g. CoalescingDriver to reduce client writes).
     """
     broker = MemoryBroker()
     client = MemoryClient()
 
-    def __init__(self, sources, reference_name, start_ts_field, end_ts_field, timespan=None):
+    def __init__(self, sources, reference_name, start_ts_field, end_ts_field, timespan=None, skip_idle_ticks=False, client=None, broker=None, interval=None, driver_cls=None):
         self.sources = sources
         self.reference_data = sources[reference_name]
         self.reference_field = sources[reference_name].reference_field
         self.start_ts_field = start_ts_field
         self.end_ts_field = end_ts_field
+        self.skip_idle_ticks = skip_idle_ticks
+        self.interval = interval
+        self.driver_cls = driver_cls
+        self._ticks_per_day = int(td(days=1) / (interval or td(hours=1))) or 1
+
+        if client:
+            self.client = client
+
+        if broker:
+            self.broker = broker
 
     def new_clock(self, start_ts, end_ts, **kwargs):
+        if self.skip_idle_ticks:
+            return EventClock(start_ts=start_ts, end_ts=end_ts, interval=self.interval or td(hours=1))
+
+        if self.interval:
+            return IntervalClock(start_ts=start_ts, end_ts=end_ts, interval=self.interval)
+
         return HourlyClock(start_ts=start_ts, end_ts=end_ts)
 
     def run(self, plan):
         from easul.util import copy_plan_with_new_sources
         plan_copy = copy_plan_with_new_sources(plan, self.sources)
 
+        timeline_sources = self._get_timeline_sources(plan_copy)
+
+        for idx, adm in enumerate(self.reference_data):
+            driver = self._start_journey(adm, timeline_sources)
+
+            while self._run_tick(plan_copy, driver):
+                pass
+
+            self._end_journey(driver)
+
+        LOG.info(f"{idx+1} journeys complete")
+
+    def _start_journey(self, adm, timeline_sources):
         reference_field = self.reference_field
-        reference_data = self.reference_data
+        start_ts = adm[self.start_ts_field]
+        end_ts = adm[self.end_ts_field]
 
-        for idx, adm in enumerate(reference_data):
-            start_ts = adm[self.start_ts_field]
-            end_ts = adm[self.end_ts_field]
+        journey = self.client.get_journey(reference=adm[reference_field], source="admissions")
 
-            journey = self.client.get_journey(reference=adm[reference_field], source="admissions")
+        if not journey:
+            journey = self.client.create_journey(reference=adm[reference_field], source="admissions")
 
-            if not journey:
-                journey = self.client.create_journey(reference=adm[reference_field], source="admissions")
+        clock = self.new_clock(start_ts, end_ts)
+        driver = self.new_driver(journey=journey, clock=clock)
 
-            clock = self.new_clock(start_ts, end_ts)
-            driver = self.new_driver(journey=journey, clock=clock)
+        for source in timeline_sources:
+            source.prepare_timeline(driver, clock)
 
-            n = 0
+            if self.skip_idle_ticks:
+                clock.add_events(source.event_timestamps(driver))
 
-            while (clock.has_ended() is False):
-                if n % 24 == 0:
-                    LOG.info(f"**** DAY {n} ({clock.timestamp}) {driver.journey['reference']}")
+        return driver
 
-                plan_copy.run(driver)
+    def _run_tick(self, plan, driver):
+        """
+        Run plan for the driver at the current clock tick and advance the clock.
+        Returns:
+            False if the journey has finished (the clock has ended or the journey is complete)
+        """
+        clock = driver.clock
+        if clock.has_ended():
+            return False
 
-                if "complete" in driver.journey and driver.journey["complete"] == 1:
-                    break
+        ticks_per_day = self._ticks_per_day
+        if clock.tick_index % ticks_per_day == 0:
+            LOG.info(f"**** DAY {clock.tick_index // ticks_per_day} ({clock.timestamp}) {driver.journey['reference']}")
 
-                clock.advance()
-                n += 1
+        # only needed to detect idle ticks (avoids a client read/flush for each tick of the plain replay)
+        latest_step = driver.get_current_journey_step() if self.skip_idle_ticks else None
+        plan.run(driver)
 
-            if "complete" in driver.journey and driver.journey["complete"] != 1:
-                LOG.info(f"journey {driver.journey['reference']} complete")
-                self.client.complete_journey(driver.journey_id)
+        if "complete" in driver.journey and driver.journey["complete"] == 1:
+            return False
 
-        LOG.info(f"{idx+1} journeys complete")
+        if self.skip_idle_ticks:
+            clock.advance(pending=self._has_pending_step(latest_step, driver.get_current_journey_step()))
+        else:
+            clock.advance()
+
+        return True
+
+    def _end_journey(self, driver):
+        if "complete" in driver.journey and driver.journey["complete"] != 1:
+            LOG.info(f"journey {driver.journey['reference']} complete")
+            self.client.complete_journey(driver.journey_id)
+
+    @staticmethod
+    def _get_timeline_sources(plan):
+        from easul.util import DeferredItem
+
+        sources = {id(source): source for source in plan.sources.values()}
 
+        for step in plan.steps.values():
+            step_source = getattr(step, "source", None)
+            if step_source is not None and not isinstance(step_source, DeferredItem):
+                sources[id(step_source)] = step_source
+
+        return list(sources.values())
+
+    @staticmethod
+    def _has_pending_step(previous_step, latest_step):
+        from easul.step import StepStatuses
+
+        if latest_step is None:
+            return True
+
+        if latest_step["status"] not in [StepStatuses.WAITING.name, StepStatuses.ERROR.name]:
+            return True
+
+        # something changed in this run so check again at the next tick as the hourly replay would
+        return previous_step is None or (previous_step["name"], previous_step["status"]) != (latest_step["name"], latest_step["status"])
 
     def new_empty_driver(self, is_empty=False, clock=None):
         from easul.driver import EmptyDriver
@@ -72,10 +149,12 @@ class LocalEngine(Engine):
     def new_driver(self, reference=None, source=None, journey=None, clock=None):
         from easul.driver import Driver
 
+        driver_cls = self.driver_cls or Driver
+
         if journey:
-            return Driver.from_journey(journey=journey, client=self.client, broker=self.broker, clock=clock)
+            return driver_cls.from_journey(journey=journey, client=self.client, broker=self.broker, clock=clock)
 
-        return Driver.from_reference(reference=reference, source=source, client=self.client,
+        return driver_cls.from_reference(reference=reference, source=source, client=self.client,
                               broker=self.broker, clock=clock)
 
     def get_outcomes(self):
@@ -89,5 +168,142 @@ class LocalEngine(Engine):
         return states, steps
 
 
+class BatchedLocalEngine(LocalEngine):
+    """
+    LocalEngine which advances the clocks of the whole cohort in lockstep. At each tick the journeys waiting at, or
+    about to enter, the same algorithm step (including CheckEndSteps which run at the start of every plan run) have
+    their input data retrieved, and the rows are converted together (see Algorithm.create_input_datasets) and combined
+    into a single dataset for the step. The algorithm (see Algorithm.batch_results) and visual (see
+    Visual.generate_batch_context) are run once on it and each journey's driver is given its row, result and context,
+    so the plan run does not retrieve or convert the data again. Routes and states are the same as a LocalEngine
+    replay. Steps with actions which change the input data (after_data), and steps reached later in the same run, are
+    run for the single journey. If a batch fails its journeys are run individually and the fallback is logged and
+    counted (see easul.metrics.count_batch_fallback).
+    """
+    def run(self, plan):
+        from easul.util import copy_plan_with_new_sources
+        plan_copy = copy_plan_with_new_sources(plan, self.sources)
+
+        timeline_sources = self._get_timeline_sources(plan_copy)
+
+        drivers = [self._start_journey(adm, timeline_sources) for adm in self.reference_data]
+        active = list(drivers)
+
+        while active:
+            self._run_batches(plan_copy, active)
+            active = [driver for driver in active if self._run_tick(plan_copy, driver)]
+
+        for driver in drivers:
+            driver.batch_results = None
+            self._end_journey(driver)
+
+        LOG.info(f"{len(drivers)} journeys complete")
+
+    def _run_batches(self, plan, drivers):
+        from easul.step import AlgorithmStep, CheckEndStep
+
+        steps = plan.steps
+        check_steps = [step for step in steps.values() if isinstance(step, CheckEndStep) and self._can_batch(step)]
+        batches = {}
+
+        for driver in drivers:
+            driver.batch_results = {}
+
+            if driver.clock.has_ended() or driver.journey.get("complete") == 1:
+                continue
+
+            batch_steps = list(check_steps)
+            current_step = self._get_current_step(steps, driver.get_current_journey_step())
+
+            if isinstance(current_step, AlgorithmStep) and current_step not in batch_steps \
+                    and self._can_batch(current_step):
+                batch_steps.append(current_step)
+
+            with plan.source_context(driver):
+                for step in batch_steps:
+                    data = self._retrieve_batch_data(step, driver)
+
+                    if data is not None:
+                        batches.setdefault(step.name, (step, []))[1].append((driver, data))
+
+        for step, members in batches.values():
+            self._run_batch(step, members)
+
+    @staticmethod
+    def _can_batch(step):
+        from easul.action import Action
+
+        # data changed by actions during the run (e.g. with the previous outcome) cannot be prepared in advance
+        return all(type(action).after_data is Action.after_data for action in step.actions)
+
+    @staticmethod
+    def _get_current_step(steps, journey_step):
+        from easul.step import StepStatuses
+
+        if journey_step is None:
+            return None
+
+        if journey_step["status"] == StepStatuses.WAITING.name:
+            return steps.get(journey_step["name"])
+
+        if journey_step["status"] == StepStatuses.COMPLETE.name and journey_step.get("next_step"):
+            return steps.get(journey_step["next_step"])
+
+        return None
+
+    @staticmethod
+    def _retrieve_batch_data(step, driver):
+        from easul.step import CheckEndStep
+
+        source = driver.get_step_source(step)
+        if not source:
+            return None
+
+        # journeys without usable data (or with errors) follow the normal path in the run which handles them
+        try:
+            data = source.retrieve(driver, step)
+
+            if not data:
+                return None
+
+            if isinstance(step, CheckEndStep) and step.is_unchanged(driver, data):
+                return None
+
+            return data
+        except Exception as ex:
+            LOG.debug(f"[{driver.journey['reference']}:{step.name}] Not included in batch: {ex}")
+            return None
+
+    @staticmethod
+    def _run_batch(step, members):
+        from easul.data import combine_input_datasets
+        from easul.metrics import time_phase, count_batch_fallback
+
+        # rows which cannot be converted (or are invalid) and any journeys in a failed batch follow the normal path
+        # in the run which handles the errors
+        try:
+            with time_phase(step.name, "source"):
+                datasets = step.algorithm.create_input_datasets([data for driver, data in members])
+
+            members = [(driver, data, dataset) for (driver, data), dataset in zip(members, datasets)
+                       if dataset is not None]
+            if not members:
+                return
+
+            datasets = [dataset for driver, data, dataset in members]
+
+            with time_phase(step.name, "algorithm"):
+                results = step.algorithm.batch_results(datasets)
 
+            with time_phase(step.name, "visual_context"):
+                if step.visual:
+                    contexts = step.visual.generate_batch_context(combine_input_datasets(datasets))
+                else:
+                    contexts = [None] * len(datasets)
+        except Exception as ex:
+            LOG.warning(f"[{step.name}] Batch of {len(members)} journeys failed, running them individually: {ex}")
+            count_batch_fallback(step.name, len(members))
+            return
 
+        for (driver, data, dataset), result, context in zip(members, results, contexts):
+            driver.batch_results[step.name] = (data, dataset, result, context)
@@ -1,7 +1,7 @@
 import datetime as dt
-import itertools
 
 from easul.engine import Client, Broker, Channels
+from easul.engine.snapshot import JourneySnapshot
 from easul.util import is_successful_outcome
 import logging
 
@@ -9,13 +9,15 @@ LOG= logging.getLogger(__name__)
 
 class MemoryClient(Client):
     """
-    Client which persist all information in internal data structures.
+    Client which persist all information in internal data structures. A snapshot of each journey is kept up to date
+    as steps/states are stored so current steps and states do not require scanning the history.
     """
     def __init__(self):
         self._journeys = {}
         self._journey_idx = {}
         self._steps = {}
         self._states = {}
+        self._snapshots = {}
 
     def complete_journey(self, journey_id=None, reference=None):
         if not reference in self._journeys:
@@ -47,7 +49,9 @@ class MemoryClient(Client):
 
     def set_current_state(self, state_label, state, journey_id=None, reference=None, reason=None, from_step=None, timestamp=None):
         journey = self.get_journey(id = journey_id, reference=reference)
-        self._journeys[journey["reference"]]["states"].append({"label":state_label, "status":state, "timestamp":timestamp})
+        state_row = {"label":state_label, "status":state, "timestamp":timestamp}
+        self._journeys[journey["reference"]]["states"].append(state_row)
+        self._get_snapshot(journey).add_state(state_row)
 
     def set_current_step(self, step_name, status, status_info=None, journey_id=None, reference=None, outcome=None, timestamp=None):
         journey = self.get_journey(id=journey_id, reference=reference)
@@ -64,10 +68,38 @@ class MemoryClient(Client):
                     "next_step":outcome.get("next_step") if is_successful_outcome(outcome) else None,
                     "value":outcome.get("result",{}).get("value") if is_successful_outcome(outcome) else None
                 })
+                self._get_snapshot(journey).add_step(steps[sidx])
                 return
 
-        self._journeys[journey["reference"]]["steps"].append({"name":step_name,"status":status,"next_step":outcome.get("next_step") if outcome else None, "outcome":outcome, "timestamp":timestamp,"status_info":status_info,"result":outcome.get("result") if is_successful_outcome(outcome) else None, "value":outcome.get("result",{}).get("value") if is_successful_outcome(outcome) else None})
+        step_row = {"name":step_name,"status":status,"next_step":outcome.get("next_step") if outcome else None, "outcome":outcome, "timestamp":timestamp,"status_info":status_info,"result":outcome.get("result") if is_successful_outcome(outcome) else None, "value":outcome.get("result",{}).get("value") if is_successful_outcome(outcome) else None}
+        self._journeys[journey["reference"]]["steps"].append(step_row)
+        self._get_snapshot(journey).add_step(step_row)
 
+    def _get_snapshot(self, journey):
+        snapshot = self._snapshots.get(journey["reference"])
+        if snapshot is None:
+            snapshot = JourneySnapshot.from_history(journey["steps"], journey["states"])
+            self._snapshots[journey["reference"]] = snapshot
+
+        return snapshot
+
+    def get_outcome_columns(self, kind):
+        from easul.engine.engine import OUTCOME_COLUMNS
+
+        columns = {column: [] for column in OUTCOME_COLUMNS[kind]}
+        row_fields = [(columns[column], "status" if kind == "state" and column == "state" else column)
+                      for column in OUTCOME_COLUMNS[kind] if column not in ["reference", "journey"]]
+
+        for journey in self._journeys.values():
+            rows = journey[kind + "s"]
+
+            columns["reference"].extend([journey["reference"]] * len(rows))
+            columns["journey"].extend([journey["id"]] * len(rows))
+
+            for column, field in row_fields:
+                column.extend(row.get(field) for row in rows)
+
+        return columns
 
     def get_current_state(self, state_label, journey_id=None, reference=None, timestamp=None):
         journey = self.get_journey(id=journey_id, reference=reference)
@@ -79,16 +111,8 @@ class MemoryClient(Client):
         return None
 
     def get_current_states(self, journey_id=None, reference=None):
-        all_states = self.get_all_states(journey_id=journey_id, reference=reference)
-        states_by_label = itertools.groupby(all_states, lambda x: x["label"])
-
-        current_states = {}
-
-        for label, states in states_by_label:
-            sorted_states = sorted(states, key=lambda x: x["timestamp"] if x["timestamp"] else dt.datetime.min, reverse=True)
-            current_states[label] = sorted_states[0]
-
-        return current_states
+        journey = self.get_journey(id=journey_id, reference=reference)
+        return dict(self._get_snapshot(journey).states)
 
     def get_all_states(self, journey_id=None, reference=None):
         journey = self.get_journey(id=journey_id, reference=reference)
@@ -96,26 +120,11 @@ class MemoryClient(Client):
 
     def get_latest_step(self, journey_id=None, reference=None):
         journey = self.get_journey(id=journey_id, reference=reference)
-
-        steps = self._journeys[journey["reference"]]["steps"]
-
-        if len(steps)>0:
-            return steps[-1]
-
-        return None
+        return self._get_snapshot(journey).latest_step
 
     def get_step(self, step_name, journey_id=None, reference=None):
         journey = self.get_journey(id=journey_id, reference=reference)
-
-        steps = self._journeys[journey["reference"]]["steps"]
-
-        match_steps = list(filter(lambda x: x["name"] == step_name, steps))
-
-        if len(match_steps)==0:
-            return None
-
-        sorted_steps = sorted(match_steps, key=lambda x:x["timestamp"], reverse=True)
-        return sorted_steps[0]
+        return self._get_snapshot(journey).steps.get(step_name)
 
     def get_step_route(self, journey_id):
         journey = self.get_journey(id=journey_id)
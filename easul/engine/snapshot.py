@@ -0,0 +1,126 @@
+import datetime as dt
+
+import logging
+LOG = logging.getLogger(__name__)
+
+class JourneySnapshot:
+    """
+    Compact runtime view of a journey: the latest step, the latest step of each name and the current state for each
+    state label. Clients keep snapshots up to date as steps/states are stored so that resuming a journey does not
+    require scanning its step and state history. Rows are stored in the same form as the client returns them.
+    """
+    def __init__(self, latest_step=None, steps=None, states=None):
+        self.latest_step = latest_step
+        self.steps = steps if steps is not None else {}
+        self.states = states if states is not None else {}
+        self.changed = False
+
+    @classmethod
+    def from_history(cls, steps, states):
+        """
+        Create snapshot from the full step and state history of a journey (in the order they were stored).
+        Args:
+            steps:
+            states:
+
+        Returns:
+
+        """
+        snapshot = cls()
+        for step in steps:
+            snapshot.add_step(step)
+
+        for state in states:
+            snapshot.add_state(state)
+
+        snapshot.changed = True
+
+        return snapshot
+
+    def add_step(self, step):
+        """
+        Add stored step. Steps with the same name and timestamp as an existing step are updates of that step so only
+        replace the latest step if they also replace it in the client.
+        Args:
+            step:
+
+        Returns:
+
+        """
+        existing = self.steps.get(step["name"])
+
+        if existing is not None and _is_before(step.get("timestamp"), existing.get("timestamp")):
+            return
+
+        self.steps[step["name"]] = step
+        self.changed = True
+
+        if existing is None or not _same_time(existing.get("timestamp"), step.get("timestamp")):
+            self.latest_step = step
+            return
+
+        if self.latest_step is existing or (self.latest_step and self.latest_step.get("name") == step["name"]
+                                            and _same_time(self.latest_step.get("timestamp"), step.get("timestamp"))):
+            self.latest_step = step
+
+    def add_state(self, state):
+        existing = self.states.get(state["label"])
+
+        if existing is not None and _is_before(state.get("timestamp"), existing.get("timestamp")):
+            return
+
+        self.states[state["label"]] = state
+        self.changed = True
+
+    def get_current_state(self, state_label, timestamp=None):
+        """
+        Get current state for label at the timestamp. Returns False (rather than None) if the snapshot cannot answer
+        because the current state was stored after the timestamp.
+        Args:
+            state_label:
+            timestamp:
+
+        Returns:
+
+        """
+        state = self.states.get(state_label)
+
+        if state is None or timestamp is None:
+            return state
+
+        if _is_before(timestamp, state.get("timestamp")):
+            return False
+
+        return state
+
+    def asdict(self):
+        return {"latest_step": self.latest_step, "steps": self.steps, "states": self.states}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(latest_step=data.get("latest_step"), steps=data.get("steps"), states=data.get("states"))
+
+
+def _to_datetime(value):
+    if isinstance(value, str):
+        try:
+            return dt.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    return value
+
+def _is_before(first, second):
+    first = _to_datetime(first)
+    second = _to_datetime(second)
+
+    if first is None or second is None:
+        return False
+
+    try:
+        return first < second
+    except TypeError:
+        return False
+
+def _same_time(first, second):
+    return _to_datetime(first) == _to_datetime(second)
@@ -4,6 +4,8 @@ import sqlite3
 
 from easul.engine.db import SqliteDb, ClientBatchedSqliteDb, BrokerBatchedSqliteDb
 from easul.engine import Client, JsonCodec, LOG, Broker
+from easul.engine.codec import MsgPack
+from easul.engine.snapshot import JourneySnapshot
 import datetime as dt
 
 from easul.outcome import FailedOutcome
@@ -11,12 +13,19 @@ from easul.outcome import FailedOutcome
 
 class SqliteClient(Client):
     """
-    Client which uses SQLite as its basis.
+    Client which uses SQLite as its basis. Journey snapshots are persisted in a 'snapshot' table so that a resumed
+    journey is loaded with a single read rather than scanning its step and state history. Snapshot rows are converted
+    to the form in which they are stored (see SqliteDb.to_stored_row) so that they are the same as the rows in the
+    step/state history.
     """
     codec = JsonCodec
+    snapshot_codec = MsgPack
+    persist_snapshots = True
 
     def __init__(self, db_file):
         self.db = SqliteDb(db_file)
+        self._snapshots = {}
+        self._invalidated_snapshots = set()
         self._create_tables()
 
     def _create_tables(self):
@@ -31,6 +40,49 @@ class SqliteClient(Client):
                   "reason": "", "value": "", "result": "",
                   "outcome": "", "next_step": "","timestamp":""}, has_id_field=True,indexes={"step_journey_idx":"journey"})
 
+        if self.persist_snapshots and self.db.does_table_exist("snapshot") is False:
+            self.db.create_table_from_values("snapshot", {"journey": 0, "data": ""}, unique_indexes={"snapshot_journey_idx": "journey"})
+
+    def load_snapshot(self, journey_id):
+        if self.persist_snapshots is False or journey_id is None or journey_id in self._snapshots:
+            return
+
+        self._invalidated_snapshots.discard(journey_id)
+        row = self.db.get_row("snapshot", {"journey": journey_id})
+
+        if row:
+            snapshot = JourneySnapshot.from_dict(self.snapshot_codec.decode(row["data"]))
+        else:
+            snapshot = JourneySnapshot.from_history(self.get_steps(journey_id=journey_id), self.get_all_states(journey_id=journey_id))
+
+        self._snapshots[journey_id] = snapshot
+
+    def _update_snapshot(self, journey_id, step=None, state=None):
+        snapshot = self._snapshots.get(journey_id)
+
+        if snapshot is None:
+            # stored snapshot is out of date if the journey is changed outside a run (only deleted once until the
+            # snapshot is loaded again)
+            if self.persist_snapshots and journey_id not in self._invalidated_snapshots:
+                self.db.create_cursor("DELETE FROM snapshot WHERE journey = :journey", {"journey": journey_id}).close()
+                self.db.conn.commit()
+                self._invalidated_snapshots.add(journey_id)
+            return
+
+        if step:
+            snapshot.add_step(self.db.to_stored_row("step", step))
+
+        if state:
+            snapshot.add_state(self.db.to_stored_row("state", state))
+
+    def save_snapshot(self, journey_id):
+        snapshot = self._snapshots.pop(journey_id, None)
+        if snapshot is None or snapshot.changed is False:
+            return
+
+        self.db.replace_row("snapshot", {"journey": journey_id, "data": self.snapshot_codec.encode(snapshot.asdict())})
+        self._invalidated_snapshots.discard(journey_id)
+
     def create_journey(self, reference, source, label=None):
         values = {"reference":str(reference),"source":source,"label":label,"complete":0}
         return self.db.insert_row("journey",values)
@@ -50,7 +102,11 @@ class SqliteClient(Client):
         if timestamp:
             values["timestamp"] = timestamp
 
-        return self.db.insert_row("state", values)
+        state_row = self.db.insert_row("state", values)
+
+        self._update_snapshot(journey_id, state=state_row)
+
+        return state_row
 
     def set_current_step(self, step_name, status, status_info=None, journey_id=None, reference=None, outcome=None, timestamp=None):
         if reference:
@@ -76,15 +132,24 @@ class SqliteClient(Client):
                 if status!="READY":
                     return None
 
-            return self.db.update_row("step", c_step, values)
+            step_row = self.db.update_row("step", c_step, values)
+            self._update_snapshot(journey_id, step={**c_step, **step_row})
+        else:
+            step_row = self.db.insert_row("step", values)
+            self._update_snapshot(journey_id, step=step_row)
 
-        return self.db.insert_row("step", values)
+        return step_row
 
     def get_current_state(self, state_label, journey_id=None, reference=None, timestamp=None):
         if reference:
             journey = self.get_journey(reference)
             journey_id = journey['id']
 
+        if journey_id in self._snapshots:
+            state = self._snapshots[journey_id].get_current_state(state_label, timestamp)
+            if state is not False:
+                return state
+
         state_log = self.db.get_rows("state", {"journey":journey_id, "label":state_label, "timestamp":(timestamp, operator.le)}, order_by=["-timestamp","-id"])
         sorted_state_log = sorted(state_log, key=lambda x: x["timestamp"], reverse=True)
 
@@ -95,6 +160,9 @@ class SqliteClient(Client):
             journey = self.get_journey(reference=reference)
             journey_id = journey['id']
 
+        if journey_id in self._snapshots:
+            return dict(self._snapshots[journey_id].states)
+
         states = self.db.get_rows("state", {"journey": journey_id})
 
         states_by_label = itertools.groupby(states, lambda x: x["label"])
@@ -119,8 +187,12 @@ class SqliteClient(Client):
             journey = self.get_journey(reference)
             journey_id = journey['id']
 
+        if journey_id in self._snapshots:
+            return self._snapshots[journey_id].steps.get(step_name)
+
+        # latest step with the name (as stored in the snapshot and returned by MemoryClient)
         try:
-            rows = self.db.get_rows("step", {"name":step_name, "journey": journey_id})
+            rows = self.db.get_rows("step", {"name":step_name, "journey": journey_id}, order_by=["-timestamp", "-id"])
             return None if len(rows)==0 else rows[0]
         except sqlite3.OperationalError:
             return None
@@ -136,6 +208,9 @@ class SqliteClient(Client):
             return []
 
     def get_latest_step(self, journey_id=None, reference=None):
+        if journey_id in self._snapshots:
+            return self._snapshots[journey_id].latest_step
+
         steps = self.get_steps(journey_id=journey_id, reference=reference)
 
         if len(steps) == 0:
@@ -174,11 +249,127 @@ class SqliteClient(Client):
 
         return self.db.get_row("journey",{"reference":reference})
 
+    @staticmethod
+    def _complete_clause(include_complete, alias="journey"):
+        return "" if include_complete else f" WHERE {alias}.complete = 0"
+
+    @staticmethod
+    def _id_params(prefix, ids):
+        params = {f"{prefix}{idx}": value for idx, value in enumerate(ids)}
+        return ",".join(":" + name for name in params.keys()), params
+
+    def get_outcome_columns(self, kind):
+        from easul.engine.engine import OUTCOME_COLUMNS
+
+        fields = [f"{kind}.{column}" for column in OUTCOME_COLUMNS[kind] if column != "reference"]
+        sql = f"SELECT journey.reference AS reference, {', '.join(fields)} FROM {kind}" \
+              f" JOIN journey ON journey.id = {kind}.journey ORDER BY {kind}.id"
+
+        return self.db.get_columns_with_sql(sql, {})
+
+    def count_journeys(self, include_complete=False):
+        """
+        Count journeys (by default only incomplete journeys).
+        Args:
+            include_complete:
+
+        Returns:
+
+        """
+        rows = self.db.get_rows_with_sql("SELECT COUNT(*) AS journey_count FROM journey" + self._complete_clause(include_complete), {})
+        return rows[0]["journey_count"]
+
+    def get_journeys_page(self, offset=0, limit=50, include_complete=False):
+        """
+        Get page of journeys ordered by id (by default only incomplete journeys).
+        Args:
+            offset:
+            limit:
+            include_complete:
+
+        Returns:
+
+        """
+        sql = "SELECT * FROM journey" + self._complete_clause(include_complete) + " ORDER BY id LIMIT :limit OFFSET :offset"
+        return self.db.get_rows_with_sql(sql, {"limit": limit, "offset": offset})
+
+    def get_step_status_counts(self, include_complete=False):
+        """
+        Count the latest status of each step across journeys (by default only incomplete journeys) in a single query.
+        Args:
+            include_complete:
+
+        Returns:
+            dictionary of step name to dictionary of status counts
+        """
+        sql = "SELECT step.name AS name, step.status AS status, COUNT(*) AS step_count FROM step" \
+              " JOIN (SELECT MAX(id) AS id FROM step GROUP BY journey, name) latest ON step.id = latest.id" \
+              " JOIN journey ON journey.id = step.journey" + self._complete_clause(include_complete) + \
+              " GROUP BY step.name, step.status"
+
+        counts = {}
+        for row in self.db.get_rows_with_sql(sql, {}):
+            counts.setdefault(row["name"], {})[row["status"]] = row["step_count"]
+
+        return counts
+
+    def get_latest_steps(self, journey_ids):
+        """
+        Get latest row for each step in the supplied journeys.
+        Args:
+            journey_ids:
+
+        Returns:
+            dictionary of journey id to dictionary of step name to step
+        """
+        if not journey_ids:
+            return {}
+
+        placeholders, params = self._id_params("journey", journey_ids)
+        sql = "SELECT step.* FROM step JOIN (SELECT MAX(id) AS id FROM step WHERE journey IN (" + placeholders + \
+              ") GROUP BY journey, name) latest ON step.id = latest.id ORDER BY step.id"
+
+        latest_steps = {journey_id: {} for journey_id in journey_ids}
+        for row in self.db.get_rows_with_sql(sql, params):
+            latest_steps[row["journey"]][row["name"]] = row
+
+        return latest_steps
+
+    def get_last_step_id(self):
+        rows = self.db.get_rows_with_sql("SELECT MAX(id) AS last_id FROM step", {})
+        return rows[0]["last_id"] or 0
+
+    def get_steps_since(self, last_step_id, include_ids=None):
+        """
+        Get steps added since the step with 'last_step_id' (ordered by id). Steps are updated in place while they are
+        running so 'include_ids' can be used to re-read steps which may have changed (e.g. those with INIT status).
+        Args:
+            last_step_id:
+            include_ids:
+
+        Returns:
+
+        """
+        sql = "SELECT * FROM step WHERE id > :last_step_id"
+        params = {"last_step_id": last_step_id}
+
+        if include_ids:
+            placeholders, id_params = self._id_params("step", include_ids)
+            sql += " OR id IN (" + placeholders + ")"
+            params.update(id_params)
+
+        return self.db.get_rows_with_sql(sql + " ORDER BY id", params)
+
 
 class BatchedSqliteClient(SqliteClient):
+    # journey IDs are not final until batches are persisted
+    persist_snapshots = False
+
     def __init__(self, db_file, batch_size):
         self.db = ClientBatchedSqliteDb(SqliteDb(db_file), batch_size)
         self.batch_size = batch_size
+        self._snapshots = {}
+        self._invalidated_snapshots = set()
         self._create_tables()
 
 class SqliteBroker(Broker):
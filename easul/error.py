@@ -34,6 +34,15 @@ class MissingValue(InvalidData):
     pass
 
 
+class DanglingReferenceError(Exception):
+    """
+    Plan contains deferred references to items (e.g. steps, sources) which do not exist in the plan.
+    """
+    def __init__(self, references):
+        self.references = references
+        super().__init__("Plan contains dangling references: " + ", ".join(references))
+
+
 class StepDataError(Exception):
     """
     Base class for errors related to unavailable or invalid step data.
@@ -1,3 +1,7 @@
+import operator
+import os
+from typing import List, Optional
+
 from easul import *
 from easul.tests.example import diabetes_progression_algorithm, EXAMPLE_PATH, model_scope_elements, row_scope_elements
 import pandas as pd
@@ -5,7 +5,6 @@ from typing import Callable
 
 from attrs import define, field
 import numpy as np
-import pandas as pd
 from easul.error import MissingValue
 import logging
 LOG = logging.getLogger(__name__)
@@ -171,6 +170,8 @@ class RegexExpression(FieldExpression):
     negated = field(default=False)
 
     def _test(self, item):
+        import pandas as pd
+
         if not item or pd.isna(item):
             return self.negated
 
@@ -7,7 +7,7 @@ from easul.error import StepDataNotAvailable, InvalidStepData
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + "/../"))
 
 from easul.driver import Driver
-from easul.step import ActionEvent
+from easul.step import ActionEvent, StepStatuses
 from rich.table import Table
 
 logging.basicConfig(level=logging.DEBUG)
@@ -75,23 +75,25 @@ def generate_data_table(client_steps, plan, reference, client, broker):
 
     driver = Driver.from_reference(reference=reference, source="UHL", client=client, broker=broker)
 
-    for step in client_steps:
-        plan_step = plan.steps[step["name"]]
-        LOG.info(f"Get data from {reference} for step {step['name']}")
-
-        if hasattr(plan_step, "_retrieve_data") and plan_step.source:
-
-            event = ActionEvent(step=step, driver=driver, previous_outcome=None)
-            try:
-                data = plan_step._retrieve_data(event)
-            except StepDataNotAvailable as ex:
-                data = {"not_available": str(ex)}
-            except InvalidStepData as ex:
-                data = {"invalid_data": plan_step.source.retrieve(event.driver, plan_step),
-                        "ex": str(ex).replace("[", "(").replace("]", ")")}
-            table3.add_row(step['name'], str(data))
-        else:
-            table3.add_row(step['name'], "No data")
+    with plan.source_context(driver):
+        for step in client_steps:
+            plan_step = plan.steps[step["name"]]
+            LOG.info(f"Get data from {reference} for step {step['name']}")
+            step_source = plan_step.get_source(driver)
+
+            if hasattr(plan_step, "_retrieve_data") and step_source:
+
+                event = ActionEvent(step=step, driver=driver, previous_outcome=None)
+                try:
+                    data = plan_step._retrieve_data(event)
+                except StepDataNotAvailable as ex:
+                    data = {"not_available": str(ex)}
+                except InvalidStepData as ex:
+                    data = {"invalid_data": step_source.retrieve(event.driver, plan_step),
+                            "ex": str(ex).replace("[", "(").replace("]", ")")}
+                table3.add_row(step['name'], str(data))
+            else:
+                table3.add_row(step['name'], "No data")
 
     return table3
 
@@ -102,16 +104,18 @@ def generate_raw_data_table(client_steps, plan, reference, client, broker):
 
     driver = Driver.from_reference(reference=reference, source="UHL", client=client, broker=broker)
 
-    for step in client_steps:
-        plan_step = plan.steps[step["name"]]
-        LOG.info(f"Get raw data from {reference} for step {step['name']}")
+    with plan.source_context(driver):
+        for step in client_steps:
+            plan_step = plan.steps[step["name"]]
+            LOG.info(f"Get raw data from {reference} for step {step['name']}")
+            step_source = plan_step.get_source(driver)
 
-        if hasattr(plan_step, "_retrieve_data") and plan_step.source:
-            event = ActionEvent(step=step, driver=driver, previous_outcome=None)
-            data = plan_step.source._retrieve_raw_data(event.driver, plan_step)
-            table3.add_row(step['name'], str(data))
-        else:
-            table3.add_row(step['name'], "No data")
+            if hasattr(plan_step, "_retrieve_data") and step_source:
+                event = ActionEvent(step=step, driver=driver, previous_outcome=None)
+                data = step_source._retrieve_raw_data(event.driver, plan_step)
+                table3.add_row(step['name'], str(data))
+            else:
+                table3.add_row(step['name'], "No data")
 
     return table3
 
@@ -147,6 +151,105 @@ def generate_table(client):
     return refs, table
 
 
+class PagedJourneyView:
+    """
+    Page of incomplete journeys with the latest status of each step. Refreshes only read the steps which have been
+    added (or may have been updated) since the last refresh rather than re-reading every journey. Requires a client
+    which supports aggregation queries (e.g. SqliteClient).
+    """
+    def __init__(self, client, page_size=50):
+        self.client = client
+        self.page_size = page_size
+        self.page = 0
+        self.journeys = []
+        self.journey_steps = {}
+        self._last_step_id = 0
+        self._running_step_ids = set()
+
+    @property
+    def page_count(self):
+        return max(1, -(-self.client.count_journeys() // self.page_size))
+
+    @property
+    def references(self):
+        return [journey["reference"] for journey in self.journeys]
+
+    def load_page(self, page=None):
+        """
+        Load page of journeys and their latest steps.
+        Args:
+            page: page number (current page if not supplied)
+
+        Returns:
+
+        """
+        if page is not None:
+            self.page = min(max(page, 0), self.page_count - 1)
+
+        self._last_step_id = self.client.get_last_step_id()
+        self.journeys = self.client.get_journeys_page(offset=self.page * self.page_size, limit=self.page_size)
+        self.journey_steps = self.client.get_latest_steps([journey["id"] for journey in self.journeys])
+
+        self._running_step_ids = set(step["id"] for steps in self.journey_steps.values() for step in steps.values()
+                                     if step["status"] == StepStatuses.INIT.name)
+
+    def refresh(self):
+        """
+        Update page with steps added or changed since the last load/refresh.
+        Returns:
+            number of steps read
+        """
+        steps = self.client.get_steps_since(self._last_step_id, include_ids=self._running_step_ids)
+
+        for step in steps:
+            self._last_step_id = max(self._last_step_id, step["id"])
+
+            if step["status"] == StepStatuses.INIT.name:
+                self._running_step_ids.add(step["id"])
+            else:
+                self._running_step_ids.discard(step["id"])
+
+            journey_steps = self.journey_steps.get(step["journey"])
+            if journey_steps is None:
+                continue
+
+            current = journey_steps.get(step["name"])
+            if current is None or current["id"] <= step["id"]:
+                journey_steps[step["name"]] = step
+
+        return len(steps)
+
+def generate_status_table(client):
+    table = Table(expand=True, title="Latest step statuses (incomplete journeys)")
+    table.add_column("Step")
+    table.add_column("Statuses")
+
+    for step_name, counts in sorted(client.get_step_status_counts().items()):
+        table.add_row(step_name, ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+    return table
+
+def generate_page_table(view, step_names):
+    table = Table(expand=True, title=f"Journeys (page {view.page + 1} of {view.page_count})")
+    table.add_column("Idx")
+    table.add_column("Reference")
+
+    for idx, step_name in enumerate(step_names):
+        table.add_column(f"{step_name}[{idx}]")
+
+    for idx, journey in enumerate(view.journeys):
+        steps = view.journey_steps.get(journey["id"], {})
+        row = [str(idx), str(journey["reference"])]
+
+        for step_name in step_names:
+            step = steps.get(step_name)
+            row.append(f"{step['status']} | {step['value']}" if step else "-")
+
+        table.add_row(*row)
+
+    return table
+
+
 import sys, tty, os, termios
 
 full_key_mapping = {
@@ -207,7 +310,40 @@ class KeyPress:
 from rich.console import Console
 from rich.prompt import Prompt
 
-def monitor_client(engine, plan):
+def monitor_client(engine, plan, page_size=50):
+    if not hasattr(engine.client, "get_steps_since"):
+        _monitor_all_journeys(engine, plan)
+        return
+
+    console = Console()
+    step_names = [name for name, step in plan.steps.items() if not step.exclude_from_chart]
+
+    view = PagedJourneyView(engine.client, page_size=page_size)
+    view.load_page(0)
+    console.print(generate_status_table(engine.client))
+    console.print(generate_page_table(view, step_names))
+
+    while (True):
+        p = Prompt.ask("Option (i<idx> = individual record; t=refresh table; s=step statuses; n/p=next/previous page)")
+        if p.startswith("i"):
+            idx = int(p[1:])
+            ref = view.references[idx]
+            console.print(f"Journey {ref} (idx:{idx})")
+            ind_cmps = generate_individual(ref, engine.client, engine.broker, plan)
+            [console.print(i) for i in ind_cmps]
+
+        if p == "t":
+            view.refresh()
+            console.print(generate_page_table(view, step_names))
+
+        if p == "s":
+            console.print(generate_status_table(engine.client))
+
+        if p in ["n", "p"]:
+            view.load_page(view.page + (1 if p == "n" else -1))
+            console.print(generate_page_table(view, step_names))
+
+def _monitor_all_journeys(engine, plan):
 
     console = Console()
 
@@ -0,0 +1,407 @@
+"""
+Instrumentation of plan runs. Timings for each phase of a step (e.g. retrieving source data, running the algorithm,
+making the decision) and counts of notable events (e.g. missing/invalid data, cache hits) are supplied to a metrics
+sink. The default sink discards everything so that instrumentation costs next to nothing unless it is enabled with
+set_metrics (e.g. set_metrics(InMemoryMetrics())).
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import logging
+LOG = logging.getLogger(__name__)
+
+STEP_PHASE_SECONDS = "easul_step_phase_seconds"
+STEP_OUTCOMES_TOTAL = "easul_step_outcomes_total"
+CACHE_TOTAL = "easul_cache_total"
+COLLAPSED_MESSAGES_TOTAL = "easul_collapsed_messages_total"
+BATCH_FALLBACKS_TOTAL = "easul_batch_fallbacks_total"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_plan_title = ContextVar("easul_plan_title", default="")
+
+class MetricsSink:
+    """
+    Base metrics sink which discards all metrics. Sub-classes set 'enabled' to True and record the observations and
+    counts.
+    """
+    enabled = False
+
+    def observe(self, name, value, **labels):
+        """
+        Record an observation (e.g. a duration in seconds) in a histogram.
+        Args:
+            name: metric name
+            value:
+            **labels:
+
+        Returns:
+
+        """
+        pass
+
+    def increment(self, name, amount=1, **labels):
+        """
+        Increment a counter.
+        Args:
+            name: metric name
+            amount:
+            **labels:
+
+        Returns:
+
+        """
+        pass
+
+
+class _Histogram:
+    __slots__ = ("bucket_counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+
+class InMemoryMetrics(MetricsSink):
+    """
+    Metrics sink which keeps histograms and counters in memory. These can be exported in the Prometheus text format
+    (e.g. to a file read by the node exporter textfile collector) with to_prometheus/write_prometheus.
+    """
+    enabled = True
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, export_path=None):
+        self.buckets = tuple(sorted(buckets))
+        self.export_path = export_path
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(labels.items()))
+
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+
+            histogram.count += 1
+            histogram.sum += value
+
+            for idx, upper in enumerate(self.buckets):
+                if value <= upper:
+                    histogram.bucket_counts[idx] += 1
+                    break
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(labels.items()))
+
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def get_counter(self, name, **labels):
+        """
+        Get total for counter with the labels (summed over any labels which are not supplied).
+        Args:
+            name:
+            **labels:
+
+        Returns:
+
+        """
+        return sum(value for (counter_name, counter_labels), value in self._counters.items()
+                   if counter_name == name and _labels_match(counter_labels, labels))
+
+    def get_histogram(self, name, **labels):
+        """
+        Get summary of histogram with the labels (combined over any labels which are not supplied).
+        Args:
+            name:
+            **labels:
+
+        Returns:
+            dictionary containing 'count', 'sum' and 'buckets' (cumulative counts keyed by upper bound)
+        """
+        count = 0
+        total = 0.0
+        bucket_counts = [0] * len(self.buckets)
+
+        for (histogram_name, histogram_labels), histogram in self._histograms.items():
+            if histogram_name != name or not _labels_match(histogram_labels, labels):
+                continue
+
+            count += histogram.count
+            total += histogram.sum
+            bucket_counts = [a + b for a, b in zip(bucket_counts, histogram.bucket_counts)]
+
+        return {"count": count, "sum": total, "buckets": dict(zip(self.buckets, _cumulative(bucket_counts)))}
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self):
+        """
+        Export metrics in the Prometheus text exposition format.
+        Returns:
+
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            counters = sorted(self._counters.items(), key=lambda item: item[0])
+
+        lines = []
+        previous_name = None
+
+        for (name, labels), histogram in histograms:
+            if name != previous_name:
+                lines.append(f"# TYPE {name} histogram")
+                previous_name = name
+
+            for upper, count in zip(self.buckets, _cumulative(histogram.bucket_counts)):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(upper)),))} {count}")
+
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            if name != previous_name:
+                lines.append(f"# TYPE {name} counter")
+                previous_name = name
+
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """
+        Write metrics in the Prometheus text format to 'path' (or the 'export_path'). The file is replaced atomically
+        so that collectors never read partial output.
+        Args:
+            path:
+
+        Returns:
+
+        """
+        path = path or self.export_path
+        if not path:
+            raise AttributeError("No path supplied and metrics do not have an 'export_path'")
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as outfile:
+            outfile.write(self.to_prometheus())
+
+        os.replace(temp_path, path)
+
+
+def _labels_match(labels, match_labels):
+    labels = dict(labels)
+    return all(labels.get(label) == value for label, value in match_labels.items())
+
+def _cumulative(counts):
+    total = 0
+    cumulative = []
+    for count in counts:
+        total += count
+        cumulative.append(total)
+
+    return cumulative
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+
+    formatted = []
+    for label, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        formatted.append(f"{label}=\"{value}\"")
+
+    return "{" + ",".join(formatted) + "}"
+
+
+_metrics = MetricsSink()
+
+def get_metrics():
+    return _metrics
+
+def set_metrics(metrics:MetricsSink):
+    """
+    Replace the metrics sink used when running plans (None restores the default which discards metrics).
+    Args:
+        metrics:
+
+    Returns:
+
+    """
+    global _metrics
+    _metrics = metrics if metrics is not None else MetricsSink()
+
+
+@contextmanager
+def export_metrics(path, interval=None, buckets=DEFAULT_BUCKETS):
+    """
+    Context manager which records metrics in an InMemoryMetrics sink for the duration of the context and writes them
+    to 'path' in the Prometheus text format when it ends (and every 'interval' seconds while it is running if
+    supplied, for long running engines). The previous sink is restored afterwards.
+    Args:
+        path: file to write metrics to (e.g. in the node exporter textfile collector directory)
+        interval: seconds between periodic writes (only written at the end if not supplied)
+        buckets: histogram buckets
+
+    Returns:
+
+    """
+    previous = get_metrics()
+    metrics = InMemoryMetrics(buckets=buckets, export_path=path)
+    stopped = threading.Event()
+    writer = None
+
+    def _write_periodically():
+        while not stopped.wait(interval):
+            try:
+                metrics.write_prometheus()
+            except OSError as ex:
+                LOG.warning(f"Unable to write metrics to '{path}': {ex}")
+
+    set_metrics(metrics)
+
+    if interval:
+        writer = threading.Thread(target=_write_periodically, name="easul-metrics-export", daemon=True)
+        writer.start()
+
+    try:
+        yield metrics
+    finally:
+        stopped.set()
+        if writer is not None:
+            writer.join()
+
+        set_metrics(previous)
+        metrics.write_prometheus()
+
+
+@contextmanager
+def plan_context(plan_title):
+    """
+    Label metrics recorded within the context with the plan title.
+    Args:
+        plan_title:
+
+    Returns:
+
+    """
+    token = _plan_title.set(plan_title or "")
+    try:
+        yield
+    finally:
+        _plan_title.reset(token)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _PhaseTimer:
+    __slots__ = ("metrics", "step", "phase", "start_time")
+
+    def __init__(self, metrics, step, phase):
+        self.metrics = metrics
+        self.step = step
+        self.phase = phase
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(STEP_PHASE_SECONDS, time.perf_counter() - self.start_time, plan=_plan_title.get(),
+                             step=self.step, phase=self.phase)
+        return False
+
+def time_phase(step_name, phase):
+    """
+    Context manager which times a phase of a step (e.g. 'source', 'algorithm', 'decision').
+    Args:
+        step_name:
+        phase:
+
+    Returns:
+
+    """
+    if _metrics.enabled is False:
+        return _NULL_TIMER
+
+    return _PhaseTimer(_metrics, step_name, phase)
+
+def count_outcome(step_name, outcome_type):
+    """
+    Count an outcome of a step (e.g. 'missing_data', 'invalid_data').
+    Args:
+        step_name:
+        outcome_type:
+
+    Returns:
+
+    """
+    if _metrics.enabled is False:
+        return
+
+    _metrics.increment(STEP_OUTCOMES_TOTAL, plan=_plan_title.get(), step=step_name, outcome=outcome_type)
+
+def count_cache(cache_name, hit):
+    """
+    Count a hit or miss of a cache (e.g. 'render').
+    Args:
+        cache_name:
+        hit:
+
+    Returns:
+
+    """
+    if _metrics.enabled is False:
+        return
+
+    _metrics.increment(CACHE_TOTAL, cache=cache_name, result="hit" if hit else "miss")
+
+def count_collapsed_messages(plan_title, amount=1):
+    """
+    Count broker messages which were collapsed into an existing pending plan run.
+    Args:
+        plan_title:
+        amount:
+
+    Returns:
+
+    """
+    if _metrics.enabled is False:
+        return
+
+    _metrics.increment(COLLAPSED_MESSAGES_TOTAL, amount=amount, plan=plan_title or "")
+
+def count_batch_fallback(step_name, journeys):
+    """
+    Count journeys which were run individually because the batch for a step failed.
+    Args:
+        step_name:
+        journeys: number of journeys in the failed batch
+
+    Returns:
+
+    """
+    if _metrics.enabled is False:
+        return
+
+    _metrics.increment(BATCH_FALLBACKS_TOTAL, amount=journeys, plan=_plan_title.get(), step=step_name)
@@ -13,10 +13,10 @@ def visualise_plan(plan, start_step=None, use_external=False, renderer=None):
     """
     from easul.visual import Visual
     from easul.visual.element.journey import JourneyMap
-    from easul.visual.draw.flowchart import MermaidWebFlowChart, MermaidCLIFlowChart
+    from easul.visual.draw.flowchart import MermaidWebFlowChart, SvgFlowChart
 
 
-    fc_cls = MermaidWebFlowChart if use_external is True else MermaidCLIFlowChart
+    fc_cls = MermaidWebFlowChart if use_external is True else SvgFlowChart
 
     v = Visual(
             elements=[
@@ -84,7 +84,7 @@ def visualise_run(plan, input_data, use_external=False, renderer=None):
     Returns:
 
     """
-    from easul.visual.draw.flowchart import MermaidWebFlowChart, MermaidCLIFlowChart
+    from easul.visual.draw.flowchart import MermaidWebFlowChart, SvgFlowChart
 
     driver, plan_copy = _simulate_driver_run(plan, input_data)
 
@@ -96,7 +96,7 @@ def visualise_run(plan, input_data, use_external=False, renderer=None):
 
         renderer = JupyterRenderer()
 
-    fc_cls = MermaidWebFlowChart if use_external is True else MermaidCLIFlowChart
+    fc_cls = MermaidWebFlowChart if use_external is True else SvgFlowChart
 
     v = Visual(
         elements=[
@@ -130,13 +130,14 @@ def visualise_step(step_name, plan, input_data, renderer=None):
 
     return step.render_visual(driver=driver, steps=plan.steps, renderer=renderer)
 
-def describe_step(step_name, plan, renderer=None):
+def describe_step(step_name, plan, renderer=None, driver=None):
     """
     Helper function to describe components of step as rendered table in Jupyter notebooks
     Args:
         step_name:
         plan:
         renderer:
+        driver: optional driver so that sources overridden by the plan (e.g. OverlayPlan) are described
 
     Returns:
 
@@ -150,7 +151,11 @@ def describe_step(step_name, plan, renderer=None):
     if not step:
         raise ValueError(f"Step '{step_name}' does not exist in plan")
 
-    return renderer.render(_create_table(step.describe()))
+    if driver is None:
+        return renderer.render(_create_table(step.describe()))
+
+    with plan.source_context(driver):
+        return renderer.render(_create_table(step.describe(driver)))
 
 
 def describe_plan(plan, renderer=None):
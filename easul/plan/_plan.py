@@ -1,14 +1,19 @@
+from contextlib import contextmanager, nullcontext
+from copy import copy
 from typing import Dict
 
+import attrs
 from attrs import define, field
 import logging
 
 from easul.source import LOG, StaticSource, CollatedSource
-from easul.step import ActionEvent, CheckEndStep, StepStatuses, Step
-from easul.util import DeferredItem,DeferredCatalog,is_successful_outcome, get_start_step
+from easul.step import ActionEvent, CheckEndStep, StepStatuses, Step, StartStep
+from easul.util import DeferredItem,DeferredCatalog,FrozenCatalog,is_successful_outcome, get_start_step
 
 LOG = logging.getLogger(__name__)
 from easul.run import run_step_chain
+from easul.metrics import plan_context, time_phase, count_outcome
+from easul.profiling import profile_step
 
 @define(kw_only=True)
 class Plan:
@@ -43,6 +48,25 @@ class Plan:
         Returns:
 
         """
+        with plan_context(self.title), driver.journey_snapshot():
+            try:
+                self._run(driver)
+            finally:
+                driver.flush()
+
+    def source_context(self, driver):
+        """
+        Context in which the driver uses the same step sources as a run of this plan (e.g. to retrieve data for steps
+        outside a run).
+        Args:
+            driver:
+
+        Returns:
+
+        """
+        return nullcontext(driver)
+
+    def _run(self, driver):
         from easul.step import StepStatuses
         steps = self.steps
 
@@ -55,7 +79,7 @@ class Plan:
         current_journey_step = driver.get_current_journey_step()
 
         if current_journey_step is None:
-            next_step = get_start_step(steps)
+            next_step = self._get_start_step()
             step_status = StepStatuses.INIT.name
         else:
             step_status = current_journey_step["status"]
@@ -63,7 +87,8 @@ class Plan:
 
         if step_status in [StepStatuses.WAITING.name]:
             event = ActionEvent(step=next_step, driver=driver, previous_outcome=None)
-            outcome = run_step_logic(next_step,event)
+            with time_phase(next_step.name, "step"), profile_step(driver, next_step):
+                outcome = run_step_logic(next_step,event)
             if is_successful_outcome(outcome) is False:
                 return
 
@@ -87,6 +112,36 @@ class Plan:
 
         run_step_chain(next_step, driver)
 
+    def _get_start_step(self):
+        return get_start_step(self.steps)
+
+    def get_source_name(self, step_name:str):
+        """
+        Name of the plan source referenced by the step or None if the step has its own embedded source.
+        Args:
+            step_name:
+
+        Returns:
+
+        """
+        source = getattr(self.steps[step_name], "source", None)
+        return source.name if isinstance(source, DeferredItem) else None
+
+    def compile(self):
+        """
+        Compile the plan into a frozen CompiledPlan which is quicker to run. Deferred references are replaced with the
+        concrete items (in steps, algorithms and visuals) and the start step is cached. Steps, decisions and actions
+        (and any algorithms/visuals containing deferred references) are shallow copied so the original plan is left
+        untouched.
+
+        Returns:
+            CompiledPlan
+
+        Raises:
+            DanglingReferenceError: if any deferred reference does not exist in the plan
+        """
+        return _PlanCompiler(self).compile()
+
     def _mark_complete(self, driver):
         LOG.info(f"Journey marked complete [{driver.journey['reference']}]")
         driver._client.mark_complete(reference=driver.journey["reference"])
@@ -102,7 +157,12 @@ class Plan:
 
         """
         from_step = self.steps.get(step_name)
-        run_step_chain(from_step, driver)
+
+        with plan_context(self.title), driver.journey_snapshot():
+            try:
+                run_step_chain(from_step, driver)
+            finally:
+                driver.flush()
 
     def add_step(self, name:str, step):
         step.name = name
@@ -160,24 +220,341 @@ class Plan:
         return self.get_or_defer_property("visuals", name)
 
     def replace_source(self, name, source):
-        actual_source = self.sources.get(name)
-        if not actual_source:
-            raise SystemError(f"Actual source '{name}' does not exist in plan")
+        self.sources[name] = _create_replacement_source(name, self.sources.get(name), source)
 
-        if isinstance(source, CollatedReplace):
-            replace_sources = actual_source.sources
 
-            for sub_source_name, sub_source in source.kwargs.items():
-                if not sub_source_name in replace_sources:
-                    raise ValueError(f"Replacement source name '{sub_source_name} does not exist in the collated source")
+def _create_replacement_source(name, actual_source, source):
+    if not actual_source:
+        raise SystemError(f"Actual source '{name}' does not exist in plan")
 
-                replace_actual_source = replace_sources[sub_source_name]
-                print(f"replace_actual_source:{replace_actual_source}")
-                replace_sources[sub_source_name] = StaticSource(source_data ={source.reference:sub_source}, title= replace_actual_source.title + "_" + sub_source_name, processes= replace_actual_source.processes)
+    if isinstance(source, CollatedReplace):
+        # copied so that plans sharing the collated source (e.g. an OverlayPlan's base plan) are not changed
+        replace_sources = dict(actual_source.sources)
 
-            self.sources[name] = CollatedSource(sources = replace_sources,title= actual_source.title, processes = actual_source.processes)
-        else:
-            self.sources[name] = StaticSource(source_data=source, title = actual_source.title, processes = actual_source.processes)
+        for sub_source_name, sub_source in source.kwargs.items():
+            if not sub_source_name in replace_sources:
+                raise ValueError(f"Replacement source name '{sub_source_name} does not exist in the collated source")
+
+            replace_actual_source = replace_sources[sub_source_name]
+            replace_sources[sub_source_name] = StaticSource(source_data ={source.reference:sub_source}, title= replace_actual_source.title + "_" + sub_source_name, processes= replace_actual_source.processes)
+
+        return CollatedSource(sources = replace_sources,title= actual_source.title, processes = actual_source.processes)
+
+    return StaticSource(source_data=source, title = actual_source.title, processes = actual_source.processes)
+
+
+@define(kw_only=True)
+class CompiledPlan(Plan):
+    """
+    Frozen plan created by Plan.compile(). Catalogs cannot be changed and steps contain concrete references rather
+    than DeferredItems. The start step is cached.
+    """
+    original_plan = field(default=None)
+    _start_step = field(default=None)
+    _source_names = field(factory=dict)
+
+    def _get_start_step(self):
+        if self._start_step is None:
+            raise SystemError("No 'StartStep' is defined in the plan")
+
+        return self._start_step
+
+    def get_source_name(self, step_name:str):
+        """
+        Name of the plan source originally referenced by the step (before deferred references were resolved).
+        Args:
+            step_name:
+
+        Returns:
+
+        """
+        return self._source_names.get(step_name)
+
+    def compile(self):
+        return self
+
+    def _frozen(self, *args, **kwargs):
+        raise SystemError(f"Plan '{self.title}' is compiled and cannot be modified")
+
+    add_step = _frozen
+    add_state = _frozen
+    add_schema = _frozen
+    add_algorithm = _frozen
+    add_source = _frozen
+    add_visual = _frozen
+    replace_source = _frozen
+
+
+@define(kw_only=True)
+class OverlayPlan:
+    """
+    Copy-on-write view of a 'base_plan' which shares its steps, algorithms, schemas, visuals and states but overrides
+    sources. The 'source_overrides' are keyed by source name for steps which refer to plan sources and by step name
+    for steps with embedded sources. Neither the base plan nor its steps are modified; the overrides are applied
+    through the driver for each run, so any number of overlays can run against the same base plan. Items are read
+    from the base plan and sources can be added or replaced, but adding other items raises a SystemError as it
+    would change the shared base plan.
+    """
+    base_plan = field()
+    source_overrides = field(factory=dict)
+    _step_sources = field(init=False)
+
+    @_step_sources.default
+    def _default_step_sources(self):
+        step_sources = {}
+        for name, step in self.base_plan.steps.items():
+            if getattr(step, "source", None) is None:
+                continue
+
+            source_name = self.base_plan.get_source_name(name)
+            source_key = source_name if source_name else name
+
+            if source_key in self.source_overrides:
+                step_sources[name] = self.source_overrides[source_key]
+
+        return step_sources
+
+    @property
+    def title(self):
+        return self.base_plan.title
+
+    @property
+    def steps(self):
+        return self.base_plan.steps
+
+    @property
+    def sources(self):
+        from collections import ChainMap
+        return ChainMap(self.source_overrides, self.base_plan.sources)
+
+    @property
+    def algorithms(self):
+        return self.base_plan.algorithms
+
+    @property
+    def schemas(self):
+        return self.base_plan.schemas
+
+    @property
+    def visuals(self):
+        return self.base_plan.visuals
+
+    @property
+    def states(self):
+        return self.base_plan.states
+
+    @property
+    def config(self):
+        return self.base_plan.config
+
+    def get_source_name(self, step_name:str):
+        return self.base_plan.get_source_name(step_name)
+
+    def add_source(self, name:str, source):
+        """
+        Add or replace an overriding source. The base plan is not changed.
+        Args:
+            name:
+            source:
+
+        Returns:
+
+        """
+        self.source_overrides[name] = source
+        self._step_sources = self._default_step_sources()
+
+    def replace_source(self, name, source):
+        """
+        Replace a source (as Plan.replace_source) by adding an overriding source. The base plan is not changed.
+        Args:
+            name:
+            source:
+
+        Returns:
+
+        """
+        self.add_source(name, _create_replacement_source(name, self.sources.get(name), source))
+
+    def get_property(self, property, name=None):
+        if property == "sources" and name in self.source_overrides:
+            return self.source_overrides[name]
+
+        return self.base_plan.get_property(property, name)
+
+    def get_or_defer_property(self, property, name):
+        if property == "sources" and name in self.source_overrides:
+            return self.source_overrides[name]
+
+        return self.base_plan.get_or_defer_property(property, name)
+
+    def get_step(self, name:str):
+        return self.get_or_defer_property("steps", name)
+
+    def get_state(self, name:str):
+        return self.get_or_defer_property("states", name)
+
+    def get_schema(self, name:str):
+        return self.get_or_defer_property("schemas", name)
+
+    def get_algorithm(self, name:str):
+        return self.get_or_defer_property("algorithms", name)
+
+    def get_source(self, name:str):
+        return self.get_or_defer_property("sources", name)
+
+    def get_visual(self, name:str):
+        return self.get_or_defer_property("visuals", name)
+
+    def default_check_steps(self):
+        return self.base_plan.default_check_steps()
+
+    def compile(self):
+        """
+        Compile the base plan (see Plan.compile) and overlay the same sources on it.
+
+        Returns:
+            OverlayPlan with a CompiledPlan as its base plan
+        """
+        return OverlayPlan(base_plan=self.base_plan.compile(), source_overrides=dict(self.source_overrides))
+
+    def _shared(self, name, *args, **kwargs):
+        raise SystemError(f"Items cannot be added to overlay of plan '{self.title}' as its steps, algorithms, schemas, "
+                          f"visuals and states are shared with the base plan (only sources can be added/replaced)")
+
+    add_step = _shared
+    add_state = _shared
+    add_schema = _shared
+    add_algorithm = _shared
+    add_visual = _shared
+
+    def run(self, driver):
+        """
+        Run base plan for driver with the overridden sources.
+        Args:
+            driver:
+
+        Returns:
+
+        """
+        with self.source_context(driver):
+            self.base_plan.run(driver)
+
+    def run_from(self, step_name:str, driver:"easul.driver.Driver"):
+        with self.source_context(driver):
+            self.base_plan.run_from(step_name, driver)
+
+    @contextmanager
+    def source_context(self, driver):
+        with driver.override_sources(self._step_sources), self.base_plan.source_context(driver):
+            yield driver
+
+
+class _PlanCompiler:
+    """
+    Resolves deferred references in a copy of the plan's steps (and of any algorithms/visuals with deferred
+    references) and builds a CompiledPlan.
+    """
+    _copied_types = None
+
+    def __init__(self, plan):
+        from easul.action import Action
+        from easul.decision import Decision
+        from easul.expression import DecisionCase
+
+        self.plan = plan
+        self.dangling = []
+        self._copies = {}
+        self._deferred_items = []
+        self._copied_types = (Step, Action, Decision, DecisionCase)
+
+    def compile(self):
+        steps = {}
+        source_names = {}
+
+        for name, step in self.plan.steps.items():
+            steps[name] = self._copies[id(step)] = copy(step)
+
+            source = getattr(step, "source", None)
+            if isinstance(source, DeferredItem):
+                source_names[name] = source.name
+
+        catalogs = {property: self._copy_deferred_items(property) for property in ["algorithms", "visuals"]}
+
+        for name, step in steps.items():
+            self._resolve_fields(step, f"steps['{name}']")
+
+        for path, item in self._deferred_items:
+            self._resolve_fields(item, path)
+
+        if self.dangling:
+            from easul.error import DanglingReferenceError
+            raise DanglingReferenceError(self.dangling)
+
+        if self.plan.visuals or any(getattr(step, "visual", None) for step in steps.values()):
+            from easul.visual.render import precompile_templates
+            precompile_templates()
+
+        start_steps = [step for step in steps.values() if isinstance(step, StartStep)]
+
+        return CompiledPlan(
+            title=self.plan.title,
+            steps=FrozenCatalog(steps),
+            sources=FrozenCatalog(self.plan.sources),
+            algorithms=FrozenCatalog(catalogs["algorithms"]),
+            schemas=FrozenCatalog(self.plan.schemas),
+            visuals=FrozenCatalog(catalogs["visuals"]),
+            states=FrozenCatalog(self.plan.states),
+            config=FrozenCatalog(self.plan.config),
+            original_plan=self.plan,
+            start_step=start_steps[0] if start_steps else None,
+            source_names=source_names
+        )
+
+    def _resolve_fields(self, item, path):
+        for item_field in attrs.fields(item.__class__):
+            value = getattr(item, item_field.name)
+            resolved = self._resolve(value, f"{path}.{item_field.name}")
+            if resolved is not value:
+                setattr(item, item_field.name, resolved)
+
+    def _copy_deferred_items(self, property):
+        catalog = {}
+        for name, item in getattr(self.plan, property).items():
+            if attrs.has(item.__class__) and any(isinstance(getattr(item, item_field.name, None), DeferredItem)
+                                                 for item_field in attrs.fields(item.__class__)):
+                self._copies[id(item)] = copy(item)
+                item = self._copies[id(item)]
+                self._deferred_items.append((f"{property}['{name}']", item))
+
+            catalog[name] = item
+
+        return catalog
+
+    def _resolve(self, value, path):
+        if id(value) in self._copies:
+            return self._copies[id(value)]
+
+        if isinstance(value, DeferredItem):
+            return self._resolve_deferred(value, path)
+
+        if isinstance(value, list):
+            return [self._resolve(list_item, f"{path}[{idx}]") for idx, list_item in enumerate(value)]
+
+        if isinstance(value, self._copied_types):
+            self._copies[id(value)] = copy(value)
+            self._resolve_fields(self._copies[id(value)], path)
+
+            return self._copies[id(value)]
+
+        return value
+
+    def _resolve_deferred(self, deferred, path):
+        catalog = getattr(self.plan, deferred.property)
+        if deferred.name not in catalog:
+            self.dangling.append(f"{path} -> {deferred.property}['{deferred.name}']")
+            return deferred
+
+        return self._resolve(catalog[deferred.name], path)
 
 
 class CollatedReplace:
@@ -207,6 +584,7 @@ def run_step_logic(step, event):
         LOG.warning(f"[{ex.journey.get('reference')}:{step.name}] step data NOT available [status:WAITING]")
         event.driver.store_step(step.name, StepStatuses.WAITING, status_info=str(ex), timestamp=event.driver.clock.timestamp)
         step._trigger_actions("missing_data", event)
+        count_outcome(step.name, "missing_data")
         if event.outcome:
             return event.outcome
 
@@ -214,6 +592,7 @@ def run_step_logic(step, event):
 
     except InvalidStepData as ex:
         step._trigger_actions("invalid_data", event)
+        count_outcome(step.name, "invalid_data")
         if event.outcome:
             return event.outcome
 
@@ -29,13 +29,29 @@ class PlanRepository:
             algorithm.save_to_file(filename)
 
 
-    def store_metadata(self):
+    def store_metadata(self, processes=None, mp_context=None):
+        """
+        Calculate and save metadata for the plan visuals. Only the metadata for elements which have changed or whose
+        algorithm/dataset has changed is recalculated. If 'processes' is greater than one, visuals are calculated in
+        parallel in separate processes.
+        Args:
+            processes:
+            mp_context: multiprocessing start method (e.g. 'spawn') or context, platform default if not supplied
+
+        Returns:
+
+        """
         cwd = os.getcwd()
 
-        for visual_name, visual in self.plan.visuals.items():
-            dset = util.string_to_function(visual.metadata_dataset)
-            visual.metadata.clear()
-            visual.metadata.calculate(dset)
+        visuals = list(self.plan.visuals.items())
+
+        if processes and processes > 1 and len(visuals) > 1:
+            self._calculate_metadata_in_processes(visuals, processes, mp_context)
+        else:
+            for visual_name, visual in visuals:
+                _calculate_visual_metadata(visual)
+
+        for visual_name, visual in visuals:
             filename = visual.metadata_filename
             self._make_path(filename)
 
@@ -43,4 +59,36 @@ class PlanRepository:
 
             visual.metadata.save()
 
-        os.chdir(cwd)
\ No newline at end of file
+        os.chdir(cwd)
+
+    def _calculate_metadata_in_processes(self, visuals, processes, mp_context=None):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        if isinstance(mp_context, str):
+            mp_context = multiprocessing.get_context(mp_context)
+
+        with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context) as executor:
+            futures = {visual_name: executor.submit(_calculate_serialized_visual_metadata, util.to_serialized(visual))
+                       for visual_name, visual in visuals}
+
+            for visual_name, visual in visuals:
+                data, provenance, calculated = util.from_serialized(futures[visual_name].result())
+                visual.metadata.replace_data(data, provenance)
+                LOG.info(f"Calculated metadata for {len(calculated)} element(s) in visual '{visual_name}'")
+
+
+def _calculate_visual_metadata(visual):
+    dset = util.string_to_function(visual.metadata_dataset)
+    calculated = visual.metadata.calculate_stale(dset)
+
+    LOG.info(f"Calculated metadata for {len(calculated)} element(s) in visual '{visual.title}'")
+
+    return calculated
+
+
+def _calculate_serialized_visual_metadata(serialized_visual):
+    visual = util.from_serialized(serialized_visual)
+    calculated = _calculate_visual_metadata(visual)
+
+    return util.to_serialized((visual.metadata.data, visual.metadata.provenance, calculated))
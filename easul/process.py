@@ -3,10 +3,39 @@
 from datetime import datetime, date, time
 import logging
 from typing import Callable, List, Dict, Optional
+from collections.abc import Iterable, Iterator
+from itertools import tee
 
 LOG = logging.getLogger(__name__)
 from attrs import define, field
 
+def _is_row_collection(record, streaming):
+    if streaming:
+        return isinstance(record, Iterable) and not isinstance(record, (str, bytes, dict))
+
+    return isinstance(record, list)
+
+def materialise_rows(data):
+    """
+    Convert lazily evaluated rows (e.g. the output of processes in 'streaming' mode) into lists. Only the top level
+    data and the top level values of a dictionary are materialised. This is used at the boundary between sources and
+    DataInput creation so that downstream code always sees concrete lists.
+    Args:
+        data:
+
+    Returns:
+
+    """
+    if isinstance(data, Iterator):
+        return list(data)
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, Iterator):
+                data[key] = list(value)
+
+    return data
+
 @define(kw_only=True)
 class ExcludeFields:
     """
@@ -411,13 +440,14 @@ class IfElseTest:
 class SortList:
     """
     Sort input record (which must be a list) based on the 'field_name'.
-    If reverse is set, sorting is in reverse.
+    If reverse is set, sorting is in reverse. If 'streaming' is set any iterable of rows is accepted.
     """
     field_name = field()
     reverse = field(default=False)
+    streaming:bool = field(default=False)
 
     def __call__(self, record):
-        if not isinstance(record, list):
+        if not _is_row_collection(record, self.streaming):
             raise AttributeError("'record' must be list")
 
         return sorted(record, key=lambda x: x[self.field_name], reverse=self.reverse)
@@ -475,19 +505,26 @@ class ConvertRowsToDictionary:
 class ExtractRowsWithExpression:
     """
     Extract rows which meet a specific field 'expression' for the 'input_field' and put them into the 'output_field'.
-    The expression can be negated using 'negate_expression'
+    The expression can be negated using 'negate_expression'. If 'streaming' is set the 'input_field' can contain any
+    iterable of rows and the 'output_field' will contain a lazy iterator rather than a list.
     """
     expression:"easul.expression.Expression" = field()
     input_field:str = field()
     output_field:str = field()
     negate_expression:bool = field(default=False)
+    streaming:bool = field(default=False)
 
     def __call__(self, record):
         input_data = record.get(self.input_field)
-        if type(input_data) is not list:
+        if not _is_row_collection(input_data, self.streaming):
             raise AttributeError(f"Input data ({self.input_field}) must be a list")
 
-        extracted_rows = list(filter(lambda x: self.expression.evaluate(x) != self.negate_expression, record.get(self.input_field,[])))
+        if isinstance(input_data, Iterator):
+            input_data, record[self.input_field] = tee(input_data)
+
+        extracted_rows = filter(lambda x: self.expression.evaluate(x) != self.negate_expression, input_data)
+        if not self.streaming:
+            extracted_rows = list(extracted_rows)
 
         record[self.output_field] = extracted_rows
         return record
@@ -496,15 +533,20 @@ class ExtractRowsWithExpression:
 @define(kw_only=True)
 class ExcludeRowsWithExpression:
     """
-    Removes rows from list input data which meet a specific 'expression' for the supplied 'input_field'
+    Removes rows from list input data which meet a specific 'expression' for the supplied 'input_field'.
+    If 'streaming' is set any iterable of rows is accepted and a lazy iterator is returned.
     """
     expression = field(default=None)
     input_field = field()
+    streaming:bool = field(default=False)
 
     def __call__(self, record):
-        if type(record) is not list:
+        if not _is_row_collection(record, self.streaming):
             raise AttributeError("Input data must be a list")
 
+        if self.streaming:
+            return (item for item in record if not self.expression.evaluate(item))
+
         new_record = []
         for item in record:
             if self.expression.evaluate(item):
@@ -518,14 +560,19 @@ class ExcludeRowsWithExpression:
 class MultiRowProcess:
     """
     Process which requires input data as a list and processes each using the supplied 'processes' functions.
+    If 'streaming' is set any iterable of rows is accepted and rows are processed lazily as they are consumed.
     """
     processes = field()
+    streaming:bool = field(default=False)
 
     def __call__(self, records):
-        new_records = []
-        for record in records:
-            for process in self.processes:
-                record = process(record)
+        if self.streaming:
+            return (self._process_record(record) for record in records)
 
-            new_records.append(record)
-        return new_records
\ No newline at end of file
+        return [self._process_record(record) for record in records]
+
+    def _process_record(self, record):
+        for process in self.processes:
+            record = process(record)
+
+        return record
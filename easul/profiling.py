@@ -0,0 +1,255 @@
+"""
+Profiling of plan runs. A StepProfiler (enabled with set_profiler) profiles only the code run by each step in the step
+chain, optionally restricted to specific steps and/or journey references, so that imports and idle time waiting for
+the broker do not appear in the profiles. Deterministic profiles (cProfile) are written as pstats files per step and
+sampled profiles as a speedscope JSON file with a profile for each step.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+import logging
+LOG = logging.getLogger(__name__)
+
+DETERMINISTIC_MODE = "deterministic"
+SAMPLING_MODE = "sampling"
+
+class _NullProfile:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_PROFILE = _NullProfile()
+
+class _DeterministicProfile:
+    __slots__ = ("profile",)
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.disable()
+        return False
+
+class _SampledProfile:
+    __slots__ = ("profiler", "step_name", "thread_id")
+
+    def __init__(self, profiler, step_name):
+        self.profiler = profiler
+        self.step_name = step_name
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        # samples are trimmed to the frames below the caller so that only the step run is included
+        self.profiler._start_sampling(self.thread_id, self.step_name, sys._getframe(1))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler._stop_sampling(self.thread_id)
+        return False
+
+
+class StepProfiler:
+    """
+    Profiler for steps run in plans. 'mode' is 'deterministic' (cProfile) or 'sampling' (stacks sampled every 'interval'
+    seconds). If 'steps' and/or 'references' are supplied only runs of those steps/journeys are profiled. Profiles are
+    written to 'directory' by write.
+    """
+    def __init__(self, mode=DETERMINISTIC_MODE, steps=None, references=None, directory="profiles", interval=0.001):
+        if mode not in [DETERMINISTIC_MODE, SAMPLING_MODE]:
+            raise ValueError(f"Profile mode must be '{DETERMINISTIC_MODE}' or '{SAMPLING_MODE}' not '{mode}'")
+
+        self.mode = mode
+        self.steps = set(steps) if steps else None
+        self.references = set(str(reference) for reference in references) if references else None
+        self.directory = directory
+        self.interval = interval
+        self._profiles = {}
+        self._samples = {}
+        self._frames = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def is_profiled(self, driver, step):
+        if self.steps is not None and step.name not in self.steps:
+            return False
+
+        if self.references is not None and str(driver.journey.get("reference")) not in self.references:
+            return False
+
+        return True
+
+    def profile_step(self, driver, step):
+        """
+        Context manager which profiles the run of the step for the driver's journey (if it is selected).
+        Args:
+            driver:
+            step:
+
+        Returns:
+
+        """
+        if not self.is_profiled(driver, step):
+            return _NULL_PROFILE
+
+        if self.mode == SAMPLING_MODE:
+            return _SampledProfile(self, step.name)
+
+        import cProfile
+
+        profile = self._profiles.get(step.name)
+        if profile is None:
+            profile = self._profiles[step.name] = cProfile.Profile()
+
+        return _DeterministicProfile(profile)
+
+    def _start_sampling(self, thread_id, step_name, entry_frame):
+        with self._lock:
+            self._active[thread_id] = (step_name, entry_frame)
+
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="easul-profiler", daemon=True)
+                self._sampler.start()
+
+    def _stop_sampling(self, thread_id):
+        with self._lock:
+            self._active.pop(thread_id, None)
+
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+
+                current_frames = sys._current_frames()
+
+                for thread_id, (step_name, entry_frame) in self._active.items():
+                    frame = current_frames.get(thread_id)
+                    if frame is None:
+                        continue
+
+                    stack = self._get_stack(frame, entry_frame)
+                    if stack:
+                        self._samples.setdefault(step_name, []).append(stack)
+
+    def _get_stack(self, frame, entry_frame):
+        stack = []
+
+        while frame is not None and frame is not entry_frame:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+
+            frame_idx = self._frames.get(key)
+            if frame_idx is None:
+                frame_idx = self._frames[key] = len(self._frames)
+
+            stack.append(frame_idx)
+            frame = frame.f_back
+
+        # frame not below entry point (e.g. step has just finished)
+        if frame is None:
+            return None
+
+        stack.reverse()
+        return stack
+
+    def to_speedscope(self):
+        """
+        Sampled profiles in the speedscope file format (https://www.speedscope.app/file-format-schema.json).
+        Returns:
+
+        """
+        with self._lock:
+            frames = [{"name": name, "file": filename, "line": line} for (name, filename, line), idx in
+                      sorted(self._frames.items(), key=lambda item: item[1])]
+            samples = {step_name: list(step_samples) for step_name, step_samples in self._samples.items()}
+
+        profiles = []
+        for step_name, step_samples in sorted(samples.items()):
+            profiles.append({
+                "type": "sampled",
+                "name": step_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": len(step_samples) * self.interval,
+                "samples": step_samples,
+                "weights": [self.interval] * len(step_samples)
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": "EASUL steps",
+            "exporter": "easul",
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+    def write(self):
+        """
+        Write profiles to the 'directory'.
+        Returns:
+            list of files written
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        if self.mode == SAMPLING_MODE:
+            filename = os.path.join(self.directory, "steps.speedscope.json")
+            with open(filename, "w") as outfile:
+                json.dump(self.to_speedscope(), outfile)
+
+            filenames = [filename]
+        else:
+            filenames = []
+            for step_name, profile in self._profiles.items():
+                filename = os.path.join(self.directory, f"{step_name}.pstats")
+                profile.dump_stats(filename)
+                filenames.append(filename)
+
+        LOG.info(f"Wrote {len(filenames)} profile(s) to '{self.directory}'")
+
+        return filenames
+
+
+_profiler = None
+
+def get_profiler():
+    return _profiler
+
+def set_profiler(profiler:StepProfiler):
+    """
+    Set profiler used for steps run in plans (None disables profiling).
+    Args:
+        profiler:
+
+    Returns:
+
+    """
+    global _profiler
+    _profiler = profiler
+
+def profile_step(driver, step):
+    """
+    Context manager which profiles the step run with the current profiler (does nothing if profiling is disabled).
+    Args:
+        driver:
+        step:
+
+    Returns:
+
+    """
+    if _profiler is None:
+        return _NULL_PROFILE
+
+    return _profiler.profile_step(driver, step)
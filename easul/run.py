@@ -3,6 +3,8 @@ import logging
 from easul.outcome import PauseOutcome
 LOG = logging.getLogger(__name__)
 from easul.util import is_successful_outcome
+from easul.metrics import time_phase
+from easul.profiling import profile_step
 
 def run_step_chain(next_step, driver, previous_outcome=None):
     """
@@ -15,7 +17,8 @@ def run_step_chain(next_step, driver, previous_outcome=None):
     Returns:
 
     """
-    outcome = next_step.run_all(driver, previous_outcome=previous_outcome)
+    with time_phase(next_step.name, "step"), profile_step(driver, next_step):
+        outcome = next_step.run_all(driver, previous_outcome=previous_outcome)
     if not outcome:
         LOG.info(f"[{driver.journey.get('reference')}:END] - no outcome")
         return
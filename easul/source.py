@@ -1,4 +1,3 @@
-import pandas as pd
 from typing import List, Any, Dict
 
 from easul.error import StepDataNotAvailable
@@ -9,7 +8,9 @@ from abc import abstractmethod
 from attrs import define, field
 from functools import partial
 
-from easul.util import get_current_result
+from datetime import timedelta
+from easul.util import get_current_result, TimeIndex
+from easul.process import materialise_rows
 LOG = logging.getLogger(__name__)
 
 @define(kw_only=True)
@@ -50,6 +51,31 @@ class Source:
     def source_titles(self):
         return [self.title]
 
+    def event_timestamps(self, driver):
+        """
+        Timestamps at which the data available from this source can change for the driver's journey. Used by
+        clocks which skip idle time (e.g. EventClock). Sources which do not depend on the clock return an empty list.
+        Args:
+            driver:
+
+        Returns:
+
+        """
+        return []
+
+    def prepare_timeline(self, driver, clock):
+        """
+        Prepare the source for replaying the driver's journey with an IntervalClock (e.g. by precomputing which rows are
+        available at each tick). Sources which do not depend on the clock do nothing.
+        Args:
+            driver:
+            clock:
+
+        Returns:
+
+        """
+        pass
+
     def describe(self):
         return {
             "title":self.title,
@@ -63,7 +89,7 @@ class Source:
         for process in self.processes:
             raw_data = process(raw_data)
 
-        return raw_data
+        return materialise_rows(raw_data)
 
 @define(kw_only=True)
 class CollatedSource(Source):
@@ -91,6 +117,17 @@ class CollatedSource(Source):
 
         return final_data
 
+    def event_timestamps(self, driver):
+        timestamps = []
+        for source in self.sources.values():
+            timestamps.extend(source.event_timestamps(driver))
+
+        return timestamps
+
+    def prepare_timeline(self, driver, clock):
+        for source in self.sources.values():
+            source.prepare_timeline(driver, clock)
+
 @define(kw_only=True)
 class BrokerSource(Source):
     """
@@ -158,12 +195,16 @@ class DbSource(Source):
 @define(kw_only=True)
 class TimebasedDbSource(DbSource):
     """
-    Time-based DB source which introduces a timestamp_field which it uses with a Clock to retrieve data.
+    Time-based DB source which introduces a timestamp_field which it uses with a Clock to retrieve data. The current
+    row is the latest available at the clock time, or if there is a 'sort_field', the first row within the 'window'
+    before the clock time sorted by this field.
     """
     timestamp_field:str = field(default=None)
     default_values = field(default=None)
     sort_field = field(default=None)
     reverse_sort = field(default=False)
+    window:timedelta = field(default=timedelta(hours=1))
+    _indexes = field(factory=dict)
 
     def _get_parameters(self, driver):
         return {self.reference_field: driver.journey["reference"]}
@@ -171,8 +212,46 @@ class TimebasedDbSource(DbSource):
     def _retrieve_final_data(self, driver, step):
         data = super()._retrieve_final_data(driver, step)
 
-        res = get_current_result(data, driver.clock.timestamp, self.timestamp_field, self.sort_field, self.reverse_sort)
-        return res
+        if type(data) is not list:
+            return get_current_result(data, driver.clock.timestamp, self.timestamp_field, self.sort_field, self.reverse_sort, window=self.window)
+
+        return self._get_index(driver, data).current(driver.clock.timestamp, self.sort_field, self.reverse_sort, window=self.window)
+
+    def _get_index(self, driver, data):
+        reference = driver.journey["reference"]
+        indexed_data, index = self._indexes.get(reference, (None, None))
+
+        if indexed_data is not data:
+            index = TimeIndex(data, self.timestamp_field)
+            self._indexes[reference] = (data, index)
+
+        return index
+
+    def prepare_timeline(self, driver, clock):
+        data = super()._retrieve_final_data(driver, None)
+        if type(data) is not list or not hasattr(clock, "tick_count"):
+            return
+
+        self._get_index(driver, data).precompute_ticks(clock, self.window)
+
+    def event_timestamps(self, driver):
+        data = super()._retrieve_final_data(driver, None)
+        if not data:
+            return []
+
+        if type(data) is not list:
+            data = [data]
+
+        timestamps = []
+        for row in data:
+            if row.get(self.timestamp_field) is None:
+                continue
+
+            # row becomes available and later leaves the window used to select the current result
+            timestamps.append(row[self.timestamp_field])
+            timestamps.append(row[self.timestamp_field] + self.window + timedelta(microseconds=1))
+
+        return timestamps
 
 
 
@@ -237,13 +316,18 @@ class StaticSource(Source):
 
         return self.source_data.get(driver.journey["reference"])
 
+def _new_dataframe():
+    import pandas as pd
+
+    return pd.DataFrame()
+
 @define(kw_only=True)
 class DataFrameSource(Source):
     """
     Source which gets 'data' from a pandas DataFrame utilising an appropriate 'reference_field'.
     Also can use optional 'timestamp_field' if temporal in nature.
     """
-    data:pd.DataFrame = field(factory=pd.DataFrame)
+    data:"pandas.DataFrame" = field(factory=_new_dataframe)
     reference_field = field()
     timestamp_field = field(default=None)
 
@@ -259,9 +343,19 @@ class DataFrameSource(Source):
 
         return data.to_dict("records")[0]
 
+    def event_timestamps(self, driver):
+        import pandas as pd
+
+        if not self.timestamp_field:
+            return []
+
+        data = self.data.loc[self.data[self.reference_field] == driver.journey["reference"], self.timestamp_field]
+        return list(pd.to_datetime(data.dropna()).dt.to_pydatetime())
+
     def __iter__(self):
-        for idx, adm in self.data.iterrows():
-            yield self._process_raw_data(adm)
+        columns = list(self.data.columns)
+        for values in self.data.itertuples(index=False, name=None):
+            yield self._process_raw_data(dict(zip(columns, values)))
 
 
 
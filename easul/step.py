@@ -1,5 +1,6 @@
 from attrs import define, field
 import logging
+import weakref
 
 from easul.decision import BinaryDecision
 
@@ -9,6 +10,7 @@ from easul.error import StepDataNotAvailable, ConversionError, InvalidStepData,
 from enum import Enum, auto
 
 from easul.outcome import Outcome, EndOutcome, PauseOutcome, InvalidDataOutcome, MissingDataOutcome
+from easul.metrics import time_phase, count_outcome, count_cache
 from abc import abstractmethod
 
 NO_VISUAL_IN_STEP_MESSAGE = "Sorry no visual for this step"
@@ -65,8 +67,34 @@ class Step:
 
     @property
     def data_sources(self):
+        return self.get_data_sources()
+
+    def get_data_sources(self, driver=None):
+        """
+        Titles of the data sources used by the step. If a driver is supplied, any sources overridden for the run
+        (e.g. by an OverlayPlan) are used.
+        Args:
+            driver:
+
+        Returns:
+
+        """
         return []
 
+    def get_source(self, driver=None):
+        """
+        Get source used by the step, via the driver if supplied so that overridden sources are used.
+        Args:
+            driver:
+
+        Returns:
+
+        """
+        if driver is not None:
+            return driver.get_step_source(self)
+
+        return getattr(self, "source", None)
+
 
     def _trigger_actions(self, trigger_type, event):
         for action in self.actions:
@@ -78,9 +106,12 @@ class Step:
     def __repr__(self):
         return self.name
 
-    def describe(self):
+    def describe(self, driver=None):
         """
         Describe step as Python data structures (lists and dicts)
+        Args:
+            driver: optional driver used to obtain any sources overridden for the run
+
         Returns:
 
         """
@@ -133,7 +164,8 @@ class ActionStep(Step):
 
     def _retrieve_data(self, event):
         from easul.data import DataInput
-        data = self.source.retrieve(event.driver, self)
+        with time_phase(self.name, "source"):
+            data = event.driver.get_step_source(self).retrieve(event.driver, self)
         return DataInput(data, schema=None, convert=False, validate=False)
 
     def _store_current(self, driver, reason):
@@ -157,9 +189,10 @@ class ActionStep(Step):
     def layout_kwargs(self, driver, steps, **kwargs):
         return {}
 
-    def describe(self):
-        desc = super().describe()
-        desc.update({"source": self.source.describe() if self.source else "N/A"})
+    def describe(self, driver=None):
+        desc = super().describe(driver)
+        source = self.get_source(driver)
+        desc.update({"source": source.describe() if source else "N/A"})
         return desc
 
 @define(kw_only=True)
@@ -185,8 +218,8 @@ class AlgorithmStep(ActionStep):
     algorithm = field()
     decision = field()
 
-    def describe(self):
-        desc = super().describe()
+    def describe(self, driver=None):
+        desc = super().describe(driver)
         desc.update({
             "decision": self.decision.describe(),
             "algorithm": self.algorithm.describe()
@@ -194,29 +227,54 @@ class AlgorithmStep(ActionStep):
         return desc
 
     def _determine_outcome(self, event):
-        data = self._retrieve_data(event)
-        result, context = self._run_algorithm(data, event.driver)
-        return self.decision.decide_outcome(result=result, context=context, data=data, step=self)
+        batch_result = event.driver.pop_batch_result(self.name)
+
+        if batch_result is not None:
+            data, result, context = self._use_batch_result(event, batch_result)
+        else:
+            data = self._retrieve_data(event)
+            result, context = self._run_algorithm(data)
+
+        with time_phase(self.name, "decision"):
+            return self.decision.decide_outcome(result=result, context=context, data=data, step=self)
 
-    def _run_algorithm(self, data, driver):
+    def _use_batch_result(self, event, batch_result):
+        source_data, data, result, context = batch_result
+        event.data = source_data
+        self._trigger_actions("after_data", event)
+
+        return data, result, context
+
+    def _run_algorithm(self, data):
         algorithm = self.algorithm
 
-        result = algorithm.single_result(data)
-        context = self._generate_visual_context(data)
+        with time_phase(self.name, "algorithm"):
+            result = algorithm.single_result(data)
+
+        with time_phase(self.name, "visual_context"):
+            context = self._generate_visual_context(data)
 
         return result, context
 
     def _retrieve_data(self, event):
-        if not self.source:
+        self._retrieve_source_data(event)
+        return self._create_input_dataset(event)
+
+    def _retrieve_source_data(self, event):
+        source = event.driver.get_step_source(self)
+        if not source:
             LOG.warning(f"No source specified in step '{self.name}' so cannot retrieve data")
             raise InvalidStepData(journey=event.driver.journey, step_name=self.name, exception=SystemError(f"No source specified in step '{self.name}' so cannot retrieve data"))
 
-        event.data = self.source.retrieve(event.driver, self)
+        with time_phase(self.name, "source"):
+            event.data = source.retrieve(event.driver, self)
+
         self._trigger_actions("after_data", event)
 
         if not event.data:
             raise StepDataNotAvailable(journey=event.driver.journey, step_name=self.name)
 
+    def _create_input_dataset(self, event):
         try:
             return self.algorithm.create_input_dataset(event.data)
         except ConversionError as ex:
@@ -228,9 +286,8 @@ class AlgorithmStep(ActionStep):
     def possible_links(self):
         return self.decision.possible_links
 
-    @property
-    def data_sources(self):
-        return self.source.source_titles
+    def get_data_sources(self, driver=None):
+        return self.get_source(driver).source_titles
 
 
 @define(kw_only=True)
@@ -244,7 +301,7 @@ class PreStep(ActionStep):
     next_step: Step = field()
 
     def _determine_outcome(self, event):
-        if self.source:
+        if event.driver.get_step_source(self):
             data = self._retrieve_data(event)
         else:
             data = None
@@ -255,8 +312,8 @@ class PreStep(ActionStep):
     def possible_links(self):
         return {"next": self.next_step}
 
-    def describe(self):
-        desc = super().describe()
+    def describe(self, driver=None):
+        desc = super().describe(driver)
         desc.update({
             "next_step": self.next_step.title
         })
@@ -277,8 +334,8 @@ class PauseStep(ActionStep):
     def possible_links(self):
         return {"next": self.next_step}
 
-    def describe(self):
-        desc = super().describe()
+    def describe(self, driver=None):
+        desc = super().describe(driver)
         desc.update({
             "next_step": self.next_step.title
         })
@@ -295,15 +352,83 @@ class StartStep(PreStep):
 class CheckEndStep(AlgorithmStep):
     """
     Embedded step which is executed whenever a specific journey is resumed. For example, it can check if a patient
-    has already been discharged.
+    has already been discharged. The outcome for each journey is kept (by client and journey ID) with a fingerprint of
+    the source data so that the algorithm and decision are only re-run when the data has changed. It is discarded once
+    the check ends the journey.
     """
     true_step = field()
     decision = field(init=False)
+    _checked_outcomes = field(factory=weakref.WeakKeyDictionary, init=False, repr=False, eq=False)
 
     @decision.default
     def _default_decision(self):
         return BinaryDecision(true_step=self.true_step, false_step=None)
 
+    def _determine_outcome(self, event):
+        batch_result = event.driver.pop_batch_result(self.name)
+
+        if batch_result is not None:
+            data, result, context = self._use_batch_result(event, batch_result)
+            fingerprint = get_data_fingerprint(event.data)
+            count_cache("check_end", False)
+        else:
+            self._retrieve_source_data(event)
+
+            fingerprint = get_data_fingerprint(event.data)
+
+            checked = self._get_checked(event.driver)
+            if checked is not None and checked[0] == fingerprint:
+                count_cache("check_end", True)
+                return checked[1]
+
+            count_cache("check_end", False)
+
+            data = self._create_input_dataset(event)
+            result, context = self._run_algorithm(data)
+
+        with time_phase(self.name, "decision"):
+            outcome = self.decision.decide_outcome(result=result, context=context, data=data, step=self)
+
+        journey_outcomes = self._checked_outcomes.setdefault(event.driver.client, {})
+
+        # journey moves to the end step so it will not be checked again
+        if outcome.next_step is not None:
+            journey_outcomes.pop(event.driver.journey_id, None)
+        else:
+            journey_outcomes[event.driver.journey_id] = (fingerprint, outcome)
+
+        return outcome
+
+    def _get_checked(self, driver):
+        return self._checked_outcomes.get(driver.client, {}).get(driver.journey_id)
+
+    def get_checked_outcome(self, driver):
+        """
+        Get the outcome of the last evaluation for the driver's journey (or None if it has not been evaluated or the
+        check ended the journey).
+        Args:
+            driver:
+
+        Returns:
+
+        """
+        checked = self._get_checked(driver)
+        return checked[1] if checked else None
+
+    def is_unchanged(self, driver, data):
+        """
+        Whether the source data is the same as when the driver's journey was last evaluated (so it will not be
+        re-evaluated).
+        Args:
+            driver:
+            data: source data
+
+        Returns:
+
+        """
+        checked = self._get_checked(driver)
+        return checked is not None and checked[0] == get_data_fingerprint(data)
+
     def run_all(self, driver, previous_outcome=None):
         event = ActionEvent(step=self, driver=driver, previous_outcome=previous_outcome)
         self._trigger_actions("before_run", event)
@@ -320,13 +445,15 @@ class CheckEndStep(AlgorithmStep):
             return outcome
 
         except StepDataNotAvailable as ex:
+            count_outcome(self.name, "missing_data")
             return MissingDataOutcome(outcome_step=self, reason=str(ex))
 
         except InvalidStepData as ex:
+            count_outcome(self.name, "invalid_data")
             return InvalidDataOutcome(outcome_step=self, reason=str(ex))
 
-    def describe(self):
-        desc = super().describe()
+    def describe(self, driver=None):
+        desc = super().describe(driver)
         desc.update({
             "true_step": self.true_step.title,
             "decision":self.decision.describe()
@@ -334,6 +461,26 @@ class CheckEndStep(AlgorithmStep):
         return desc
 
 
+def get_data_fingerprint(data):
+    """
+    Digest of source data. Used to tell whether data has changed since a step was last evaluated.
+    Args:
+        data:
+
+    Returns:
+
+    """
+    import hashlib
+    import pickle
+
+    try:
+        serialized = pickle.dumps(data)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        serialized = repr(data).encode("utf-8")
+
+    return hashlib.sha256(serialized).hexdigest()
+
+
 class StepStatuses(Enum):
     """
     Enum containing statuses which match those used within the client.
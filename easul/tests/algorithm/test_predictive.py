@@ -4,6 +4,7 @@ from sklearn.linear_model import LogisticRegression
 
 import easul.algorithm
 from easul.algorithm import *
+from easul import util
 
 import numpy as np
 
@@ -46,6 +47,21 @@ def test_classifier_algorithm_calculates_single_result(regression_dataset):
     assert preds2 == RegressionResult(value=151.0, data=anys.AnyInstance(object))
 
 
+def test_classifier_algorithm_batch_results_match_single_results(classifier_dataset):
+    train, test = classifier_dataset.train_test_split(train_size=0.25, random_state=0)
+
+    algo = ClassifierAlgorithm(title="digits", model=LogisticRegression(), schema=classifier_dataset.schema)
+    algo.fit(train)
+
+    rows = [
+        {"age":59,"sex":2,"bmi":32.1,"bp":101,"s1":157,"s2":93.2,"s3":38,"s4":4,"s5":4.9,"s6":87},
+        {"age":48,"sex":1,"bmi":21.6,"bp":87,"s1":183,"s2":103.2,"s3":70,"s4":3,"s5":3.9,"s6":69}
+    ]
+
+    assert algo.batch_results(rows) == [algo.single_result(row) for row in rows]
+    assert algo.batch_results([]) == []
+
+
 def test_classifier_algorithm_hash_with_schema_does_not_change(classifier_dataset):
     ds1_train, ds1_test = classifier_dataset.train_test_split(0.25)
 
@@ -1,5 +1,8 @@
 import os
 import datetime as dt
+
+import pytest
+
 from easul import *
 from easul.engine import local
 from easul.examples import create_example_plan, load_data_file
@@ -62,3 +65,182 @@ def test_local_engine_works_without_extras():
 
     engine.run(plan)
     states, steps = engine.get_outcomes()
+
+
+def _timed_catheter_engine(tmp_path, skip_idle_ticks, interval=None):
+    import pandas as pd
+    from easul.engine.db import SqliteDb
+    from easul.engine.memory import MemoryClient, MemoryBroker
+
+    admission_ts = dt.datetime(2023, 5, 1, 8, 30)
+    db = SqliteDb(str(tmp_path / f"catheter_{skip_idle_ticks}_{interval.seconds if interval else 0}.db"))
+    readings = [
+        {"admission_id": "A1", "reading_ts": (admission_ts + dt.timedelta(hours=5, minutes=10)).strftime("%Y-%m-%d %H:%M:%S"), "systolic_bp": 95},
+        {"admission_id": "A2", "reading_ts": (admission_ts + dt.timedelta(hours=2)).strftime("%Y-%m-%d %H:%M:%S"), "systolic_bp": 85},
+        {"admission_id": "A2", "reading_ts": (admission_ts + dt.timedelta(hours=30)).strftime("%Y-%m-%d %H:%M:%S"), "systolic_bp": 99},
+    ]
+    db.create_table_from_values("catheter", readings[0])
+    db.insert_rows("catheter", readings)
+
+    catheter = TimebasedDbSource(title="Catheter", db=db, table_name="catheter", reference_field="admission_id",
+                                 timestamp_field="reading_ts", multiple_rows=True, window=interval or dt.timedelta(hours=1),
+                                 processes=[MultiRowProcess(processes=[ParseDateTime(field_name="reading_ts", format="%Y-%m-%d %H:%M:%S")])])
+
+    admissions = DataFrameSource(title="Admissions", reference_field="admission_id", data=pd.DataFrame([
+        {"admission_id": "A1", "admission_ts": admission_ts, "discharge_ts": admission_ts + dt.timedelta(days=3)},
+        {"admission_id": "A2", "admission_ts": admission_ts, "discharge_ts": admission_ts + dt.timedelta(days=2)},
+        {"admission_id": "A3", "admission_ts": admission_ts, "discharge_ts": admission_ts + dt.timedelta(days=2)},
+    ]))
+
+    return local.LocalEngine(sources={"admissions": admissions, "catheter": catheter}, reference_name="admissions",
+                             start_ts_field="admission_ts", end_ts_field="discharge_ts",
+                             skip_idle_ticks=skip_idle_ticks, client=MemoryClient(), broker=MemoryBroker(), interval=interval)
+
+
+@pytest.mark.parametrize("interval", [None, dt.timedelta(minutes=15)])
+def test_local_engine_skipping_idle_ticks_matches_hourly_replay(tmp_path, interval):
+    from easul.tests.example import complex_plan
+
+    hourly = _timed_catheter_engine(tmp_path, skip_idle_ticks=False, interval=interval)
+    skipping = _timed_catheter_engine(tmp_path, skip_idle_ticks=True, interval=interval)
+
+    hourly.run(complex_plan())
+    skipping.run(complex_plan())
+
+    for reference in ["A1", "A2", "A3"]:
+        hourly_journey = hourly.client.get_journey(reference=reference)
+        skipping_journey = skipping.client.get_journey(reference=reference)
+
+        assert skipping.client.get_step_route(skipping_journey["id"]) == hourly.client.get_step_route(hourly_journey["id"])
+        skipping_step = dict(skipping.client.get_latest_step(journey_id=skipping_journey["id"]))
+        hourly_step = dict(hourly.client.get_latest_step(journey_id=hourly_journey["id"]))
+
+        # waiting steps are re-polled every hour in the hourly replay so only completed steps have the same timestamp
+        if hourly_step["status"] == "WAITING":
+            del skipping_step["timestamp"], hourly_step["timestamp"]
+
+        assert skipping_step == hourly_step
+        assert skipping.client.get_current_states(journey_id=skipping_journey["id"]).keys() == hourly.client.get_current_states(journey_id=hourly_journey["id"]).keys()
+        assert len(skipping_journey["steps"]) <= len(hourly_journey["steps"])
+
+    assert len(skipping.client.get_journey(reference="A3")["steps"]) < len(hourly.client.get_journey(reference="A3")["steps"])
+
+
+def _waiting_catheter_engine(tmp_path, engine_cls):
+    import pandas as pd
+    from easul.engine.db import SqliteDb
+    from easul.engine.memory import MemoryClient, MemoryBroker
+
+    admission_ts = dt.datetime(2023, 5, 1, 8, 30)
+    reading_ts = (admission_ts + dt.timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S")
+    db = SqliteDb(str(tmp_path / f"catheter_{engine_cls.__name__}.db"))
+    readings = [
+        {"admission_id": "B1", "reading_ts": reading_ts, "systolic_bp": 95},
+        {"admission_id": "B2", "reading_ts": reading_ts, "systolic_bp": 85},
+        {"admission_id": "B3", "reading_ts": reading_ts, "systolic_bp": 99},
+    ]
+    db.create_table_from_values("catheter", readings[0])
+    db.insert_rows("catheter", readings)
+
+    catheter = TimebasedDbSource(title="Catheter", db=db, table_name="catheter", reference_field="admission_id",
+                                 timestamp_field="reading_ts", multiple_rows=True, window=dt.timedelta(hours=2),
+                                 processes=[MultiRowProcess(processes=[ParseDateTime(field_name="reading_ts", format="%Y-%m-%d %H:%M:%S")])])
+
+    admissions = DataFrameSource(title="Admissions", reference_field="admission_id", data=pd.DataFrame([
+        {"admission_id": f"B{idx}", "admission_ts": admission_ts, "discharge_ts": admission_ts + dt.timedelta(days=1)}
+        for idx in range(1, 5)
+    ]))
+
+    return engine_cls(sources={"admissions": admissions, "catheter": catheter}, reference_name="admissions",
+                      start_ts_field="admission_ts", end_ts_field="discharge_ts", client=MemoryClient(),
+                      broker=MemoryBroker())
+
+
+def test_batched_local_engine_matches_serial_replay(tmp_path, monkeypatch):
+    from easul.algorithm import ScoreAlgorithm
+    from easul.tests.example import complex_plan
+
+    batch_sizes = []
+    batch_results = ScoreAlgorithm.batch_results
+
+    def _record_batch(self, datasets):
+        batch_sizes.append(len(datasets))
+        return batch_results(self, datasets)
+
+    monkeypatch.setattr(ScoreAlgorithm, "batch_results", _record_batch)
+
+    serial = _waiting_catheter_engine(tmp_path, local.LocalEngine)
+    batched = _waiting_catheter_engine(tmp_path, local.BatchedLocalEngine)
+
+    serial.run(complex_plan())
+    batched.run(complex_plan())
+
+    assert batched.client.get_journeys() == serial.client.get_journeys()
+    assert batch_sizes == [3]
+
+
+def test_batched_local_engine_hands_prepared_rows_to_plan_runs(tmp_path, monkeypatch):
+    from easul.step import AlgorithmStep
+    from easul.visual import Visual
+    from easul.tests.example import complex_plan
+
+    retrieved = []
+    batch_sizes = []
+    retrieve_data = AlgorithmStep._retrieve_data
+    generate_batch_context = Visual.generate_batch_context
+
+    def _record_retrieve(self, event):
+        retrieved.append(event.driver.journey["reference"])
+        return retrieve_data(self, event)
+
+    def _record_batch_context(self, input_data, **kwargs):
+        batch_sizes.append(input_data.data.shape[0])
+        return generate_batch_context(self, input_data, **kwargs)
+
+    monkeypatch.setattr(AlgorithmStep, "_retrieve_data", _record_retrieve)
+    monkeypatch.setattr(Visual, "generate_batch_context", _record_batch_context)
+
+    def _plan_with_visual():
+        plan = complex_plan()
+        plan.steps["catheter_check"].visual = Visual(elements=[])
+        return plan
+
+    serial = _waiting_catheter_engine(tmp_path, local.LocalEngine)
+    serial.run(_plan_with_visual())
+    serial_retrieved = list(retrieved)
+
+    retrieved.clear()
+    batched = _waiting_catheter_engine(tmp_path, local.BatchedLocalEngine)
+    batched.run(_plan_with_visual())
+
+    assert batched.client.get_journeys() == serial.client.get_journeys()
+    assert batch_sizes == [3]
+
+    # the runs which used the batch did not retrieve (or convert) their data again
+    assert len(retrieved) == len(serial_retrieved) - 3
+
+
+def test_batched_local_engine_counts_failed_batches(tmp_path, monkeypatch):
+    from easul.algorithm import ScoreAlgorithm
+    from easul.metrics import InMemoryMetrics, set_metrics, BATCH_FALLBACKS_TOTAL
+    from easul.tests.example import complex_plan
+
+    def _fail_batch(self, datasets):
+        raise ValueError("Batch failed")
+
+    monkeypatch.setattr(ScoreAlgorithm, "batch_results", _fail_batch)
+
+    serial = _waiting_catheter_engine(tmp_path, local.LocalEngine)
+    serial.run(complex_plan())
+
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+    try:
+        batched = _waiting_catheter_engine(tmp_path, local.BatchedLocalEngine)
+        batched.run(complex_plan())
+    finally:
+        set_metrics(None)
+
+    # the journeys in the failed batch are still run (individually) with the same results
+    assert batched.client.get_journeys() == serial.client.get_journeys()
+    assert metrics.get_counter(BATCH_FALLBACKS_TOTAL, step="catheter_check") == 3
@@ -0,0 +1,61 @@
+import datetime as dt
+
+import pytest
+
+from easul.engine.memory import MemoryClient
+from easul.engine.sqlite import SqliteClient
+
+start_ts = dt.datetime(2023, 5, 1, 8, 0)
+
+
+def _populate(client):
+    for idx in range(3):
+        journey = client.create_journey(reference=f"J{idx}", source="admissions")
+        client.set_current_state("progression", "admitted", journey_id=journey["id"], timestamp=start_ts)
+        client.set_current_step("admission", "COMPLETE", journey_id=journey["id"], timestamp=start_ts)
+        client.set_current_step("check", "WAITING", journey_id=journey["id"], timestamp=start_ts)
+
+        if idx < 2:
+            check_ts = start_ts + dt.timedelta(hours=idx + 1)
+            client.set_current_step("check", "COMPLETE", journey_id=journey["id"], timestamp=check_ts)
+            client.set_current_state("progression", "discharged", journey_id=journey["id"], timestamp=check_ts)
+
+    return client
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request, tmp_path):
+    if request.param == "memory":
+        return _populate(MemoryClient())
+
+    return _populate(SqliteClient(str(tmp_path / "client.db")))
+
+
+def test_client_creates_step_and_state_outcome_tables(client):
+    steps = client.get_outcome_table("step")
+    assert list(steps.columns) == ["reference", "journey", "name", "status", "value", "next_step", "timestamp"]
+    assert len(steps) == 8
+    assert list(steps.loc[steps["reference"] == "J0", "status"]) == ["COMPLETE", "WAITING", "COMPLETE"]
+
+    states = client.get_outcome_table("state")
+    assert list(states.columns) == ["reference", "journey", "label", "state", "timestamp"]
+    assert list(states["state"]) == ["admitted", "discharged", "admitted", "discharged", "admitted"]
+
+    with pytest.raises(ValueError):
+        client.get_outcome_table("journey")
+
+
+def test_client_summarises_step_statuses(client):
+    summary = client.step_status_summary()
+    assert summary.loc["check", "COMPLETE"] == 2
+    assert summary.loc["check", "WAITING"] == 1
+    assert summary.loc["admission", "COMPLETE"] == 3
+
+    assert client.step_status_summary(latest_only=False).loc["check"].sum() == 5
+
+
+def test_client_calculates_time_to_state(client):
+    summary = client.time_to_state("progression", "discharged")
+    assert summary.loc["J0", "time_to_state"] == dt.timedelta(hours=1)
+    assert summary.loc["J1", "time_to_state"] == dt.timedelta(hours=2)
+    assert summary["time_to_state"].isna()["J2"]
@@ -0,0 +1,190 @@
+import datetime as dt
+
+import pytest
+
+from easul.engine.sqlite import SqliteClient
+
+start_ts = dt.datetime(2023, 5, 1, 8, 0)
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = SqliteClient(str(tmp_path / "client.db"))
+
+    for idx in range(5):
+        journey = client.create_journey(reference=f"J{idx}", source="admissions")
+        client.set_current_step("admission", "COMPLETE", journey_id=journey["id"], timestamp=start_ts)
+        client.set_current_step("catheter_check", "WAITING", journey_id=journey["id"], timestamp=start_ts)
+
+        if idx < 2:
+            client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=1))
+
+    client.complete_journey(reference="J4")
+
+    return client
+
+
+def test_sqlite_client_counts_latest_step_statuses(client):
+    assert client.get_step_status_counts() == {
+        "admission": {"COMPLETE": 4},
+        "catheter_check": {"COMPLETE": 2, "WAITING": 2}
+    }
+    assert client.get_step_status_counts(include_complete=True)["catheter_check"] == {"COMPLETE": 2, "WAITING": 3}
+
+
+def test_sqlite_client_pages_incomplete_journeys(client):
+    assert client.count_journeys() == 4
+    assert [journey["reference"] for journey in client.get_journeys_page(offset=1, limit=2)] == ["J1", "J2"]
+    assert [journey["reference"] for journey in client.get_journeys_page(offset=3, limit=2)] == ["J3"]
+
+    latest_steps = client.get_latest_steps([1, 3])
+    assert latest_steps[1]["catheter_check"]["status"] == "COMPLETE"
+    assert latest_steps[3]["catheter_check"]["status"] == "WAITING"
+
+
+def test_paged_journey_view_refreshes_changed_steps_only(client):
+    from easul.manage.monitor import PagedJourneyView
+
+    view = PagedJourneyView(client, page_size=2)
+    view.load_page(1)
+    assert view.references == ["J2", "J3"]
+    assert view.page_count == 2
+
+    journey = client.get_journey(reference="J2")
+    client.set_current_step("catheter_check", "INIT", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=2))
+    client.set_current_step("admission", "COMPLETE", journey_id=client.get_journey(reference="J0")["id"], timestamp=start_ts + dt.timedelta(hours=2))
+
+    assert view.refresh() == 2
+    assert view.journey_steps[journey["id"]]["catheter_check"]["status"] == "INIT"
+
+    # running step is updated in place so is re-read on the next refresh
+    client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=2))
+
+    assert view.refresh() == 1
+    assert view.journey_steps[journey["id"]]["catheter_check"]["status"] == "COMPLETE"
+    assert view.refresh() == 0
+
+
+def test_sqlite_client_persists_journey_snapshot_between_runs(client):
+    from easul.driver import Driver, LocalClock
+
+    journey = client.get_journey(reference="J2")
+    driver = Driver.from_journey(journey, client=client, broker=None, clock=LocalClock())
+
+    with driver.journey_snapshot():
+        assert client.get_latest_step(journey_id=journey["id"])["status"] == "WAITING"
+        client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+        client.set_current_state("progression", "discharged", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+
+    assert client.db.get_row("snapshot", {"journey": journey["id"]}) is not None
+
+    client.load_snapshot(journey["id"])
+    assert client.get_latest_step(journey_id=journey["id"])["status"] == "COMPLETE"
+    assert client.get_step("admission", journey_id=journey["id"])["status"] == "COMPLETE"
+    assert client.get_current_states(journey_id=journey["id"])["progression"]["state"] == "discharged"
+    assert client.get_current_state("progression", journey_id=journey["id"], timestamp=start_ts) is None
+    client.save_snapshot(journey["id"])
+
+    # changes made outside a run discard the stored snapshot
+    client.set_current_step("discharge", "INIT", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=4))
+    assert client.db.get_row("snapshot", {"journey": journey["id"]}) is None
+
+    client.load_snapshot(journey["id"])
+    assert client.get_latest_step(journey_id=journey["id"])["name"] == "discharge"
+
+
+def test_sqlite_client_snapshot_rows_match_stored_rows(client):
+    from easul.driver import Driver, LocalClock
+
+    journey = client.get_journey(reference="J2")
+    driver = Driver.from_journey(journey, client=client, broker=None, clock=LocalClock())
+
+    with driver.journey_snapshot():
+        client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+        client.set_current_state("progression", "discharged", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+
+    client.load_snapshot(journey["id"])
+    snapshot_rows = (
+        client.get_latest_step(journey_id=journey["id"]),
+        client.get_step("catheter_check", journey_id=journey["id"]),
+        client.get_current_states(journey_id=journey["id"])["progression"],
+    )
+    client.save_snapshot(journey["id"])
+
+    history_rows = (
+        client.get_latest_step(journey_id=journey["id"]),
+        client.get_step("catheter_check", journey_id=journey["id"]),
+        client.get_current_states(journey_id=journey["id"])["progression"],
+    )
+
+    assert snapshot_rows == history_rows
+
+
+def test_sqlite_client_invalidates_stored_snapshot_once_per_journey(client, monkeypatch):
+    from easul.driver import Driver, LocalClock
+
+    journey = client.get_journey(reference="J2")
+    driver = Driver.from_journey(journey, client=client, broker=None, clock=LocalClock())
+
+    with driver.journey_snapshot():
+        client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+
+    deletes = []
+    create_cursor = client.db.create_cursor
+
+    def counting_cursor(sql, *args, **kwargs):
+        if sql.startswith("DELETE FROM snapshot"):
+            deletes.append(sql)
+        return create_cursor(sql, *args, **kwargs)
+
+    monkeypatch.setattr(client.db, "create_cursor", counting_cursor)
+
+    for hour in range(4, 7):
+        client.set_current_step("discharge", "INIT", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=hour))
+
+    assert len(deletes) == 1
+    assert client.db.get_row("snapshot", {"journey": journey["id"]}) is None
+
+    # a snapshot saved after a later run is discarded again by the next change outside a run
+    with driver.journey_snapshot():
+        client.set_current_step("discharge", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=7))
+
+    client.set_current_step("discharge", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=8))
+    assert len(deletes) == 2
+
+
+def test_sqlite_db_stored_row_matches_row_read_back(tmp_path):
+    from easul.engine.db import SqliteDb
+
+    db = SqliteDb(str(tmp_path / "rows.db"))
+    values = {"journey": 3, "name": "catheter_check", "status": "WAITING", "timestamp": start_ts, "reason": None}
+    db.create_table_from_values("step", values, has_id_field=True)
+
+    row = db.insert_row("step", dict(values))
+    assert db.to_stored_row("step", row) == db.get_row("step", {"id": row["id"]})
+
+    updated = db.update_row("step", row, {"status": "COMPLETE", "reason": 12, "timestamp": start_ts + dt.timedelta(hours=1)})
+    assert db.to_stored_row("step", {**row, **updated}) == db.get_row("step", {"id": row["id"]})
+
+
+def test_sqlite_client_does_not_read_back_snapshot_rows(client, monkeypatch):
+    from easul.driver import Driver, LocalClock
+
+    journey = client.get_journey(reference="J2")
+    driver = Driver.from_journey(journey, client=client, broker=None, clock=LocalClock())
+
+    with driver.journey_snapshot():
+        selects = []
+        create_cursor = client.db.create_cursor
+
+        def counting_cursor(sql, *args, **kwargs):
+            if sql.startswith("SELECT") and "id=" in sql.replace(" ", ""):
+                selects.append(sql)
+            return create_cursor(sql, *args, **kwargs)
+
+        monkeypatch.setattr(client.db, "create_cursor", counting_cursor)
+
+        client.set_current_step("catheter_check", "COMPLETE", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+        client.set_current_state("progression", "discharged", journey_id=journey["id"], timestamp=start_ts + dt.timedelta(hours=3))
+
+    assert selects == []
@@ -0,0 +1,60 @@
+import pytest
+
+from easul.driver import MemoryDriver, LocalClock
+from easul.error import DanglingReferenceError
+from easul.step import EndStep, StartStep
+from easul.tests.example import complex_plan
+from easul.util import DeferredItem
+
+
+@pytest.fixture
+def catheter_plan():
+    plan = complex_plan()
+    plan.replace_source("catheter", {"A1": {"systolic_bp": 92}, "A2": {"systolic_bp": 89}})
+    return plan
+
+@pytest.mark.parametrize("reference,route", [("A1", ["admission", "catheter_check", "itu"]), ("A2", ["admission", "catheter_check", "discharge"])])
+def test_compiled_plan_runs_same_route_as_original(catheter_plan, reference, route):
+    compiled = catheter_plan.compile()
+
+    driver = MemoryDriver.from_reference(reference, autocreate=True, clock=LocalClock())
+    compiled.run(driver)
+    assert driver.get_route() == route
+
+def test_compile_resolves_deferred_items_without_changing_original(catheter_plan):
+    compiled = catheter_plan.compile()
+
+    start_step = compiled.steps["admission"]
+    assert start_step.next_step is compiled.steps["catheter_check"]
+    assert compiled.steps["catheter_check"].decision.true_step is compiled.steps["itu"]
+    assert isinstance(catheter_plan.steps["admission"].next_step, DeferredItem)
+    assert compiled.get_source_name("catheter_check") == "catheter"
+    assert set(compiled.steps["catheter_check"].possible_links.keys()) == {"positive", "negative"}
+
+def test_compile_resolves_deferred_items_in_algorithms(catheter_plan):
+    algorithm = catheter_plan.algorithms["catheter"]
+    algorithm.schema = catheter_plan.get_or_defer_property("schemas", "catheter_later")
+    catheter_plan.add_schema("catheter_later", catheter_plan.schemas["catheter"])
+
+    compiled = catheter_plan.compile()
+
+    assert compiled.algorithms["catheter"].schema is catheter_plan.schemas["catheter"]
+    assert compiled.steps["catheter_check"].algorithm is compiled.algorithms["catheter"]
+    assert isinstance(algorithm.schema, DeferredItem)
+
+def test_compiled_plan_is_frozen(catheter_plan):
+    compiled = catheter_plan.compile()
+
+    with pytest.raises(SystemError):
+        compiled.add_step("end", EndStep(title="End"))
+
+    with pytest.raises(SystemError):
+        compiled.sources["catheter"] = None
+
+def test_compile_detects_dangling_references(catheter_plan):
+    catheter_plan.add_step("second_start", StartStep(title="Other start", next_step=catheter_plan.get_step("missing_step")))
+
+    with pytest.raises(DanglingReferenceError) as ex:
+        catheter_plan.compile()
+
+    assert ex.value.references == ["steps['second_start'].next_step -> steps['missing_step']"]
@@ -48,3 +48,60 @@ def test_plan_repository_retrieved_and_stored_correctly():
 
 
 
+def test_metadata_only_recalculated_for_stale_elements():
+    from easul.tests.example import diabetes_progression_algorithm, diabetes_progression_dataset
+    from easul.data import create_input_dataset
+    from easul.visual import Visual
+    from easul.visual.element.container import HorizContainer
+    from easul.visual.element.overall import Accuracy, Matthews, Ppp, Npp
+
+    algorithm = diabetes_progression_algorithm()
+    dataset = create_input_dataset(diabetes_progression_dataset(), algorithm.schema, allow_multiple=True)
+    accuracy, matthews, ppp, npp = Accuracy(), Matthews(), Ppp(), Npp()
+    visual = Visual(elements=[accuracy, HorizContainer(elements=[matthews, ppp])], algorithm=algorithm)
+
+    def _paths(*elements):
+        return [path for path, element in visual.metadata.metadata_elements if any(element is e for e in elements)]
+
+    assert visual.metadata.calculate_stale(dataset) == _paths(accuracy, matthews, ppp)
+    assert visual.metadata.calculate_stale(dataset) == []
+
+    visual.elements.insert(0, npp)
+    assert visual.metadata.calculate_stale(dataset) == _paths(npp)
+
+    visual.elements.remove(accuracy)
+    assert visual.metadata.calculate_stale(dataset) == []
+    assert "accuracy" not in visual.metadata
+
+    visual.elements[1].elements[0] = Matthews(title="Matthews coefficient")
+    assert visual.metadata.calculate_stale(dataset) == _paths(visual.elements[1].elements[0])
+
+    other_dataset = create_input_dataset(diabetes_progression_dataset(), algorithm.schema, allow_multiple=True)
+    assert len(visual.metadata.calculate_stale(other_dataset)) == 3
+
+
+@pytest.mark.parametrize("mp_context", [None, "spawn"])
+def test_plan_repository_stores_metadata_in_parallel_processes(mp_context):
+    tempdir = TemporaryDirectory(prefix="easul")
+    plan_path = tempdir.name
+
+    from easul.tests.example import complex_plan_with_ml_no_metadata
+
+    plan = complex_plan_with_ml_no_metadata(plan_path)
+
+    repo = PlanRepository(plan)
+    repo.store_algorithms()
+    repo.store_metadata(processes=2, mp_context=mp_context)
+
+    plan2 = complex_plan_with_ml_no_metadata(plan_path)
+
+    for visual_name in ["model_scope", "row_scope"]:
+        metadata = plan.visuals[visual_name].metadata
+        metadata2 = plan2.visuals[visual_name].metadata
+
+        assert metadata2.loaded_from == plan2.visuals[visual_name].metadata_filename
+        assert metadata2.provenance == metadata.provenance
+        assert len(metadata2.provenance) > 0
+        assert list(metadata2.keys()) == list(metadata.keys())
+
+    tempdir.cleanup()
@@ -0,0 +1,92 @@
+import pytest
+
+from easul.driver import MemoryDriver, LocalClock
+from easul.plan import OverlayPlan
+from easul.source import StaticSource
+from easul.tests.example import complex_plan
+
+
+@pytest.fixture
+def base_plan():
+    plan = complex_plan()
+    plan.replace_source("catheter", {})
+    return plan
+
+def _catheter_source(base_plan, reference, systolic_bp):
+    original = base_plan.sources["catheter"]
+    return StaticSource(title=original.title, processes=original.processes, source_data={reference: {"systolic_bp": systolic_bp}})
+
+def _run(plan, reference):
+    driver = MemoryDriver.from_reference(reference, autocreate=True, clock=LocalClock())
+    plan.run(driver)
+    return driver.get_route()
+
+def test_overlays_share_base_plan_without_cross_talk(base_plan):
+    original_source = base_plan.sources["catheter"]
+    high_bp = OverlayPlan(base_plan=base_plan, source_overrides={"catheter": _catheter_source(base_plan, "A1", 92)})
+    low_bp = OverlayPlan(base_plan=base_plan, source_overrides={"catheter": _catheter_source(base_plan, "A1", 89)})
+
+    assert _run(high_bp, "A1") == ["admission", "catheter_check", "itu"]
+    assert _run(low_bp, "A1") == ["admission", "catheter_check", "discharge"]
+
+    assert high_bp.steps is base_plan.steps
+    assert base_plan.sources["catheter"] is original_source
+    assert high_bp.sources["catheter"] is not original_source
+
+def test_overlay_on_compiled_plan_uses_original_source_names(base_plan):
+    overlay = OverlayPlan(base_plan=base_plan.compile(), source_overrides={"catheter": _catheter_source(base_plan, "A2", 92)})
+
+    assert _run(overlay, "A2") == ["admission", "catheter_check", "itu"]
+
+def test_driver_source_overrides_are_removed_after_run(base_plan):
+    overlay = OverlayPlan(base_plan=base_plan, source_overrides={"catheter": _catheter_source(base_plan, "A3", 92)})
+    driver = MemoryDriver.from_reference("A3", autocreate=True, clock=LocalClock())
+    overlay.run(driver)
+
+    assert driver.source_overrides is None
+
+def test_overlay_sources_are_used_when_describing_and_monitoring(base_plan):
+    from easul.engine.memory import MemoryClient, MemoryBroker
+    from easul.manage.monitor import generate_raw_data_table
+
+    overlay = OverlayPlan(base_plan=base_plan, source_overrides={"catheter": StaticSource(title="Overlay catheter", source_data={"A4": {"systolic_bp": 95}})})
+    driver = MemoryDriver.from_reference("A4", autocreate=True, clock=LocalClock())
+    step = overlay.steps["catheter_check"]
+
+    with overlay.source_context(driver):
+        assert step.describe(driver)["source"]["title"] == "Overlay catheter"
+        assert step.get_data_sources(driver) == ["Overlay catheter"]
+
+    assert step.describe()["source"]["title"] == base_plan.sources["catheter"].title
+
+    client = MemoryClient()
+    client.create_journey(reference="A4", source="UHL")
+    table = generate_raw_data_table([{"name": "catheter_check"}], overlay, "A4", client, MemoryBroker())
+    assert list(table.columns[1].cells) == ["{'systolic_bp': 95}"]
+
+
+def test_copy_plan_with_new_sources_supports_plan_methods(base_plan):
+    from easul.util import copy_plan_with_new_sources
+
+    original_source = base_plan.sources["catheter"]
+    plan_copy = copy_plan_with_new_sources(base_plan, {})
+
+    assert plan_copy.get_step("catheter_check") is base_plan.steps["catheter_check"]
+    assert plan_copy.get_algorithm("catheter") is base_plan.algorithms["catheter"]
+    assert plan_copy.get_schema("catheter") is base_plan.schemas["catheter"]
+    assert plan_copy.get_state("admission_state") is base_plan.states["admission_state"]
+    assert plan_copy.get_visual("missing").name == "missing"
+    assert plan_copy.get_source("catheter") is original_source
+
+    plan_copy.replace_source("catheter", {"A5": {"systolic_bp": 92}})
+    assert plan_copy.get_source("catheter") is not original_source
+    assert base_plan.sources["catheter"] is original_source
+    assert _run(plan_copy, "A5") == ["admission", "catheter_check", "itu"]
+
+    assert _run(plan_copy.compile(), "A5") == ["admission", "catheter_check", "itu"]
+
+    with pytest.raises(SystemError):
+        plan_copy.add_step("extra", base_plan.steps["discharge"])
+
+    with pytest.raises(SystemError):
+        plan_copy.add_algorithm("extra", base_plan.algorithms["catheter"])
@@ -275,4 +275,45 @@ def test_checks_end_step_at_beginning_of_different_runs(mock_plan_with_check_end
     plan_copy.run(driver)
 
     assert driver.get_route() == route
-    assert driver.get_current_journey_step() == current_step
\ No newline at end of file
+    assert driver.get_current_journey_step() == current_step
+
+
+def test_check_end_step_skips_evaluation_when_data_unchanged(mock_plan_with_check_end):
+    from easul.metrics import InMemoryMetrics, set_metrics, CACHE_TOTAL
+
+    dis_source = ConstantSource(title="Discharge check", data={"discharged": False})
+    plan_copy = copy_plan_with_new_sources(mock_plan_with_check_end, {
+        "progression": ConstantSource(title="prog", data=None),
+        "catheter": ConstantSource(title="cath", data={"systolic_bp": None}),
+        "discharge_check": dis_source
+    })
+    check_step = plan_copy.steps["discharge_check"]
+
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+    try:
+        driver = MemoryDriver.from_reference("A7", autocreate=True, clock=LocalClock())
+        plan_copy.run(driver)
+        plan_copy.run(driver)
+
+        assert metrics.get_counter(CACHE_TOTAL, cache="check_end", result="miss") == 1
+        assert metrics.get_counter(CACHE_TOTAL, cache="check_end", result="hit") == 1
+        assert check_step.get_checked_outcome(driver).next_step is None
+
+        # same reference in another client is evaluated separately
+        other_driver = MemoryDriver.from_reference("A7", autocreate=True, clock=LocalClock())
+        assert check_step.get_checked_outcome(other_driver) is None
+        plan_copy.run(other_driver)
+        assert metrics.get_counter(CACHE_TOTAL, cache="check_end", result="miss") == 2
+
+        dis_source.data = {"discharged": True}
+        plan_copy.run(driver)
+
+        assert metrics.get_counter(CACHE_TOTAL, cache="check_end", result="miss") == 3
+        assert driver.get_route() == ["admission", "catheter_check", "discharge_check", "discharge"]
+
+        # outcome is discarded once the check ends the journey
+        assert check_step.get_checked_outcome(driver) is None
+        assert check_step.get_checked_outcome(other_driver).next_step is None
+    finally:
+        set_metrics(None)
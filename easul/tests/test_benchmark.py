@@ -0,0 +1,53 @@
+from easul.benchmark import time_visual_render, time_import, run_benchmarks, write_benchmarks
+from easul.visual import Visual
+from easul.visual.element.markup import Message
+
+
+def test_time_visual_render_summarises_each_repeat():
+    visual = Visual(elements=[Message(title="First"), Message(title="Second")])
+
+    timings = time_visual_render(visual, repeat=3)
+
+    assert timings["render"]["count"] == 3
+    assert timings["first_chunk"]["max"] <= timings["render"]["max"]
+    assert timings["size"] == len(visual.render())
+
+
+def test_plan_and_engine_import_without_visual_or_model_dependencies():
+    timings = time_import("easul.plan", "easul.engine.local", "easul.driver")
+
+    heavy_packages = {"matplotlib", "jinja2", "dominate", "scipy", "sklearn", "pandas", "cerberus", "dill"}
+
+    assert heavy_packages.isdisjoint(timings["loaded"])
+    assert "easul" in timings["loaded"]
+
+
+def test_lazy_namespace_keeps_previously_star_imported_names():
+    import easul
+    from easul.visual.draw.flowchart import MermaidCLIFlowChart
+    from easul.algorithm import logic
+
+    assert easul.MermaidCLIFlowChart is MermaidCLIFlowChart
+    assert easul.logic is logic
+    assert easul.ClassifierAlgorithm.__name__ == "ClassifierAlgorithm"
+    assert easul.h5.__module__ == "dominate.tags"
+    assert easul.np.__name__ == "numpy"
+    assert not hasattr(easul, "NotInEasul")
+
+
+def test_benchmark_suite_outputs_json_results(tmp_path):
+    import json
+
+    results = run_benchmarks(sizes=[5], repeat=2, count=10)
+    write_benchmarks(results, str(tmp_path / "benchmarks.json"))
+
+    with open(tmp_path / "benchmarks.json") as infile:
+        loaded = json.load(infile)
+
+    benchmarks = loaded["benchmarks"]
+    assert benchmarks["single_journey"]["count"] == 2
+    assert benchmarks["engine_replay"]["5"]["journeys"] == 5
+    assert set(benchmarks["batched_engine_replay"]["5"].keys()) == {"journeys", "serial_time", "batched_time", "speedup"}
+    assert set(benchmarks["client_writes"].keys()) == {"memory", "sqlite", "batched_sqlite"}
+    assert set(benchmarks["codecs"].keys()) == {"json", "msgpack"}
+    assert benchmarks["visual_render"]["render"]["count"] == 2
@@ -265,6 +265,30 @@ def test_create_dataset_returns_dataset_if_already_dataset():
     ds = data.create_input_dataset(data=ds, schema=ds_schema)
     assert np.array_equal(ds.X[0], [59.0,2.0,32.1,101.0,157.0,93.2,38.0,4.0,4.8598,87.0])
 
+def test_create_input_dataset_returns_multiple_rows_for_list():
+    input_data = {"diabetes_id": "1", "age": "59.0", "sex": "2", "bmi": "32.1", "bp": "101.0", "s1": '157.0', "s2": '93.2', "s3": '38.0', "s4": '4.0', "s5": '4.8598', "s6": '87.0'}
+    other_input_data = dict(input_data, age="48.0")
+
+    ds = data.create_input_dataset(data=[input_data, other_input_data], schema=ds_schema, allow_multiple=True)
+
+    assert isinstance(ds, data.MultiDataInput)
+    assert np.array_equal(ds.X[:, 0], [59.0, 48.0])
+    assert input_data["age"] == "59.0"
+
+def test_create_input_datasets_creates_each_row_as_single_dataset():
+    input_data = {"diabetes_id": "1", "age": "59.0", "sex": "2", "bmi": "32.1", "bp": "101.0", "s1": '157.0', "s2": '93.2', "s3": '38.0', "s4": '4.0', "s5": '4.8598', "s6": '87.0'}
+    other_input_data = dict(input_data, age="48.0")
+    invalid_input_data = dict(input_data, age="unknown")
+
+    datasets = data.create_input_datasets([dict(input_data), invalid_input_data, other_input_data], schema=ds_schema)
+
+    assert datasets[1] is None
+    assert datasets[0].asdict() == data.create_input_dataset(data=dict(input_data), schema=ds_schema).asdict()
+    assert datasets[2].asdict() == data.create_input_dataset(data=other_input_data, schema=ds_schema).asdict()
+
+    combined = data.combine_input_datasets([datasets[0], datasets[2]])
+    assert np.array_equal(combined.X[:, 0], [59.0, 48.0])
+
 def test_create_dataset_handles_text_data():
     ds_schema = data.DataSchema(
         schema={
@@ -0,0 +1,45 @@
+import datetime as dt
+
+import pytest
+
+from easul.driver import Driver, CoalescingDriver, IntervalClock
+from easul.engine.memory import MemoryClient, MemoryBroker
+from easul.source import ConstantSource
+from easul.tests.example import complex_plan
+from easul.util import copy_plan_with_new_sources
+
+start_ts = dt.datetime(2023, 5, 1, 8, 0)
+
+
+class CountingMemoryClient(MemoryClient):
+    def __init__(self):
+        super().__init__()
+        self.step_writes = 0
+
+    def set_current_step(self, *args, **kwargs):
+        self.step_writes += 1
+        return super().set_current_step(*args, **kwargs)
+
+
+def _run_plan(driver_cls, catheter_data):
+    plan = copy_plan_with_new_sources(complex_plan(), {"catheter": ConstantSource(title="cath", data=catheter_data)})
+    client = CountingMemoryClient()
+    journey = client.create_journey(reference="A1", source="test")
+    driver = driver_cls.from_journey(journey, client=client, broker=MemoryBroker(), clock=IntervalClock(start_ts=start_ts, end_ts=start_ts + dt.timedelta(days=1)))
+
+    plan.run(driver)
+    plan.run(driver)
+
+    return client, driver
+
+
+@pytest.mark.parametrize("catheter_data", [{"systolic_bp": 92}, {"systolic_bp": 89}, {"systolic_bp": None}])
+def test_coalescing_driver_stores_same_history_with_fewer_writes(catheter_data):
+    client, driver = _run_plan(Driver, catheter_data)
+    coalescing_client, coalescing_driver = _run_plan(CoalescingDriver, catheter_data)
+
+    assert isinstance(coalescing_driver, CoalescingDriver)
+    assert coalescing_client.get_journeys()[0]["steps"] == client.get_journeys()[0]["steps"]
+    assert coalescing_client.get_journeys()[0]["states"] == client.get_journeys()[0]["states"]
+    assert coalescing_client.step_writes < client.step_writes
+    assert coalescing_client.step_writes + coalescing_driver.coalesced_writes == client.step_writes
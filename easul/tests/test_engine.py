@@ -0,0 +1,108 @@
+import threading
+
+from easul.driver import LocalClock
+from easul.engine.execute import DebouncedJourneyCallback
+from easul.engine.memory import MemoryClient, MemoryBroker
+from easul.metrics import InMemoryMetrics, set_metrics, COLLAPSED_MESSAGES_TOTAL
+
+
+class RecordingPlan:
+    title = "recording"
+    config = {"watch_messages": ["lab_result"]}
+
+    def __init__(self):
+        self.runs = []
+        self.lock = threading.Lock()
+
+    def run(self, driver):
+        with self.lock:
+            self.runs.append((driver.journey["reference"], None))
+
+    def run_from(self, step_name, driver):
+        with self.lock:
+            self.runs.append((driver.journey["reference"], step_name))
+
+
+class LocalTestEngine:
+    client = MemoryClient()
+    clock = LocalClock()
+
+
+def test_debounced_callback_collapses_burst_into_single_run():
+    plan = RecordingPlan()
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+
+    try:
+        callback = DebouncedJourneyCallback(plan, LocalTestEngine(), window=60)
+        broker = MemoryBroker()
+
+        for idx in range(20):
+            callback({"reference": "P1", "data_type": "lab_result"}, broker)
+
+        callback({"reference": "P1", "data_type": "admission"}, broker)
+        callback({"reference": "P2", "data_type": "admission"}, broker)
+
+        assert plan.runs == []
+
+        callback.flush()
+
+        assert len(plan.runs) == 3
+        assert set(plan.runs) == {("P1", None), ("P1", "lab_result"), ("P2", None)}
+        assert callback.collapsed_messages == 19
+        assert metrics.get_counter(COLLAPSED_MESSAGES_TOTAL, plan="recording") == 19
+    finally:
+        set_metrics(None)
+
+
+class StoringPlan(RecordingPlan):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+        self.running = 0
+        self.overlapped = False
+
+    def run(self, driver):
+        from easul.step import StepStatuses
+
+        with self.lock:
+            self.running += 1
+            self.overlapped = self.overlapped or self.running > 1
+            self.threads.add(threading.get_ident())
+
+        try:
+            driver.store_step("admission", StepStatuses.COMPLETE, timestamp=driver.clock.timestamp)
+            super().run(driver)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def test_debounced_callback_runs_plans_with_sqlite_client_on_single_worker(tmp_path):
+    from easul.engine.sqlite import SqliteClient
+
+    class SqliteTestEngine:
+        client = SqliteClient(str(tmp_path / "debounced.db"))
+        clock = LocalClock()
+
+    plan = StoringPlan()
+    engine = SqliteTestEngine()
+    callback = DebouncedJourneyCallback(plan, engine, window=60)
+    broker = MemoryBroker()
+
+    try:
+        for idx in range(10):
+            callback({"reference": f"P{idx % 5}", "data_type": "admission"}, broker)
+
+        callback.flush()
+    finally:
+        callback.close()
+
+    assert sorted(plan.runs) == [(f"P{idx}", None) for idx in range(5)]
+    assert len(plan.threads) == 1 and threading.get_ident() not in plan.threads
+    assert plan.overlapped is False
+    assert callback.collapsed_messages == 5
+
+    for idx in range(5):
+        journey = engine.client.get_journey(reference=f"P{idx}")
+        assert engine.client.get_latest_step(journey_id=journey["id"])["name"] == "admission"
@@ -0,0 +1,71 @@
+import pytest
+
+from easul.driver import MemoryDriver, LocalClock
+from easul.metrics import InMemoryMetrics, set_metrics, STEP_PHASE_SECONDS, STEP_OUTCOMES_TOTAL, time_phase
+from easul.tests.example import complex_plan
+
+
+@pytest.fixture
+def metrics():
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+    yield metrics
+    set_metrics(None)
+
+
+def test_plan_run_records_step_phases_and_invalid_data(metrics):
+    plan = complex_plan()
+    plan.replace_source("catheter", {"M1": {"systolic_bp": 92}, "M2": {"systolic_bp": None}})
+
+    for reference in ["M1", "M2"]:
+        plan.run(MemoryDriver.from_reference(reference, autocreate=True, clock=LocalClock()))
+
+    for phase in ["source", "algorithm", "decision"]:
+        assert metrics.get_histogram(STEP_PHASE_SECONDS, plan=plan.title, step="catheter_check", phase=phase)["count"] > 0
+
+    assert metrics.get_histogram(STEP_PHASE_SECONDS, step="admission", phase="step")["count"] == 2
+    assert metrics.get_counter(STEP_OUTCOMES_TOTAL, step="catheter_check", outcome="invalid_data") == 1
+    assert metrics.get_counter(STEP_OUTCOMES_TOTAL, outcome="missing_data") == 0
+
+
+def test_metrics_export_in_prometheus_text_format(metrics, tmp_path):
+    metrics.observe(STEP_PHASE_SECONDS, 0.003, plan="My \"plan\"", step="admission", phase="source")
+    metrics.increment(STEP_OUTCOMES_TOTAL, plan="My \"plan\"", step="admission", outcome="missing_data")
+
+    export_file = tmp_path / "easul.prom"
+    metrics.write_prometheus(str(export_file))
+    lines = export_file.read_text().splitlines()
+
+    labels = 'plan="My \\"plan\\"",step="admission",phase="source"'
+    assert "# TYPE easul_step_phase_seconds histogram" in lines
+    assert f'easul_step_phase_seconds_bucket{{{labels},le="0.0025"}} 0' in lines
+    assert f'easul_step_phase_seconds_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f'easul_step_phase_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f'easul_step_phase_seconds_count{{{labels}}} 1' in lines
+    assert 'easul_step_outcomes_total{plan="My \\"plan\\"",step="admission",outcome="missing_data"} 1' in lines
+
+
+def test_time_phase_does_nothing_when_metrics_disabled():
+    set_metrics(None)
+
+    with time_phase("admission", "source") as timer:
+        pass
+
+    assert not hasattr(timer, "start_time")
+
+
+def test_export_metrics_writes_prometheus_file_and_restores_sink(tmp_path):
+    from easul.metrics import export_metrics, get_metrics
+
+    path = tmp_path / "easul.prom"
+    previous = get_metrics()
+
+    with export_metrics(str(path), interval=0.01) as metrics:
+        assert get_metrics() is metrics
+
+        plan = complex_plan()
+        plan.replace_source("catheter", {"M1": {"systolic_bp": 92}})
+        plan.run(MemoryDriver.from_reference("M1", autocreate=True, clock=LocalClock()))
+
+    assert get_metrics() is previous
+    assert f'{STEP_PHASE_SECONDS}_count{{plan="{plan.title}",step="catheter_check",phase="source"}} 1' in path.read_text()
@@ -1,4 +1,12 @@
+import datetime as dt
+import operator
+
+import pytest
+
 from easul import process
+from easul.expression import OperatorExpression
+from easul.source import ConstantSource
+
 
 def test_HandleLtSign_returns_reduced_value():
     lt_sign = process.HandleLtSign(field_name="value",reduce_by=0.1)
@@ -15,9 +23,31 @@ def test_DefaultValues_replace_null_value_for_specified_fields():
     assert dv({"sbp": False, "dbp": 80}) == {"sbp": 160, "dbp": 80}
     assert dv({"sbp": 0, "dbp": 80}) == {"sbp": 160, "dbp": 80}
 
-import datetime as dt
 def test_ParseDateTime_replaces_string_with_datetime():
     pdt = process.ParseDateTime(field_name="timestamp",format="%Y-%m-%d %H:%M")
     assert pdt({"timestamp":"2018-03-02 12:23"}) == {"timestamp":dt.datetime(2018,3,2,12,23)}
     assert pdt({"timestamp": None}) == {"timestamp": None}
     assert pdt({"timestamp": "03/04/2018"}) == {"timestamp": None}
+
+def test_streaming_row_processes_are_lazy_until_materialised():
+    rows = ({"value": v} for v in [3, 1, 5, 2])
+    exclude = process.ExcludeRowsWithExpression(expression=OperatorExpression(input_field="value", operator=operator.gt, value=4), input_field="value", streaming=True)
+    multi = process.MultiRowProcess(processes=[process.FieldApply(field_name="value", fn=lambda x: x * 10, target_field_name="value")], streaming=True)
+
+    output = multi(exclude(rows))
+    assert not isinstance(output, list)
+
+    sort = process.SortList(field_name="value", reverse=True, streaming=True)
+    assert sort(output) == [{"value": 30}, {"value": 20}, {"value": 10}]
+
+def test_streaming_extract_rows_are_materialised_at_source_boundary():
+    extract = process.ExtractRowsWithExpression(expression=OperatorExpression(input_field="value", operator=operator.lt, value=3), input_field="rows", output_field="low_rows", streaming=True)
+    source = ConstantSource(title="Rows", data=None, processes=[extract])
+
+    data = source._process_raw_data({"rows": iter([{"value": 1}, {"value": 4}, {"value": 2}])})
+    assert data["low_rows"] == [{"value": 1}, {"value": 2}]
+    assert data["rows"] == [{"value": 1}, {"value": 4}, {"value": 2}]
+
+def test_non_streaming_row_processes_require_list():
+    with pytest.raises(AttributeError):
+        process.ExcludeRowsWithExpression(expression=OperatorExpression(input_field="value", operator=operator.gt, value=4), input_field="value")(iter([]))
@@ -0,0 +1,69 @@
+import json
+import pstats
+import time
+
+import pytest
+
+from easul.driver import MemoryDriver, LocalClock
+from easul.profiling import StepProfiler, set_profiler
+from easul.source import StaticSource
+from easul.tests.example import complex_plan
+
+
+def _slow_catheter_process(data):
+    time.sleep(0.05)
+    return data
+
+
+@pytest.fixture
+def plan():
+    plan = complex_plan()
+    plan.sources["catheter"] = StaticSource(title="Catheter", processes=[_slow_catheter_process],
+                                            source_data={"P1": {"systolic_bp": 92}, "P2": {"systolic_bp": 85}})
+    yield plan
+    set_profiler(None)
+
+
+def _run_journeys(plan, references):
+    for reference in references:
+        plan.run(MemoryDriver.from_reference(reference, autocreate=True, clock=LocalClock()))
+
+
+def test_deterministic_profiler_writes_stats_for_selected_steps_and_references(plan, tmp_path):
+    profiler = StepProfiler(steps=["catheter_check"], references=["P1"], directory=str(tmp_path))
+    set_profiler(profiler)
+
+    _run_journeys(plan, ["P1", "P2"])
+    filenames = profiler.write()
+
+    assert filenames == [str(tmp_path / "catheter_check.pstats")]
+
+    stats = pstats.Stats(filenames[0])
+    process_calls = [call_stats[1] for (filename, line, name), call_stats in stats.stats.items() if name == "_slow_catheter_process"]
+
+    # only the journey for P1 is profiled
+    assert process_calls == [1]
+
+
+def test_sampling_profiler_writes_speedscope_profile_per_step(plan, tmp_path):
+    profiler = StepProfiler(mode="sampling", directory=str(tmp_path), interval=0.001)
+    set_profiler(profiler)
+
+    _run_journeys(plan, ["P1"])
+    filenames = profiler.write()
+
+    with open(filenames[0]) as infile:
+        speedscope = json.load(infile)
+
+    profiles = {profile["name"]: profile for profile in speedscope["profiles"]}
+    frame_names = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    catheter_names = set(frame_names[idx] for sample in profiles["catheter_check"]["samples"] for idx in sample)
+
+    assert "_slow_catheter_process" in catheter_names
+    assert "run_all" in catheter_names
+    assert "run_step_chain" not in catheter_names
+
+
+def test_profiler_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        StepProfiler(mode="tracing")
@@ -1,3 +1,5 @@
+import operator
+
 from easul import *
 from easul.tests.example import curb65_score_algorithm
 from easul.visual.element.score import *
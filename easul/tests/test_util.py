@@ -37,4 +37,35 @@ prov = [
 
 @pytest.mark.parametrize("current_ts,exp_result", prov)
 def test_get_current_result(current_ts,exp_result):
-    assert get_current_result(results, current_ts,"timestamp") == exp_result
\ No newline at end of file
+    assert get_current_result(results, current_ts,"timestamp") == exp_result
+@pytest.mark.parametrize("current_ts,exp_result", prov)
+def test_time_index_matches_get_current_result(current_ts,exp_result):
+    from easul.util import TimeIndex
+    assert TimeIndex(results, "timestamp").current(current_ts) == exp_result
+
+@pytest.mark.parametrize("interval", [dt.timedelta(minutes=15), dt.timedelta(hours=1), dt.timedelta(days=1)])
+def test_time_index_precomputed_ticks_match_get_current_result(interval):
+    from easul.driver import IntervalClock
+    from easul.util import TimeIndex
+
+    rows = results + [{"result": 5, "timestamp": dt.datetime(2022, 11, 25, 10, 0)}, {"result": 0, "timestamp": dt.datetime(2022, 11, 25, 10, 30)}]
+    clock = IntervalClock(dt.datetime(2022, 11, 21, 9, 0), dt.datetime(2022, 11, 27, 0, 0), interval=interval)
+    index = TimeIndex(rows, "timestamp")
+    index.precompute_ticks(clock, window=interval)
+
+    while clock.has_ended() is False:
+        for sort_field in [None, "result"]:
+            assert index.current(clock.timestamp, sort_field, True, window=interval) == get_current_result(rows, clock.timestamp, "timestamp", sort_field, True, window=interval)
+
+        clock.advance()
+
+def test_interval_clock_uses_configured_step():
+    from easul.driver import IntervalClock
+
+    clock = IntervalClock(dt.datetime(2022, 11, 21, 9, 20), dt.datetime(2022, 11, 21, 10, 5), interval=dt.timedelta(minutes=15))
+    assert clock.start_ts == dt.datetime(2022, 11, 21, 9, 0)
+    assert clock.end_ts == dt.datetime(2022, 11, 21, 10, 15)
+
+    clock.advance()
+    assert clock.timestamp == dt.datetime(2022, 11, 21, 9, 15)
+    assert clock.tick_index == 1
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from easul.driver import MemoryDriver
+from easul.tests.example import EXAMPLE_PATH
+from easul.visual import Visual
+from easul.visual.cache import RenderCache, set_render_cache, get_render_cache
+from easul.visual.element.overall import RocCurve
+
+import pytest
+
+@pytest.fixture
+def render_cache():
+    existing_cache = get_render_cache()
+    cache = RenderCache()
+    set_render_cache(cache)
+    yield cache
+    set_render_cache(existing_cache)
+
+
+def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(max_items=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+
+    assert cache.get("a") == b"1"
+
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+def test_render_cache_reads_from_directory_when_not_in_memory(tmp_path):
+    RenderCache(directory=str(tmp_path)).set("a", b"1")
+
+    cache = RenderCache(directory=str(tmp_path))
+
+    assert "a" in cache
+    assert cache.get("a") == b"1"
+    assert len(cache) == 1
+
+
+def test_model_scope_figure_is_drawn_once_for_repeated_renders(render_cache):
+    driver = MemoryDriver.from_reference("A1", autocreate=True)
+    visual = Visual(elements=[RocCurve()], metadata_filename=EXAMPLE_PATH + "/metadata/model_scope.emd")
+
+    with patch.object(RocCurve, "_create_figure", autospec=True, side_effect=RocCurve._create_figure) as create_figure:
+        first_html = visual.render(driver=driver)
+        second_html = visual.render(driver=driver)
+
+    assert create_figure.call_count == 1
+    assert first_html == second_html
+    assert "data:image/png;base64" in first_html
+
+    visual.metadata["roc_auc"] = 0.5
+
+    with patch.object(RocCurve, "_create_figure", autospec=True, side_effect=RocCurve._create_figure) as create_figure:
+        visual.render(driver=driver)
+
+    assert create_figure.call_count == 1
+
+
+class _Colours:
+    def __init__(self, positive):
+        self.positive = positive
+
+
+def test_element_config_digest_does_not_depend_on_object_identity():
+    first = RocCurve(style=_Colours("red"))
+    second = RocCurve(style=_Colours("red"))
+
+    assert repr(first) != repr(second)
+    assert first.config_digest == second.config_digest
+    assert RocCurve(style=_Colours("blue")).config_digest != first.config_digest
+    assert RocCurve(style=_Colours("red"), width=4).config_digest != first.config_digest
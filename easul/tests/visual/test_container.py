@@ -36,4 +36,28 @@ def test_creating_layout_with_nested_container():
 <div id="cc2" name="cc2" style="" class="card my-3"><div class="card-header"><h5 class="card-title">Individual</h5></div><div class="card-body"><div class="py-2"><div id="hc1" name="hc1" style="" class="row hcontainer "><div class="col-sm-auto px-3 pb-3"><div class=\'alert alert-success\'>ROC curve</div></div><div class="col-sm-auto px-3 pb-3"><div id="cn" name="cn" style="" class="vcontainer "><div class="py-2"><div class=\'alert alert-success\'>Accurate</div></div><div class="py-2"><div class=\'alert alert-success\'>Balanced</div></div></div></div></div></div></div></div>
 """.strip()
 
-    assert str(observed_html).find(expected_html) > -1
\ No newline at end of file
+    assert str(observed_html).find(expected_html) > -1
+
+def test_streamed_nested_container_matches_created_html():
+    int_vs = Visual(
+        elements = [
+            CardContainer(title="Individual", name="cc2", heading_level=5, elements = [
+                Message(title="Accurate"),
+                VerticalContainer(name="cn", elements = [
+                    Message(title="Balanced")
+                ])
+            ]),
+            Message(title="Summary")
+        ])
+
+    chunks = list(int_vs.iter_render())
+
+    assert len(chunks) > len(int_vs.elements)
+    assert "".join(chunks) == int_vs.render()
+
+
+def test_precompiled_templates_are_reused():
+    template_files = R.precompile_templates()
+
+    assert "encoded_image.html" in template_files
+    assert R.get_template("encoded_image.html") is R.get_template("encoded_image.html")
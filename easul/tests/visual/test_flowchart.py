@@ -26,3 +26,38 @@ def test_journey_flowchart_within_plan(complex_plan):
     flow_chart = complex_plan.steps["flowchart"]
     flow_chart.visual.elements[0].flowchart_cls = mock_chart
     assert flow_chart.render_visual(driver=driver, steps=complex_plan.steps, route=route) == AnySearch(TEST_JOURNEY_CHART)
+
+
+def test_svg_flowchart_styles_route_and_current_step(complex_plan):
+    from easul.visual.draw.flowchart import SvgFlowChart, JourneyChartSettings
+    from easul.util import get_start_step
+
+    route = ["admission", "catheter_check", "progression_check"]
+    settings = JourneyChartSettings(route_only=False, data_sources=True, after_route=False)
+
+    chart = SvgFlowChart(steps=complex_plan.steps, start_step=get_start_step(complex_plan.steps), route=route, settings=settings)
+    svg = chart.generate()
+
+    assert svg.startswith("<svg") and svg.endswith("</svg>")
+    assert AnySearch("class=\"node current\" data-step=\"progression_check\"") == svg
+    assert AnySearch("class=\"node journey\" data-step=\"catheter_check\"") == svg
+    assert AnySearch("class=\"node non_journey\" data-step=\"discharge\"") == svg
+    assert svg.count("class=\"edge route\"") == 2
+    assert AnySearch("Diabetes progression data") == svg
+
+
+def test_svg_flowchart_reuses_plan_layout(complex_plan):
+    from easul.visual.draw.flowchart import SvgFlowChart, JourneyChartSettings, create_chart_layout
+    from easul.util import get_start_step
+
+    settings = JourneyChartSettings(route_only=True, data_sources=False, after_route=False)
+    start_step = get_start_step(complex_plan.steps)
+
+    create_chart_layout.cache_clear()
+    first_svg = SvgFlowChart(steps=complex_plan.steps, start_step=start_step, route=["admission"], settings=settings).generate()
+    second_svg = SvgFlowChart(steps=complex_plan.steps, start_step=start_step, route=["admission", "catheter_check"], settings=settings).generate()
+
+    assert create_chart_layout.cache_info().hits == 1
+    assert "data-step=\"discharge\"" not in second_svg
+    assert "data-step=\"catheter_check\"" not in first_svg
+    assert "data-step=\"catheter_check\"" in second_svg
@@ -13,7 +13,7 @@ from easul.tests.example import diabetes_progression_algorithm, EXAMPLE_PATH \
 import logging
 
 from easul.visual.element.overall import RocCurve, Accuracy, BalancedAccuracy, Matthews, Ppp, Npp, Specificity, \
-    Sensitivity
+    Sensitivity, ConfusionMatrix, ModelScore, Precision, Recall, FalseNegatives, FalsePositives
 
 logging.basicConfig(level = logging.INFO)
 LOG = logging.getLogger(__name__)
@@ -47,3 +47,32 @@ def test_create_overall_elements(element_cls, expected_html):
 
     assert str(html) == expected_html
 
+
+def test_metadata_calculation_predicts_once_for_all_elements():
+    from sklearn import metrics
+    from easul.tests.example import diabetes_progression_dataset
+    from easul.data import create_input_dataset
+
+    algorithm = diabetes_progression_algorithm()
+    dataset = create_input_dataset(diabetes_progression_dataset(), algorithm.schema, allow_multiple=True)
+    model = algorithm.model
+    algorithm.model = Mock(wraps=model)
+    algorithm.model.classes_ = model.classes_
+
+    visual = Visual(elements=[RocCurve(), Accuracy(), BalancedAccuracy(), Matthews(), Ppp(), Npp(), Specificity(),
+                              Sensitivity(), ConfusionMatrix(), ModelScore(), Precision(), Recall(), FalseNegatives(),
+                              FalsePositives()], algorithm=algorithm)
+    visual.metadata.calculate(dataset)
+
+    assert algorithm.model.predict.call_count == 1
+    assert algorithm.model.predict_proba.call_count == 1
+
+    y_pred = model.predict(dataset.X)
+    tn, fp, fn, tp = metrics.confusion_matrix(dataset.Y, y_pred).ravel()
+
+    assert visual.metadata["accuracy"] == pytest.approx(model.score(dataset.X, dataset.Y))
+    assert visual.metadata["matthews"] == pytest.approx(metrics.matthews_corrcoef(dataset.Y, y_pred))
+    assert visual.metadata["precision"] == pytest.approx(metrics.precision_score(dataset.Y, y_pred))
+    assert visual.metadata["recall"] == pytest.approx(metrics.recall_score(dataset.Y, y_pred))
+    assert visual.metadata["ppp"] == pytest.approx(tp / (tp + fp) * 100)
+    assert visual.metadata["specificity"] == pytest.approx(tn / (tn + fp) * 100)
@@ -74,3 +74,30 @@ def test_show_prediction_handles_expressions():
     assert str(html) == anys.AnyContains("100.00%")
 
 
+
+
+def test_shap_elements_store_background_and_reuse_explainer():
+    pytest.importorskip("shap")
+
+    from easul.visual.element import prediction
+    from easul.visual.element.prediction import ShapBeeswarm, ShapWaterfall
+    from easul.tests.example import diabetes_progression_dataset
+    from easul.data import create_input_dataset
+
+    algorithm = diabetes_progression_algorithm()
+    dataset = create_input_dataset(diabetes_progression_dataset(), algorithm.schema, allow_multiple=True)
+
+    visual = Visual(elements=[ShapBeeswarm(), ShapWaterfall()], algorithm=algorithm)
+    visual.metadata.calculate(dataset)
+
+    assert visual.metadata["shap_background"].shape[0] == ShapBeeswarm.sample_size
+    assert visual.metadata["shap_values"].values.shape[0] == dataset.X.shape[0]
+
+    driver = MemoryDriver.from_reference("A1", autocreate=True)
+    prediction._shap_explainers.clear()
+
+    with mock.patch.object(ShapWaterfall, "_create_explainer", autospec=True, side_effect=ShapWaterfall._create_explainer) as create_explainer:
+        visual.render(driver=driver, input_data=prog_input_data)
+        visual.render(driver=driver, input_data=no_prog_input_data)
+
+    assert create_explainer.call_count == 1
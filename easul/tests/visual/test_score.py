@@ -26,4 +26,43 @@ def test_create_factor_bars():
         {"penalty":1, "title":"Uremia", "matched_data":"urea is greater than 19"}
     ], "label":"MED", "ranges": { "LOW": (0, 1), "MED":(2,2), "HIGH":(3,5)}, "data":input_data}
 
-    assert visual.render(algorithm=curb65_score_algorithm(), result=result)
\ No newline at end of file
+    assert visual.render(algorithm=curb65_score_algorithm(), result=result)
+
+def _factor_result(penalties):
+    return {"value": sum(penalties), "matched_factors": [
+        {"penalty": penalty, "title": f"Factor {idx}"} for idx, penalty in enumerate(penalties)
+    ], "label": "MED", "ranges": {"LOW": (0, 1), "MED": (2, 2), "HIGH": (3, 5)}}
+
+
+def test_score_image_with_sprites_matches_drawn_image():
+    import numpy as np
+    from easul.visual.draw.score import InterpretedScoreImage
+    from easul.visual.draw.theme import RedTheme
+
+    for penalties in [[1, 1], [2, 1, 3], [1], []]:
+        result = _factor_result(penalties)
+        pasted = InterpretedScoreImage(RedTheme, 1000, 500).create_image(result)
+        drawn = InterpretedScoreImage(RedTheme, 1000, 500, use_sprites=False).create_image(result)
+
+        assert np.array_equal(np.asarray(pasted), np.asarray(drawn))
+
+
+def test_score_image_memoises_identical_results():
+    from easul.visual.cache import RenderCache, get_render_cache, set_render_cache
+    from easul.visual.draw.score import InterpretedScoreImage
+    from easul.visual.draw.theme import RedTheme
+
+    previous_cache = get_render_cache()
+    cache = RenderCache()
+    set_render_cache(cache)
+
+    try:
+        first = InterpretedScoreImage(RedTheme, 1000, 500).create_encoded_image(_factor_result([2, 1]))
+        second = InterpretedScoreImage(RedTheme, 1000, 500).create_encoded_image(_factor_result([2, 1]))
+        InterpretedScoreImage(RedTheme, 1000, 500).create_encoded_image(_factor_result([1, 2]))
+    finally:
+        set_render_cache(previous_cache)
+
+    assert first.getvalue() == second.getvalue()
+    assert cache.hits == 1
+    assert cache.misses == 2
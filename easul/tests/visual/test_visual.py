@@ -1,4 +1,8 @@
+import gc
 import os
+import warnings
+
+import pytest
 
 from sklearn.linear_model import LogisticRegression
 from easul.tests.example import prog_input_data
@@ -51,6 +55,20 @@ def test_visual_returns_flattened_elements_including_multi_value_elements():
 
     assert visual.flattened_elements == [element1, element2.elements[0], element2.elements[1], element3]
 
+def test_visual_flattened_elements_follow_changes_to_nested_containers():
+    element1 = Prediction(name="pred", title="Prediction")
+    element2 = Accuracy(name="accu", title="Accuracy")
+    container = Container(name="cont", elements=[element1])
+    visual = Visual(elements=[container])
+
+    assert visual.flattened_elements == [element1]
+
+    container.elements.append(element2)
+    assert visual.flattened_elements == [element1, element2]
+
+    container.elements.remove(element1)
+    assert visual.flattened_elements == [element2]
+
 
 def test_explainer_visual_will_generate_metadata(classifier_dataset):
     np.random.seed(123)
@@ -118,3 +136,80 @@ def test_visual_will_render_html(classifier_dataset):
     context = visual.generate_context(prog_input_data)
     html = visual.render(algorithm=algo, context=context)
     assert html
+
+def test_file_metadata_loads_entries_when_first_accessed():
+    from easul.visual.visual import StoredMetadataEntry
+
+    filename = tempfile.mktemp()
+    file_md = FileMetadata(algorithm=None, visual=None, filename=filename)
+    file_md.replace_data({"fpr": np.array([0.0, 0.5, 1.0]), "roc_auc": 0.75, "explainer": {"weights": [1, 2, 3]}},
+                         provenance={"0:RocCurve": {"keys": ["fpr", "roc_auc"]}})
+    digest = file_md.digest
+    file_md.save()
+
+    metadata2 = FileMetadata(algorithm=None, visual=None, filename=filename)
+    metadata2.load()
+
+    assert isinstance(metadata2.data["fpr"], StoredMetadataEntry)
+    assert isinstance(metadata2.data["explainer"], StoredMetadataEntry)
+    assert metadata2.data["roc_auc"] == 0.75
+    assert metadata2.digest == digest
+    assert metadata2.provenance == {"0:RocCurve": {"keys": ["fpr", "roc_auc"]}}
+
+    assert isinstance(metadata2["fpr"], np.memmap)
+    assert np.array_equal(metadata2["fpr"], [0.0, 0.5, 1.0])
+    assert metadata2["explainer"] == {"weights": [1, 2, 3]}
+    assert isinstance(metadata2.data["explainer"], dict)
+    assert metadata2._reader.closed
+
+    with FileMetadata(algorithm=None, visual=None, filename=filename) as metadata3:
+        metadata3.load()
+        assert not metadata3._reader.closed
+
+    assert metadata3._reader.closed
+    assert metadata3["explainer"] == {"weights": [1, 2, 3]}
+    metadata3.close()
+
+    file_md.save()
+
+    with pytest.raises(SystemError):
+        metadata3["fpr"]
+
+    os.unlink(filename)
+
+def test_file_metadata_is_closed_when_garbage_collected():
+    filename = tempfile.mktemp()
+    file_md = FileMetadata(algorithm=None, visual=None, filename=filename)
+    file_md.replace_data({"explainer": {"weights": [1, 2, 3]}})
+    file_md.save()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+
+        metadata2 = FileMetadata(algorithm=None, visual=None, filename=filename)
+        metadata2.load()
+        del metadata2
+        gc.collect()
+
+    os.unlink(filename)
+
+def test_visual_generates_batch_context_for_each_row():
+    from easul.tests.example import diabetes_progression_algorithm, diabetes_progression_dataset, no_prog_input_data
+    from easul.visual.element.prediction import ProbabilityPlot
+
+    np.random.seed(123)
+    algo = diabetes_progression_algorithm()
+
+    visual = Visual(elements=[
+        Container(elements=[LimeTablePlot(title="Contributions")]),
+        ProbabilityPlot()
+    ], algorithm=algo)
+    visual.metadata.calculate(diabetes_progression_dataset())
+
+    contexts = visual.generate_batch_context([prog_input_data, no_prog_input_data])
+    predictions = algo.model.predict(algo.create_input_dataset(no_prog_input_data).X)
+
+    assert len(contexts) == 2
+    assert [list(context.keys()) for context in contexts] == [["lime_table_plot"], ["lime_table_plot"]]
+    assert contexts[1]["lime_table_plot"]["prediction_label"] == ["No progression", "Progression"][predictions[0]]
+    assert len(contexts[0]["lime_table_plot"]["reasons"]) > 0
@@ -6,7 +6,6 @@ from io import BytesIO
 from itertools import chain
 from uuid import uuid4
 
-import dill
 import pickle
 import numpy as np
 
@@ -135,11 +134,15 @@ def new_id():
     return str(uuid4())
 
 def from_serialized(serialized_data, use_pickle=False) -> "easul.algorithm.Algorithm":
+    import dill
+
     fn = pickle.loads if use_pickle else dill.loads
     return fn(serialized_data)
 
 
 def to_serialized(algo, use_pickle=False):
+    import dill
+
     fn = pickle.dumps if use_pickle else dill.dumps
     return fn(algo)
 
@@ -209,18 +212,96 @@ def string_to_function(value):
     return value() if callable(value) else value
 
 
-def get_current_result(results, current_time, ts_key, sort_field=None, reverse_sort=None):
+def get_current_result(results, current_time, ts_key, sort_field=None, reverse_sort=None, window=timedelta(hours=1)):
     sorted_results = sorted(results, key=lambda x:x[ts_key], reverse=True)
 
     results = list(filter(lambda x: x[ts_key]<=current_time, sorted_results))
 
-    results_in_hour = list(filter(lambda x: x[ts_key]>=current_time - timedelta(hours=1), results))
-    if len(results_in_hour)>0 and sort_field:
-        results = sorted(results_in_hour, key=lambda x: x[sort_field], reverse=reverse_sort)
+    results_in_window = list(filter(lambda x: x[ts_key]>=current_time - window, results))
+    if len(results_in_window)>0 and sort_field:
+        results = sorted(results_in_window, key=lambda x: x[sort_field], reverse=reverse_sort)
 
     return results[0] if len(results)>0 else None
 
 
+class TimeIndex:
+    """
+    Rows ordered by the 'ts_key' timestamp which return the same current result as get_current_result without
+    re-sorting and filtering all of the rows for each call. The row range available at each tick of an IntervalClock
+    can be precomputed so that retrieval for each tick is a lookup.
+    """
+    def __init__(self, rows, ts_key):
+        self.ts_key = ts_key
+        self.rows = sorted(rows, key=lambda x: x[ts_key])
+        self.timestamps = [row[ts_key] for row in self.rows]
+        self._ticks = None
+
+    def precompute_ticks(self, clock, window=timedelta(hours=1)):
+        """
+        Precompute the available row range for each tick of the clock.
+        Args:
+            clock: IntervalClock
+            window: window used to select the current result
+
+        Returns:
+
+        """
+        tick_times = np.datetime64(clock.start_ts, "us") + np.arange(clock.tick_count) * np.timedelta64(clock.increment_by)
+        row_times = np.array(self.timestamps, dtype="datetime64[us]")
+        window = np.timedelta64(window)
+
+        lower = np.searchsorted(row_times, tick_times - window, side="left")
+        upper = np.searchsorted(row_times, tick_times, side="right")
+
+        self._ticks = (clock.start_ts, clock.increment_by, window, lower, upper)
+
+    def row_range(self, current_time, window=timedelta(hours=1)):
+        """
+        Range of rows (start, end) which are within the 'window' before the 'current_time'. All rows before 'end' are
+        available at the current time.
+        Args:
+            current_time:
+            window:
+
+        Returns:
+
+        """
+        from bisect import bisect_left, bisect_right
+
+        if self._ticks:
+            start_ts, increment_by, tick_window, lower, upper = self._ticks
+            tick_idx, remainder = divmod(current_time - start_ts, increment_by)
+
+            if not remainder and 0 <= tick_idx < len(upper) and np.timedelta64(window) == tick_window:
+                return int(lower[tick_idx]), int(upper[tick_idx])
+
+        return bisect_left(self.timestamps, current_time - window), bisect_right(self.timestamps, current_time)
+
+    def current(self, current_time, sort_field=None, reverse_sort=None, window=timedelta(hours=1)):
+        """
+        Get current row (equivalent to get_current_result).
+        Args:
+            current_time:
+            sort_field:
+            reverse_sort:
+            window:
+
+        Returns:
+
+        """
+        from bisect import bisect_left
+
+        lower, upper = self.row_range(current_time, window)
+        if upper == 0:
+            return None
+
+        if sort_field and upper > lower:
+            rows_in_window = sorted(self.rows[lower:upper], key=lambda x: x[self.ts_key], reverse=True)
+            return sorted(rows_in_window, key=lambda x: x[sort_field], reverse=reverse_sort)[0]
+
+        return self.rows[bisect_left(self.timestamps, self.timestamps[upper - 1], 0, upper)]
+
+
 def create_package_class(package_name):
     package_bits = package_name.split(".")
     class_name = package_bits.pop()
@@ -305,38 +386,34 @@ class DeferredItem:
         self.__dict__['plan'] = new_plan
 
 
+class FrozenCatalog(DeferredCatalog):
+    """
+    Read-only catalog used by compiled plans. Attempts to add, replace or remove items raise a SystemError.
+    """
+    def __init__(self, data=None):
+        self.data = dict(data) if data else {}
+
+    def update(self, __m, **kwargs):
+        raise SystemError("Catalog is frozen and cannot be updated")
+
+    def __setitem__(self, key, value):
+        raise SystemError(f"Catalog is frozen so '{key}' cannot be set")
+
+    def __delitem__(self, key):
+        raise SystemError(f"Catalog is frozen so '{key}' cannot be removed")
+
+
 def copy_plan_with_new_sources(original_plan, new_sources):
     """
-    Helper function to copy Plan and introduce new sources for simulation/testing in Jupyter notebooks.
+    Helper function to create a copy-on-write OverlayPlan with new sources for simulation/testing (e.g. in Jupyter
+    notebooks or the LocalEngine). The original plan and its steps are shared and not modified.
     Args:
         original_plan:
-        input_data:
+        new_sources: sources keyed by source name (or step name for steps with embedded sources)
 
     Returns:
 
     """
-    from copy import copy
-    from easul.plan import Plan
-
-    from easul import DeferredItem
-    from easul.util import DeferredCatalog
-
-    plan_copy = Plan(
-        title=original_plan.title,
-        sources=DeferredCatalog(new_sources),
-        schemas=copy(original_plan.schemas),
-        visuals=copy(original_plan.visuals),
-        algorithms=copy(original_plan.algorithms),
-        steps=copy(original_plan.steps),
-        states=copy(original_plan.states),
-        config=copy(original_plan.config)
-    )
-
-    for name, step in plan_copy.steps.items():
-        if hasattr(step, "source") and step.source:
-            if isinstance(step.source, DeferredItem):
-                step.source.replace_plan(plan_copy)
-            else:
-                step.source = new_sources.get(name)
-
-    return plan_copy
\ No newline at end of file
+    from easul.plan import OverlayPlan
+
+    return OverlayPlan(base_plan=original_plan, source_overrides=dict(new_sources))
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from easul.metrics import count_cache
+
+import logging
+LOG = logging.getLogger(__name__)
+
+class RenderCache:
+    """
+    Cache for rendered assets (e.g. PNG images of figures). Keeps the most recently used 'max_items' in memory and
+    optionally persists all assets to files in a 'directory' so that they survive restarts and can be shared between
+    processes.
+    """
+    def __init__(self, max_items=128, directory=None):
+        self.max_items = max_items
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def create_key(*parts):
+        """
+        Create key from the string representations of the supplied parts.
+        Args:
+            *parts:
+
+        Returns:
+
+        """
+        hasher = hashlib.sha256()
+        for part in parts:
+            hasher.update(repr(part).encode("utf-8"))
+            hasher.update(b"\0")
+
+        return hasher.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                count_cache("render", True)
+                return self._items[key]
+
+        value = self._read_file(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                count_cache("render", False)
+                return None
+
+            self.hits += 1
+            count_cache("render", True)
+            self._store_item(key, value)
+
+        return value
+
+    def set(self, key, value:bytes):
+        with self._lock:
+            self._store_item(key, value)
+
+        self._write_file(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items or (self.directory is not None and os.path.exists(self._get_filename(key)))
+
+    def _store_item(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def _get_filename(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def _read_file(self, key):
+        if not self.directory:
+            return None
+
+        try:
+            with open(self._get_filename(key), "rb") as infile:
+                return infile.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, key, value):
+        if not self.directory:
+            return
+
+        filename = self._get_filename(key)
+        temp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            with open(temp_filename, "wb") as outfile:
+                outfile.write(value)
+
+            os.replace(temp_filename, filename)
+        except OSError as ex:
+            LOG.warning(f"Unable to store rendered asset in '{self.directory}': {ex}")
+
+
+_render_cache = RenderCache()
+
+def get_render_cache():
+    return _render_cache
+
+def set_render_cache(cache:RenderCache):
+    """
+    Replace the render cache used by elements (e.g. with one which has a 'directory' to persist assets or with None
+    to disable caching).
+    Args:
+        cache:
+
+    Returns:
+
+    """
+    global _render_cache
+    _render_cache = cache
@@ -1,4 +1,6 @@
-from typing import List
+from functools import lru_cache
+from html import escape
+from typing import List, Dict, Tuple
 
 from attrs import define, field
 
@@ -23,7 +25,8 @@ class MermaidCLIFlowChart:
     route:List = field(factory=list)
     settings = field()
     current_step: Step = field(default=None)
-
+    driver = field(default=None)
+    _route_indexes = field(init=False)
 
     def __attrs_post_init__(self):
         if self.current_step is None:
@@ -32,13 +35,18 @@ class MermaidCLIFlowChart:
             else:
                 self.current_step = self.steps.get(self.route[-1])
 
+        # first position of each step in the route
+        self._route_indexes = {}
+        for idx, step_name in enumerate(self.route):
+            self._route_indexes.setdefault(step_name, idx)
+
     def generate(self):
         chart = self.create_chart()
         filename = self._write_file(chart)
         return self._read_file(filename)
 
     def create_chart(self):
-        checked = []
+        checked = set()
         chart_lines = self._generate_chart_lines(self.start_step, checked, self.settings)
 
         chart_lines.append(self.start_step.name + "[" + self.start_step.title + "]")
@@ -67,15 +75,16 @@ class MermaidCLIFlowChart:
         if step.name in checked:
             return []
 
-        checked.append(step.name)
+        checked.add(step.name)
         lines.append(step.name + "[" + step.title + "]")
 
         if step.name not in self.route and step != self.start_step:
             lines.append("class " + step.name + " non_journey;")
 
         if settings.data_sources is True:
-            if step.data_sources:
-                for idx, data_source in enumerate(step.data_sources):
+            step_data_sources = step.get_data_sources(self.driver)
+            if step_data_sources:
+                for idx, data_source in enumerate(step_data_sources):
                     lines.append(f"ds{idx}_{step.name}[({data_source})]")
                     lines.append(f"ds{idx}_{step.name}.->{step.name}")
 
@@ -85,17 +94,13 @@ class MermaidCLIFlowChart:
             post_arrow = ".->"
             in_route = False
 
-            try:
-                step_idx = self.route.index(step.name)
-                if step_idx < len(self.route) - 1:
-                    if self.route[step_idx + 1] == possible_step.name:
-                        pre_arrow = "== "
-                        post_arrow = "==>"
-
-                        in_route = True
+            step_idx = self._route_indexes.get(step.name)
+            if step_idx is not None and step_idx < len(self.route) - 1:
+                if self.route[step_idx + 1] == possible_step.name:
+                    pre_arrow = "== "
+                    post_arrow = "==>"
 
-            except ValueError:
-                pass
+                    in_route = True
 
             if settings.route_only is True and in_route is False:
                 continue
@@ -119,12 +124,21 @@ class MermaidCLIFlowChart:
         mmd.close()
 
         cmd = "mmdc -i " + str(mmd.name) + " -o " + str(svg.name)
-        os.system(cmd)
+        try:
+            os.system(cmd)
+        finally:
+            os.remove(mmd.name)
+
         return svg.name
 
     def _read_file(self, filename):
-        with open(filename, "r") as svg_file:
-            value = svg_file.read()
+        import os
+
+        try:
+            with open(filename, "r") as svg_file:
+                value = svg_file.read()
+        finally:
+            os.remove(filename)
 
         return str(value)
 
@@ -152,4 +166,272 @@ class MermaidWebFlowChart(MermaidCLIFlowChart):
             </script>
             """
         html = html.replace("__diagram", chart)
-        return html
\ No newline at end of file
+        return html
+
+
+@define(kw_only=True)
+class FlowChartNode:
+    name:str = field()
+    label:str = field()
+    x:float = field()
+    y:float = field()
+    width:float = field()
+    height:float = field()
+    step_name:str = field()
+    is_data_source:bool = field(default=False)
+
+
+@define(kw_only=True)
+class FlowChartEdge:
+    source:str = field()
+    target:str = field()
+    reason:str = field(default=None)
+    path:str = field()
+    label_x:float = field()
+    label_y:float = field()
+    is_data_source:bool = field(default=False)
+
+
+@define(kw_only=True)
+class FlowChartLayout:
+    """
+    Static layout of a plan flowchart. Steps are arranged in layers by their distance from the start step. The layout
+    does not depend on the journey so it is created once and restyled for each journey.
+    """
+    nodes:Dict[str, FlowChartNode] = field()
+    edges:List[FlowChartEdge] = field()
+    width:float = field()
+    height:float = field()
+
+
+NODE_HEIGHT = 36
+NODE_PADDING = 16
+CHAR_WIDTH = 7
+MIN_NODE_WIDTH = 80
+HORIZ_GAP = 30
+LAYER_GAP = 60
+MARGIN = 20
+BACK_EDGE_GAP = 40
+
+
+def get_chart_graph(start_step, data_sources=False, driver=None):
+    """
+    Extract hashable description of the steps reachable from the start step. Each item is a tuple of
+    (name, title, data source titles, links) where links is a tuple of (reason, linked step name) pairs. Steps excluded
+    from the chart are included (as they are linked to) but their links are not followed.
+    Args:
+        start_step:
+        data_sources:
+        driver: optional driver used to obtain any sources overridden for the run
+
+    Returns:
+
+    """
+    from collections import deque
+
+    graph = []
+    queue = deque([start_step])
+    queued = {start_step.name}
+
+    while queue:
+        step = queue.popleft()
+
+        if step.exclude_from_chart:
+            graph.append((step.name, step.title, (), ()))
+            continue
+
+        links = []
+        for reason, possible_step in step.possible_links.items():
+            if possible_step is None:
+                continue
+
+            links.append((reason, possible_step.name))
+
+            if possible_step.name not in queued:
+                queued.add(possible_step.name)
+                queue.append(possible_step)
+
+        step_data_sources = tuple(step.get_data_sources(driver) or ()) if data_sources is True else ()
+        graph.append((step.name, step.title, step_data_sources, tuple(links)))
+
+    return tuple(graph)
+
+
+@lru_cache(maxsize=32)
+def create_chart_layout(graph:Tuple) -> FlowChartLayout:
+    """
+    Create (and cache) the layout for a graph obtained from 'get_chart_graph'.
+    Args:
+        graph:
+
+    Returns:
+
+    """
+    layer_nos = {}
+    for name, title, step_data_sources, links in graph:
+        layer_nos.setdefault(name, 0)
+
+        for reason, linked_name in links:
+            layer_nos.setdefault(linked_name, layer_nos[name] + 1)
+
+    layers = {}
+    for name, title, step_data_sources, links in graph:
+        layer = layers.setdefault(layer_nos[name], [])
+
+        for idx, data_source in enumerate(step_data_sources):
+            layer.append(dict(name=f"ds{idx}_{name}", label=data_source, step_name=name, is_data_source=True))
+
+        layer.append(dict(name=name, label=title or name, step_name=name, is_data_source=False))
+
+    layer_widths = {}
+    for layer_no, layer in layers.items():
+        for node in layer:
+            node["width"] = max(MIN_NODE_WIDTH, len(node["label"]) * CHAR_WIDTH + NODE_PADDING * 2)
+
+        layer_widths[layer_no] = sum([node["width"] for node in layer]) + HORIZ_GAP * (len(layer) - 1)
+
+    max_width = max(layer_widths.values())
+    nodes = {}
+
+    for layer_no, layer in sorted(layers.items()):
+        x = MARGIN + (max_width - layer_widths[layer_no]) / 2
+        y = MARGIN + layer_no * (NODE_HEIGHT + LAYER_GAP)
+
+        for node in layer:
+            nodes[node["name"]] = FlowChartNode(x=x, y=y, height=NODE_HEIGHT, **node)
+            x += node["width"] + HORIZ_GAP
+
+    back_edge_x = MARGIN + max_width + BACK_EDGE_GAP
+    edges = []
+
+    for name, title, step_data_sources, links in graph:
+        for idx in range(len(step_data_sources)):
+            ds_node = nodes[f"ds{idx}_{name}"]
+            edges.append(_create_edge(ds_node, nodes[name], back_edge_x, is_data_source=True))
+
+        for reason, linked_name in links:
+            edges.append(_create_edge(nodes[name], nodes[linked_name], back_edge_x, reason=reason))
+
+    height = MARGIN * 2 + len(layers) * NODE_HEIGHT + (len(layers) - 1) * LAYER_GAP
+    width = back_edge_x + MARGIN
+
+    return FlowChartLayout(nodes=nodes, edges=edges, width=width, height=height)
+
+
+def _create_edge(source_node, target_node, back_edge_x, reason=None, is_data_source=False):
+    if source_node.y == target_node.y and is_data_source:
+        # data sources sit beside their step
+        x1 = source_node.x + source_node.width
+        y1 = y2 = source_node.y + source_node.height / 2
+        x2 = target_node.x
+        path = f"M{x1},{y1} L{x2},{y2}"
+        return FlowChartEdge(source=source_node.name, target=target_node.name, reason=reason, path=path,
+                             label_x=(x1 + x2) / 2, label_y=y1, is_data_source=is_data_source)
+
+    if target_node.y > source_node.y:
+        x1 = source_node.x + source_node.width / 2
+        y1 = source_node.y + source_node.height
+        x2 = target_node.x + target_node.width / 2
+        y2 = target_node.y
+        y_mid = (y1 + y2) / 2
+        path = f"M{x1},{y1} C{x1},{y_mid} {x2},{y_mid} {x2},{y2}"
+        label_x, label_y = (x1 + x2) / 2, y_mid
+    else:
+        # links back to earlier (or the same) layer are routed around the right of the chart
+        x1 = source_node.x + source_node.width
+        y1 = source_node.y + source_node.height / 2
+        x2 = target_node.x + target_node.width
+        y2 = target_node.y + target_node.height / 2
+        path = f"M{x1},{y1} C{back_edge_x},{y1} {back_edge_x},{y2} {x2},{y2}"
+        label_x, label_y = (x1 + x2) / 8 + back_edge_x * 3 / 4, (y1 + y2) / 2
+
+    return FlowChartEdge(source=source_node.name, target=target_node.name, reason=reason, path=path,
+                         label_x=label_x, label_y=label_y, is_data_source=is_data_source)
+
+
+@define(kw_only=True)
+class SvgFlowChart(MermaidCLIFlowChart):
+    """
+    Draw flowchart as inline SVG using a pure Python layout. Does not require any external tools. The layout of the
+    plan is cached so rendering for a journey only applies the styling for its route and current step.
+    """
+    styles = """
+        .easul-flowchart text { font-family: sans-serif; font-size: 12px; text-anchor: middle; dominant-baseline: middle; }
+        .easul-flowchart .node rect { fill: #ececff; stroke: #9370db; stroke-width: 1px; }
+        .easul-flowchart .node text { fill: #333; }
+        .easul-flowchart .node.current rect { fill: #0ae; stroke: #333; stroke-width: 4px; }
+        .easul-flowchart .node.current text { fill: white; }
+        .easul-flowchart .node.journey rect { fill: #9cf; stroke: #88d; stroke-width: 2px; }
+        .easul-flowchart .node.journey text { fill: #88d; }
+        .easul-flowchart .node.non_journey rect { fill: #eee; stroke: #ccc; stroke-width: 1px; }
+        .easul-flowchart .node.non_journey text { fill: #aaaaaa; }
+        .easul-flowchart .node.data_source rect { rx: 12px; fill: #fff; stroke: #999; stroke-dasharray: 3 3; }
+        .easul-flowchart .edge { fill: none; stroke: #333; stroke-width: 1px; stroke-dasharray: 3 3; }
+        .easul-flowchart .edge.route { stroke-width: 3px; stroke-dasharray: none; }
+        .easul-flowchart .edge_label { fill: #555; font-size: 11px; }
+    """
+
+    def generate(self):
+        return self.create_chart()
+
+    def create_chart(self):
+        layout = create_chart_layout(get_chart_graph(self.start_step, self.settings.data_sources, self.driver))
+
+        transitions = set(zip(self.route, self.route[1:]))
+        route_steps = set(self.route)
+        current_name = self.current_step.name if self.current_step else None
+
+        shown_steps = None
+        if self.settings.route_only is True:
+            shown_steps = route_steps | {self.start_step.name}
+
+        lines = [f"<svg xmlns=\"http://www.w3.org/2000/svg\" class=\"easul-flowchart\" "
+                 f"viewBox=\"0 0 {layout.width} {layout.height}\" width=\"{layout.width}\" height=\"{layout.height}\">",
+                 f"<style>{self.styles}</style>",
+                 "<defs><marker id=\"easul-arrow\" viewBox=\"0 0 10 10\" refX=\"10\" refY=\"5\" markerWidth=\"6\" "
+                 "markerHeight=\"6\" orient=\"auto-start-reverse\"><path d=\"M0,0 L10,5 L0,10 z\"/></marker></defs>"]
+
+        for edge in layout.edges:
+            in_route = (edge.source, edge.target) in transitions
+
+            if shown_steps is not None:
+                if edge.is_data_source and edge.target not in shown_steps:
+                    continue
+
+                if not edge.is_data_source and in_route is False:
+                    continue
+
+            css_class = "edge route" if in_route else "edge"
+            lines.append(f"<path class=\"{css_class}\" d=\"{edge.path}\" marker-end=\"url(#easul-arrow)\"/>")
+
+            if edge.reason:
+                lines.append(f"<text class=\"edge_label\" x=\"{edge.label_x}\" y=\"{edge.label_y}\">{escape(edge.reason)}</text>")
+
+        for node in layout.nodes.values():
+            if shown_steps is not None and node.step_name not in shown_steps:
+                continue
+
+            css_class = "node " + self._get_node_class(node, route_steps, current_name)
+            lines.append(f"<g class=\"{css_class.strip()}\" data-step=\"{escape(node.step_name)}\">"
+                         f"<rect x=\"{node.x}\" y=\"{node.y}\" width=\"{node.width}\" height=\"{node.height}\"/>"
+                         f"<text x=\"{node.x + node.width / 2}\" y=\"{node.y + node.height / 2}\">{escape(node.label)}</text></g>")
+
+        lines.append("</svg>")
+
+        return "".join(lines)
+
+    def _get_node_class(self, node, route_steps, current_name):
+        if node.is_data_source:
+            return "data_source"
+
+        if node.name == current_name:
+            return "current"
+
+        if node.name in route_steps:
+            return "journey"
+
+        if node.name != self.start_step.name:
+            return "non_journey"
+
+        return ""
+
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from PIL import Image, ImageDraw, ImageColor
 
 from easul.util import Utf8EncodedImage
@@ -5,11 +7,54 @@ from .style import suggest_text_color_from_fill, wrap_text_in_space
 
 import logging
 LOG = logging.getLogger(__name__)
+@lru_cache(maxsize=256)
+def _create_block_sprite(colour, line_colour, block_width, block_height, penalty, line_width):
+    # block for a single factor (including interstitial lines) drawn at the origin so that it can be pasted into
+    # score images. The sprite is one pixel wider/taller than the block as PIL rectangles include their end points.
+    sprite = Image.new(mode="RGB", size=(block_width * penalty + 1, block_height + 1), color=(255, 255, 255))
+    draw = ImageDraw.Draw(sprite)
+    draw.rectangle(((0, 0), (block_width * penalty, block_height)), fill=colour)
+
+    if line_colour is None:
+        return sprite
+
+    for item in range(1, penalty + 1):
+        draw.line(((block_width * item, 0), (block_width * item, block_height)), fill=line_colour, width=line_width)
+
+    return sprite
+
 class InterpretedScoreImage:
-    def __init__(self, theme, max_width, max_height):
+    def __init__(self, theme, max_width, max_height, use_sprites=True):
         self.theme = theme
         self.max_width = max_width
         self.max_height = max_height
+        self.use_sprites = use_sprites
+
+    def _get_line_colour(self, idx):
+        r, g, b = ImageColor.getcolor(self.theme.bg_colours[idx], "RGB")
+
+        return r - self.theme.line_darken_amount, g - self.theme.line_darken_amount, b - self.theme.line_darken_amount
+
+    def _can_paste_score_blocks(self):
+        # sprites give identical output when blocks sit on whole pixels and the lines which spill over the end of
+        # each block are hidden under the containing bars
+        return self.use_sprites is True and isinstance(self.theme.single_block_width, int) \
+               and self.theme.outer_line_width >= self.theme.single_line_width
+
+    def _paste_score_blocks(self, im, result):
+        idx = self.theme.pallete_start
+        block_height = self.theme.single_block_height - self.theme.outer_line_width
+
+        xpos = self.theme.outer_line_width
+
+        for f in result["matched_factors"]:
+            line_colour = self._get_line_colour(idx) if self.theme.show_interstial_lines else None
+            sprite = _create_block_sprite(self.theme.bg_colours[idx], line_colour, self.theme.single_block_width,
+                                          block_height, f["penalty"], self.theme.single_line_width)
+            im.paste(sprite, (xpos, 0))
+
+            xpos = xpos + (self.theme.single_block_width * f["penalty"])
+            idx += 1
 
     def _draw_score_blocks(self, draw, result):
         idx = self.theme.pallete_start
@@ -31,11 +76,7 @@ class InterpretedScoreImage:
 
         # draw interstitial lines using a darkened version of the COLOURS
         for f in result["matched_factors"]:
-            r, g, b = ImageColor.getcolor(self.theme.bg_colours[idx], "RGB")
-            #
-            r -= self.theme.line_darken_amount
-            g -= self.theme.line_darken_amount
-            b -= self.theme.line_darken_amount
+            r, g, b = self._get_line_colour(idx)
             for item in range(0, f["penalty"]):
                 draw.line(((xpos + self.theme.single_block_width, 0), (xpos + self.theme.single_block_width, block_height)), fill=(r, g, b), width=self.theme.single_line_width)
                 xpos = xpos + self.theme.single_block_width
@@ -122,18 +163,39 @@ class InterpretedScoreImage:
             # draw.line(((x_end - 6, self.theme.single_block_height + 6), (x_end, self.theme.single_block_height)), fill="black",
             #           width=3)
 
-    def create_encoded_image(self, result):
-        img = Utf8EncodedImage()
+    def _get_render_cache_key(self, result):
+        from easul.visual.cache import RenderCache
+
+        theme_values = {name: getattr(self.theme, name) for name in dir(self.theme) if not name.startswith("_")}
+        font = theme_values.pop("font", None)
+        factors = [(f["penalty"], f.get("title")) for f in result["matched_factors"]]
+
+        return RenderCache.create_key(self.__class__.__name__, sorted(theme_values.items()),
+                                      getattr(font, "path", None), getattr(font, "size", None),
+                                      self.max_width, self.max_height, factors, result.get("ranges"))
+
+    def create_image(self, result):
+        """
+        Create score image for the result (without encoding it).
+        Args:
+            result:
 
+        Returns:
+            PIL image
+        """
         if self.theme.expand_blocks:
             self.theme.single_block_width = self.max_width / self.theme.max_score
 
         im = Image.new(mode="RGB",
                        size=(self.max_width + (self.theme.outer_line_width * 2), self.max_height + self.theme.outer_line_width),
                        color=(255, 255, 255))
-        draw = ImageDraw.Draw(im)
 
-        self._draw_score_blocks(draw, result)
+        if self._can_paste_score_blocks():
+            self._paste_score_blocks(im, result)
+            draw = ImageDraw.Draw(im)
+        else:
+            draw = ImageDraw.Draw(im)
+            self._draw_score_blocks(draw, result)
 
         self._draw_containing_bars(draw, result)
 
@@ -142,8 +204,30 @@ class InterpretedScoreImage:
         if result.get("ranges"):
             self._draw_score_ranges(draw, result)
 
-        im.save(img, format="PNG")
+        return im
 
-        return img
+    def create_encoded_image(self, result):
+        from easul.visual.cache import get_render_cache
+
+        img = Utf8EncodedImage()
+
+        if self.theme.expand_blocks:
+            self.theme.single_block_width = self.max_width / self.theme.max_score
+
+        # identical results (e.g. the same matched factors) produce identical images so the PNG is memoised
+        cache = get_render_cache()
+        cache_key = self._get_render_cache_key(result) if cache is not None else None
 
+        if cache_key:
+            image_data = cache.get(cache_key)
+            if image_data is not None:
+                img.write(image_data)
+                return img
 
+        im = self.create_image(result)
+        im.save(img, format="PNG")
+
+        if cache_key:
+            cache.set(cache_key, img.getvalue())
+
+        return img
@@ -7,7 +7,7 @@ from stringcase import snakecase
 
 from easul.error import VisualDataMissing
 from easul.util import Utf8EncodedImage
-from easul.visual.render import from_html_template
+from easul.visual.render import from_html_template, iter_html_template
 from easul.visual.draw.style import suggest_text_color_from_fill
 
 LIST_TYPES = ["options","list","category"]
@@ -69,6 +69,15 @@ class Element:
     def metadata_type(self):
         return snakecase(self.__class__.__name__)
 
+    @property
+    def config_digest(self):
+        """
+        Digest of the element configuration (its attrs field values, including those of nested elements). Unlike
+        repr() it does not contain memory addresses so it is the same in different processes.
+        """
+        import hashlib
+        return hashlib.sha256(repr(get_config_value(self)).encode("utf-8")).hexdigest()
+
     @classmethod
     def is_correct_algorithm(cls, algorithm):
         return True
@@ -78,6 +87,19 @@ class Element:
         context = self._get_context(**kwargs)
         return from_html_template(self.html_template, context)
 
+    def iter_create(self, **kwargs):
+        """
+        Create element output as a generator of HTML chunks. Template based elements are streamed from the template,
+        other elements yield the output from create().
+        """
+        if type(self).create is Element.create and self.html_template:
+            yield from iter_html_template(self.html_template, self._get_context(**kwargs))
+            return
+
+        content = self.create(**kwargs)
+        if content:
+            yield str(content)
+
     def render_content_start(self, **kwargs):
         pass
 
@@ -101,6 +123,26 @@ class Element:
     def generate_context(self, algorithm, input_data, visual, **kwargs):
         pass
 
+    def generate_batch_context(self, algorithm, input_data, visual, **kwargs):
+        """
+        Generate context for each row of a MultiDataInput. Elements which can process all of the rows together
+        override this, otherwise generate_context() is called for each row.
+        Args:
+            algorithm:
+            input_data:
+            visual:
+            **kwargs:
+
+        Returns:
+            list containing a context (or None) for each row
+        """
+        rows = input_data.data.to_dict("records")
+
+        if type(self).generate_context is Element.generate_context:
+            return [None] * len(rows)
+
+        return [self.generate_context(algorithm=algorithm, input_data=row, visual=visual, **kwargs) for row in rows]
+
 @define(kw_only=True)
 class Container(Element):
     elements = field(factory=list)
@@ -112,23 +154,41 @@ class Container(Element):
         :param form:
         :return:
         """
-        output = []
+        return "".join(self.iter_create(**kwargs))
 
+    def iter_create(self, **kwargs):
         start = self.render_content_start()
         if start:
-            output.append(start)
+            yield str(start)
 
-        body = self.render_content_body(**kwargs)
+        if type(self).render_content_body is Container.render_content_body:
+            yield from self._iter_content_children(**kwargs)
+        else:
+            body = self.render_content_body(**kwargs)
 
-        if body:
-            output.append(body)
+            if body:
+                yield str(body)
 
         end = self.render_content_end()
 
         if end:
-            output.append(end)
+            yield str(end)
+
+    def _iter_content_children(self, **kwargs):
+        if self.elements is None:
+            return
+
+        for child_element in self.elements:
+            before = self.before_add_child(child_element)
+            if before:
+                yield str(before)
 
-        return "".join(output)
+            yield from child_element.iter_create(**kwargs)
+
+            after = self.after_add_child(child_element)
+
+            if after:
+                yield str(after)
 
     def render_content_body(self, **kwargs):
         """
@@ -140,27 +200,7 @@ class Container(Element):
         :param form:
         :return:
         """
-        child_elements = self.elements
-        if child_elements is None:
-            return ""
-
-        content_list = []
-        for child_element in child_elements:
-            before = self.before_add_child(child_element)
-            if before:
-                content_list.append(before)
-
-            content = child_element.create(**kwargs)
-
-            if content:
-                content_list.append(content)
-
-            after = self.after_add_child(child_element)
-
-            if after:
-                content_list.append(after)
-
-        return "".join(content_list)
+        return "".join(self._iter_content_children(**kwargs))
 
     def before_add_child(self, child_element):
         """
@@ -201,6 +241,18 @@ class Container(Element):
 
         return ctx
 
+    def generate_batch_context(self, algorithm, input_data, visual, **kwargs):
+        contexts = [{} for _ in range(input_data.data.shape[0])]
+
+        for element in self.elements:
+            element_contexts = element.generate_batch_context(algorithm=algorithm, input_data=input_data, visual=visual, **kwargs)
+
+            for ctx, element_ctx in zip(contexts, element_contexts):
+                if element_ctx:
+                    ctx.update(element_ctx)
+
+        return contexts
+
 
 # class InterpretElement(Element):
 #     """
@@ -325,9 +377,6 @@ class ValueElement(Element):
 
         return str(doc)
 
-    def generate_context(self, **kwargs):
-        pass
-
 @define(kw_only=True)
 class EncodedImageElement(Element):
     html_template = "encoded_image.html"
@@ -341,6 +390,7 @@ class FigureElement(EncodedImageElement):
     width:int = field(default=3)
     height:int = field(default=3)
     font_size:int = field(default=8)
+    use_render_cache:bool = field(default=True)
 
     def _new_figure(self)->"matplotlib.pyplot.Figure":
         # Figure object is created explicitly instead of through plt.figure() due to:
@@ -380,6 +430,18 @@ class FigureElement(EncodedImageElement):
         pass
 
     def _draw_b64_encoded_image(self, **kwargs):
+        from easul.visual.cache import get_render_cache
+
+        cache = get_render_cache()
+        cache_key = self._get_render_cache_key(**kwargs) if cache is not None else None
+
+        if cache_key:
+            image_data = cache.get(cache_key)
+            if image_data is not None:
+                img = self._new_image(**kwargs)
+                img.write(image_data)
+                return img
+
         img = self._new_image(**kwargs)
 
         figure = self._create_figure(**kwargs)
@@ -388,12 +450,104 @@ class FigureElement(EncodedImageElement):
 
 
         self._store_figure_to_image(figure, img)
+
+        if cache_key:
+            cache.set(cache_key, img.getvalue())
+
         return img
 
+    def _get_render_cache_key(self, visual=None, algorithm=None, result=None, input_data=None, **kwargs):
+        # figure output depends on the element config and metadata, plus the result/input data for row scope elements.
+        # elements without a known scope may depend on anything so are not cached.
+        scope = getattr(self, "scope", None)
+        if self.use_render_cache is False or scope not in [MODEL_SCOPE, ROW_SCOPE, EITHER_SCOPE]:
+            return None
+
+        metadata = getattr(visual, "metadata", None)
+        metadata_digest = metadata.digest if metadata is not None and metadata.init else None
+        algorithm_digest = getattr(algorithm, "unique_digest", None)
+
+        if metadata_digest is None and algorithm_digest is None:
+            return None
+
+        row_digest = None
+        if scope != MODEL_SCOPE:
+            if result is None and input_data is None:
+                return None
+
+            row_digest = _get_row_digest(result, input_data)
+            if row_digest is None:
+                return None
+
+        from easul.visual.cache import RenderCache
+        return RenderCache.create_key(self.__class__.__module__, self.__class__.__qualname__, self.config_digest,
+                                      metadata_digest, algorithm_digest, row_digest)
+
     def _store_figure_to_image(self, figure, img):
         figure.savefig(img, format="PNG", transparent=True, bbox_inches='tight')
         return img
 
+def get_config_value(value, _seen=None):
+    """
+    Convert configuration value into a structure of builtin types with a stable repr. attrs classes (e.g. elements)
+    are converted into their init field values, functions and classes into their qualified names and other objects
+    into their class name and attributes.
+    Args:
+        value:
+
+    Returns:
+
+    """
+    import attrs
+    import enum
+    import inspect
+
+    if value is None or isinstance(value, (bool, int, float, str, bytes, enum.Enum)):
+        return value
+
+    if inspect.isroutine(value) or inspect.isclass(value):
+        return getattr(value, "__module__", None), getattr(value, "__qualname__", repr(value))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(get_config_value(item, _seen) for item in value)
+
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(get_config_value(item, _seen)) for item in value))
+
+    if isinstance(value, dict):
+        return tuple(sorted((repr(key), get_config_value(item, _seen)) for key, item in value.items()))
+
+    _seen = _seen if _seen is not None else set()
+    if id(value) in _seen:
+        return "<recursive>"
+
+    _seen.add(id(value))
+    value_type = type(value)
+    type_name = (value_type.__module__, value_type.__qualname__)
+
+    try:
+        if attrs.has(value_type):
+            return type_name, tuple((item_field.name, get_config_value(getattr(value, item_field.name, None), _seen))
+                                    for item_field in attrs.fields(value_type) if item_field.init)
+
+        if hasattr(value, "__dict__"):
+            return type_name, get_config_value(vars(value), _seen)
+
+        return type_name, repr(value)
+    finally:
+        _seen.discard(id(value))
+
+def _get_row_digest(result, input_data):
+    import hashlib
+    import pickle
+    from easul.util import to_serialized
+
+    try:
+        return hashlib.sha256(to_serialized((result, input_data))).hexdigest()
+    except (TypeError, AttributeError, pickle.PicklingError):
+        LOG.debug("Unable to create digest of result/input data for render cache")
+        return None
+
 from colour import Color
 import math
 class TrafficLightSwatch:
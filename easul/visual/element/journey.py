@@ -1,7 +1,7 @@
 from attr import field, define
 
 from easul.util import get_start_step
-from easul.visual.draw.flowchart import JourneyChartSettings, MermaidCLIFlowChart
+from easul.visual.draw.flowchart import JourneyChartSettings, SvgFlowChart
 from easul.visual.element import Element
 
 @define(kw_only=True)
@@ -11,7 +11,7 @@ class JourneyMap(Element):
     start_step:str = field(metadata={"help":"Start step for logic map"}, default=None)
     after_route:bool = field(default=False, metadata = {"help": "Show possible routes following current step"})
     help = "Journey map showing what step and stage journey is currently at"
-    flowchart_cls = field(default=MermaidCLIFlowChart)
+    flowchart_cls = field(default=SvgFlowChart)
 
     def create(self, *args, steps, step, driver, **kwargs):
         route = driver.get_route()
@@ -21,6 +21,6 @@ class JourneyMap(Element):
                                         data_sources=self.data_sources,
                                         after_route=self.after_route)
 
-        chart = self.flowchart_cls(steps=steps, start_step=start_step, route=route, settings=settings)
+        chart = self.flowchart_cls(steps=steps, start_step=start_step, route=route, settings=settings, driver=driver)
 
         return chart.generate()
@@ -1,7 +1,6 @@
 from abc import abstractmethod
 
 from attr import field, define
-from scipy.stats import pearsonr
 
 from easul.error import VisualDataMissing
 from easul.visual.element import FigureElement, ValueElement, MODEL_SCOPE
@@ -14,12 +13,12 @@ class RocCurve(FigureElement):
         from easul.algorithm import PredictiveAlgorithm, PredictiveTypes
         return isinstance(algorithm, PredictiveAlgorithm) and algorithm.model_type == PredictiveTypes.CLASSIFICATION
 
-    def generate_metadata(self, algorithm, dataset, **kwargs):
+    def generate_metadata(self, algorithm, dataset, prediction_context=None, **kwargs):
         from sklearn import metrics
+        from easul.algorithm.predictive import get_prediction_context
 
-        probs = algorithm.model.predict_proba(dataset.X)
-        preds = probs[:, 1]
-        fpr, tpr, _ = metrics.roc_curve(dataset.Y, preds)
+        context = get_prediction_context(algorithm, dataset, prediction_context)
+        fpr, tpr, _ = metrics.roc_curve(context.y_true, context.y_pos_probs)
         roc_auc = metrics.auc(fpr, tpr)
 
         return {"fpr": fpr, "tpr": tpr, "roc_auc":roc_auc}
@@ -56,11 +55,11 @@ class ClassificationValueElement(ValueElement):
         return visual.metadata.get(self.metadata_type)
 
     @abstractmethod
-    def calculate_value(self, algorithm, dataset):
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
         pass
 
-    def generate_metadata(self, algorithm, dataset, **kwargs):
-        return {self.metadata_type:self.calculate_value(algorithm, dataset)}
+    def generate_metadata(self, algorithm, dataset, prediction_context=None, **kwargs):
+        return {self.metadata_type:self.calculate_value(algorithm, dataset, prediction_context=prediction_context)}
 
 @define(kw_only=True)
 class Accuracy(ClassificationValueElement):
@@ -72,8 +71,9 @@ class Accuracy(ClassificationValueElement):
     suffix = field(default="%")
     expression = field(default="value *100")
 
-    def calculate_value(self, algorithm, dataset):
-        return algorithm.model.score(dataset.X, dataset.Y)
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
+        return get_prediction_context(algorithm, dataset, prediction_context).score
 
     @classmethod
     def is_correct_algorithm(cls, algorithm):
@@ -84,10 +84,12 @@ class Accuracy(ClassificationValueElement):
 class BalancedAccuracy(Accuracy):
     help = "Show balanced accuracy of algorithm result"
 
-    def calculate_value(self, algorithm, dataset):
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
         from sklearn.metrics import balanced_accuracy_score
-        y_pred = algorithm.model.predict(dataset.X)
-        return balanced_accuracy_score(dataset.Y, y_pred, adjusted=True)
+        from easul.algorithm.predictive import get_prediction_context
+
+        context = get_prediction_context(algorithm, dataset, prediction_context)
+        return balanced_accuracy_score(context.y_true, context.y_pred, adjusted=True)
 
 
 class Matthews(ClassificationValueElement):
@@ -97,10 +99,9 @@ class Matthews(ClassificationValueElement):
     end_range = 1
     step_size = 0.2
 
-    def calculate_value(self, algorithm, dataset):
-        from sklearn import metrics
-        preds = algorithm.model.predict(dataset.X)
-        return metrics.matthews_corrcoef(dataset.Y, preds)
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
+        return get_prediction_context(algorithm, dataset, prediction_context).matthews_corrcoef
 
 @define(kw_only=True)
 class FalseValue(ClassificationValueElement):
@@ -111,33 +112,27 @@ class FalseValue(ClassificationValueElement):
     step_size = 10
     suffix = field(default="%")
 
-    def calculate_value(self, algorithm, dataset):
-        preds = algorithm.model.predict(dataset.X)
+    false_cell = None
 
-        fv = 0
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
 
-        for idx, pred in enumerate(preds):
-            fv+=self._compare_actual_and_predicted(dataset.Y[idx], pred)
+        context = get_prediction_context(algorithm, dataset, prediction_context)
+        fv = context.confusion_counts[self.false_cell]
 
-        tests = dataset.dataset.shape[0]
+        tests = len(context.y_true)
         return (fv/tests) * 100
 
-    @abstractmethod
-    def _compare_actual_and_predicted(self, actual, predicted):
-        pass
-
 class FalseNegatives(FalseValue):
     help = " % false negatives from algorithm result"
 
-    def _compare_actual_and_predicted(self, actual, predicted):
-        return 1 if predicted == 0 and actual == 1 else 0
+    false_cell = "fn"
 
 
 class FalsePositives(FalseValue):
     help = "Show % false positives from algorithm result"
 
-    def _compare_actual_and_predicted(self, actual, predicted):
-        return 1 if predicted == 1 and actual == 0 else 0
+    false_cell = "fp"
 
 @define(kw_only=True)
 class SSValue(ClassificationValueElement):
@@ -146,47 +141,31 @@ class SSValue(ClassificationValueElement):
     step_size = 10
     suffix = field(default="%")
 
+    # confusion matrix cells ('tn', 'fp', 'fn' or 'tp') used to calculate the value
+    numerator_cell = None
+    part_denom_cell = None
 
-    def _true_negative(self, actual, pred):
-        return 1 if pred == 0 and actual==0 else 0
-
-    def _false_negative(self, actual, pred):
-        return 1 if pred == 0 and actual == 1 else 0
-
-    def _true_positive(self, actual, pred):
-        return 1 if pred == 1 and actual == 1 else 0
-
-    def _false_positive(self, actual, pred):
-        return 1 if pred == 1 and actual == 0 else 0
-
-    numerator_fn = None
-    part_denom_fn = None
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
 
-    def calculate_value(self, algorithm, dataset):
-        preds = algorithm.model.predict(dataset.X)
+        context = get_prediction_context(algorithm, dataset, prediction_context)
+        ratio = context.ratio(self.numerator_cell, self.part_denom_cell)
 
-
-        numer = 0
-        part_denom = 0
-
-        for idx, pred in enumerate(preds):
-            numer += self.numerator_fn(dataset.Y[idx], pred)
-            part_denom += self.part_denom_fn(dataset.Y[idx], pred)
-
-        if numer == 0 and part_denom == 0:
+        if ratio is None:
             import logging
             logging.warning("Numerator and denominator are both zero in " + self.__class__.__name__)
             return ""
 
-        return (numer / (numer+part_denom)) * 100
+        return ratio * 100
 
 class ConfusionMatrix(FigureElement):
-    def generate_metadata(self, algorithm, dataset, **kwargs):
+    def generate_metadata(self, algorithm, dataset, prediction_context=None, **kwargs):
         from sklearn import metrics
+        from easul.algorithm.predictive import get_prediction_context
 
-        y_pred = algorithm.model.predict(dataset.X)
+        context = get_prediction_context(algorithm, dataset, prediction_context)
 
-        return {"confusion_matrix":metrics.confusion_matrix(dataset.Y, y_pred)}
+        return {"confusion_matrix":metrics.confusion_matrix(context.y_true, context.y_pred)}
 
     def _create_figure(self, algorithm, **kwargs):
         if self.layout.metadata.init is False:
@@ -201,29 +180,29 @@ class ConfusionMatrix(FigureElement):
 class Ppp(SSValue):
     help = "Show positive predictive power (% predicted positive which are actually positive)"
 
-    numerator_fn = SSValue._true_positive
-    part_denom_fn = SSValue._false_positive
+    numerator_cell = "tp"
+    part_denom_cell = "fp"
 
 
 class Npp(SSValue):
     help = "Show negative predictive power (% predicted negative which are actually negative)"
 
-    numerator_fn = SSValue._true_negative
-    part_denom_fn = SSValue._false_negative
+    numerator_cell = "tn"
+    part_denom_cell = "fn"
 
 
 class Sensitivity(SSValue):
     help = "Show sensitivity (% correctly positive out of all positives)"
 
-    numerator_fn = SSValue._true_positive
-    part_denom_fn = SSValue._false_negative
+    numerator_cell = "tp"
+    part_denom_cell = "fn"
 
 
 class Specificity(SSValue):
     help = "Show specificity (% correctly negative out of all negatives)"
 
-    numerator_fn = SSValue._true_negative
-    part_denom_fn = SSValue._false_positive
+    numerator_cell = "tn"
+    part_denom_cell = "fp"
 
 
 @define(kw_only=True)
@@ -264,11 +243,14 @@ class Correlation(MultiValueContainer):
         r2_element.end_range = 1
         r2_element.step_size = 0.1
 
-    def generate_metadata(self, algorithm, dataset, **kwargs):
-        Y_actual = dataset.Y
-        Y_pred = algorithm.model.predict(dataset.X)
+    def generate_metadata(self, algorithm, dataset, prediction_context=None, **kwargs):
+        from easul.algorithm.predictive import get_prediction_context
+
+        context = get_prediction_context(algorithm, dataset, prediction_context)
 
-        r, p_value = pearsonr(Y_actual, Y_pred)
+        from scipy.stats import pearsonr
+
+        r, p_value = pearsonr(context.y_true, context.y_pred)
 
         return {"r2":(r * r), "p_range":determine_p_range(p_value)}
 
@@ -288,18 +270,18 @@ class ModelScore(ClassificationValueElement):
     end_range = 100
     step_size = 10
 
-    def calculate_value(self, algorithm, dataset):
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
         from sklearn import metrics
-        y_pred = algorithm.model.predict(dataset.X)
-        y_probs = algorithm.model.predict_proba(dataset.X)
-        y_pos_probs = y_probs[:, 1]
+        from easul.algorithm.predictive import get_prediction_context
+
+        context = get_prediction_context(algorithm, dataset, prediction_context)
 
-        accuracy = metrics.accuracy_score(dataset.Y, y_pred)
-        bal_accuracy = metrics.balanced_accuracy_score(dataset.Y, y_pred, adjusted=True)
-        mcorr = metrics.matthews_corrcoef(dataset.Y, y_pred)
+        accuracy = context.accuracy
+        bal_accuracy = metrics.balanced_accuracy_score(context.y_true, context.y_pred, adjusted=True)
+        mcorr = context.matthews_corrcoef
 
 
-        fpr, tpr, _ = metrics.roc_curve(dataset.Y, y_pos_probs)
+        fpr, tpr, _ = metrics.roc_curve(context.y_true, context.y_pos_probs)
         roc_auc = metrics.auc(fpr, tpr)
 
         #TODO not sure this is full working
@@ -309,24 +291,23 @@ class ModelScore(ClassificationValueElement):
         return int((score/4) * 100)
 
 
-from sklearn.metrics import precision_score, recall_score
-
-
 class Precision(ClassificationValueElement):
 
-    def calculate_value(self, algorithm, dataset):
-        y_pred = algorithm.model.predict(dataset.X)
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
+        precision = get_prediction_context(algorithm, dataset, prediction_context).ratio("tp", "fp")
 
-        return precision_score(dataset.Y, y_pred)
+        return 0.0 if precision is None else precision
 
 import logging
 LOG = logging.getLogger(__name__)
 class Recall(ClassificationValueElement):
 
-    def calculate_value(self, algorithm, dataset):
-        y_pred = algorithm.model.predict(dataset.X)
+    def calculate_value(self, algorithm, dataset, prediction_context=None):
+        from easul.algorithm.predictive import get_prediction_context
+        recall = get_prediction_context(algorithm, dataset, prediction_context).ratio("tp", "fn")
 
-        return recall_score(dataset.Y, y_pred)
+        return 0.0 if recall is None else recall
 
 
 
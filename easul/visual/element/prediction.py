@@ -19,17 +19,77 @@ class ExplainerMixin:
     def _create_explainer(self, algorithm):
         pass
 
+_shap_explainers = {}
+SHAP_EXPLAINER_CACHE_SIZE = 16
+
 class ShapExplainerMixin(ExplainerMixin):
+    """
+    SHAP support for elements. The background sample used by the explainer (and for model scope the SHAP values for
+    the metadata dataset) are stored in the visual metadata. Explainers are created once per algorithm digest and
+    background sample and then re-used.
+    """
     explainer_type = "shap"
     sample_size = 100
 
-    def _create_explainer(self, algorithm):
+    def _create_background(self, dataset):
+        import shap
+
+        return shap.utils.sample(dataset.X, self.sample_size)
+
+    def _create_explainer(self, algorithm, background):
         import shap
 
-        X = shap.utils.sample(algorithm.dataset.X, self.get_setting("sample_size",100))
+        feature_names = [algorithm.schema[x_name].get("help", x_name) for x_name in algorithm.schema.x_names]
+        return shap.Explainer(algorithm.model.predict, masker=background, feature_names = feature_names)
+
+    def _get_explainer(self, algorithm, visual):
+        from easul.visual.visual import get_value_digest
+
+        if "shap_background" not in visual.metadata:
+            raise VisualDataMissing(self, "metadata")
+
+        cache_key = (algorithm.unique_digest, get_value_digest(visual.metadata.data["shap_background"]))
 
-        feature_names = [algorithm.schema[x_name].get("help") for x_name in algorithm.schema.x_names]
-        return shap.Explainer(algorithm.model.predict, masker=X, feature_names = feature_names)
+        explainer = _shap_explainers.get(cache_key)
+        if explainer is None:
+            explainer = self._create_explainer(algorithm, visual.metadata["shap_background"])
+
+            if len(_shap_explainers) >= SHAP_EXPLAINER_CACHE_SIZE:
+                del _shap_explainers[next(iter(_shap_explainers))]
+
+            _shap_explainers[cache_key] = explainer
+
+        return explainer
+
+    def _get_model_shap_values(self, visual):
+        if "shap_values" not in visual.metadata:
+            raise VisualDataMissing(self, "metadata")
+
+        return visual.metadata["shap_values"]
+
+    def _get_row_shap_values(self, algorithm, visual, input_data):
+        if input_data is None:
+            raise VisualDataMissing(self, "context")
+
+        explainer = self._get_explainer(algorithm, visual)
+        ds = create_input_dataset(input_data, algorithm.schema)
+
+        return explainer(ds.X)
+
+    def generate_metadata(self, algorithm, dataset, **kwargs):
+        background = self._create_background(dataset)
+        metadata = {"shap_background": background}
+
+        if self.scope == MODEL_SCOPE:
+            explainer = self._create_explainer(algorithm, background)
+            metadata["shap_values"] = explainer(dataset.X)
+
+        return metadata
+
+    def _new_shap_figure(self):
+        from matplotlib import pyplot as plot
+
+        return plot.figure(self.name, clear=True)
 
 class ShapBeeswarm(ShapExplainerMixin, FigureElement):
     scope = MODEL_SCOPE
@@ -40,18 +100,14 @@ class ShapBeeswarm(ShapExplainerMixin, FigureElement):
         from easul.algorithm import PredictiveAlgorithm
         return isinstance(algorithm, PredictiveAlgorithm)
 
-    def _create_figure(self, algorithm, input_data):
-        from matplotlib import pyplot as plot
-        fig = plot.figure(self.name, clear=True)
-
-        explainer = self._explainer
-
-        shap_values = explainer(algorithm.dataset.X)
-
+    def _create_figure(self, algorithm, visual, **kwargs):
         import shap
 
+        shap_values = self._get_model_shap_values(visual)
+        fig = self._new_shap_figure()
+
         shap.plots.beeswarm(shap_values, show=False)
-        return plot.gcf()
+        return fig
 
 class ShapWaterfall(ShapExplainerMixin, FigureElement):
     scope = ROW_SCOPE
@@ -62,23 +118,21 @@ class ShapWaterfall(ShapExplainerMixin, FigureElement):
         from easul.algorithm import PredictiveAlgorithm
         return isinstance(algorithm, PredictiveAlgorithm)
 
-    def _create_figure(self, algorithm, input_data):
-        from matplotlib import pyplot as plot
-        fig = plot.figure(self.name, clear=True)
-
-        explainer = self._explainer
-        ds = create_input_dataset(input_data, algorithm.schema)
+    def _create_figure(self, algorithm, visual, input_data=None, **kwargs):
+        import shap
 
-        shap_values = explainer(ds.X)
+        shap_values = self._get_row_shap_values(algorithm, visual, input_data)
+        fig = self._new_shap_figure()
 
         shap.plots.waterfall(shap_values[0], show=False)
-        return plot.gcf()
+        return fig
 
+@define(kw_only=True)
 class ShapPlot(ShapExplainerMixin, FigureElement):
     avail_settings = {
         "scope":{"type":"string","help":"Scope of data to use to produce plot - model (use all model data) or row (single set of values)","default":"input"}
     }
-    scope = EITHER_SCOPE
+    scope:str = field(default=EITHER_SCOPE)
     help = "Show SHAPley plot for either input data or model"
 
     @classmethod
@@ -86,19 +140,18 @@ class ShapPlot(ShapExplainerMixin, FigureElement):
         from easul.algorithm import PredictiveAlgorithm
         return isinstance(algorithm, PredictiveAlgorithm)
 
-    def _create_figure(self, algorithm, input_data):
-        from matplotlib import pyplot as plot
-        plot.figure(self.name, clear=True)
-        explainer = self._explainer
+    def _create_figure(self, algorithm, visual, input_data=None, **kwargs):
+        import shap
 
         if self.scope == MODEL_SCOPE:
-            shap_values = explainer(algorithm.dataset.X)
+            shap_values = self._get_model_shap_values(visual)
         else:
-            ds = create_input_dataset(input_data, algorithm.schema)
-            shap_values = explainer(ds.X)
+            shap_values = self._get_row_shap_values(algorithm, visual, input_data)
+
+        fig = self._new_shap_figure()
 
         shap.plots.bar(shap_values, show=False)
-        return plot.gcf()
+        return fig
 
 class LimeExplainerMixin(ExplainerMixin):
     explainer_type = "lime"
@@ -172,13 +225,22 @@ class LimeTablePlot(LimeExplainerMixin, Element):
         return isinstance(algorithm, PredictiveAlgorithm)
 
     def generate_context(self, algorithm, input_data, visual, **kwargs):
-        context = {}
-
         if not algorithm:
             raise VisualDataMissing(self, "algorithm")
 
         dset = algorithm.create_input_dataset(data=input_data)
 
+        return self._generate_contexts(algorithm, dset, visual)[0]
+
+    def generate_batch_context(self, algorithm, input_data, visual, **kwargs):
+        if not algorithm:
+            raise VisualDataMissing(self, "algorithm")
+
+        dset = create_input_dataset(input_data, algorithm.schema, allow_multiple=True, encoder=algorithm.encoder)
+
+        return self._generate_contexts(algorithm, dset, visual)
+
+    def _generate_contexts(self, algorithm, dset, visual):
         y_info = algorithm.schema.filter(include_x=False, include_y=True)
         y_details = list(y_info.values())[0]
 
@@ -187,16 +249,31 @@ class LimeTablePlot(LimeExplainerMixin, Element):
         if not "lime_explainer" in visual.metadata:
             raise VisualDataMissing(self,"metadata")
 
-        exp = visual.metadata["lime_explainer"].explain_instance(dset.X[0], predict_fn)
-
-        dm = exp.domain_mapper
+        explainer = visual.metadata["lime_explainer"]
+        X = dset.X
 
+        option_labels = None
         if y_details["type"] in LIST_TYPES:
             options = get_field_options_from_schema(algorithm.schema.y_names[0], algorithm.schema)
 
-            prediction = algorithm.model.predict(dset.X)
-            option_label = options[prediction[0]]
-            context["prediction_label"] = option_label
+            predictions = algorithm.model.predict(X)
+            option_labels = [options[prediction] for prediction in predictions]
+
+        contexts = []
+        for idx in range(X.shape[0]):
+            context = {}
+            exp = explainer.explain_instance(X[idx], predict_fn)
+
+            if option_labels:
+                context["prediction_label"] = option_labels[idx]
+
+            context["reasons"] = self._create_reasons(exp, dset.schema)
+            contexts.append({"lime_table_plot": context})
+
+        return contexts
+
+    def _create_reasons(self, exp, schema):
+        dm = exp.domain_mapper
 
         exp_list = exp.as_list()
         lime_values = sorted([abs(x[1]) for x in exp_list], reverse=True)
@@ -215,7 +292,7 @@ class LimeTablePlot(LimeExplainerMixin, Element):
                 lime_value_str = format(lime_value, ".2f")
 
             feature_name = re.sub("=+.", "", feature_name)
-            feature_info = dset.schema.get(feature_name, {})
+            feature_info = schema.get(feature_name, {})
             rng = get_range_from_discrete_name(disc_feat_name, feature_name)
             lime_abs = abs(lime_value)
             reason = {
@@ -229,9 +306,7 @@ class LimeTablePlot(LimeExplainerMixin, Element):
             }
             reasons.append(reason)
 
-        context["reasons"] = reasons
-
-        return {"lime_table_plot": context}
+        return reasons
 
     def _get_context(self, context, **kwargs):
         if not context:
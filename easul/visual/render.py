@@ -9,8 +9,53 @@ LOG = logging.getLogger(__name__)
 
 env = Environment(loader=loaders.ChoiceLoader([loaders.PackageLoader("easul","templates")]))
 
+_compiled_templates = {}
+
+def get_template(template_file):
+    """
+    Get compiled template. Templates are loaded and compiled once and then re-used, which avoids the environment
+    checking the package loader on each render.
+    Args:
+        template_file:
+
+    Returns:
+
+    """
+    template = _compiled_templates.get(template_file)
+
+    if template is None:
+        template = env.get_template(template_file)
+        _compiled_templates[template_file] = template
+
+    return template
+
+def precompile_templates():
+    """
+    Load and compile all of the element HTML templates so that rendering does not need to.
+    Returns:
+        list of template names
+    """
+    template_files = env.list_templates(extensions=["html"])
+
+    for template_file in template_files:
+        get_template(template_file)
+
+    return template_files
+
 def from_html_template(template_file, context):
-    return env.get_template(template_file).render(**context)
+    return get_template(template_file).render(**context)
+
+def iter_html_template(template_file, context):
+    """
+    Render template as a generator of HTML chunks.
+    Args:
+        template_file:
+        context:
+
+    Returns:
+
+    """
+    return get_template(template_file).generate(**context)
 
 
 class PlainRenderer:
@@ -30,17 +75,26 @@ class PlainRenderer:
         pass
 
     def create(self, visual, **kwargs):
-        rendered = self.setup_render()
+        data = "".join(self.iter_create(visual, **kwargs))
+        self.render(data)
+        return data
 
+    def iter_create(self, visual, **kwargs):
+        """
+        Render visual as a generator of HTML chunks so that large visuals can be streamed (e.g. to a HTTP response)
+        as each element is rendered.
+        Args:
+            visual:
+            **kwargs:
 
-        for element in visual.elements:
-            html = element.create(**kwargs, visual=visual)
-            rendered.append(html)
+        Returns:
 
-        final_list = list(map(str, rendered))
-        data = "".join(final_list)
-        self.render("".join(final_list))
-        return data
+        """
+        for setup in self.setup_render():
+            yield str(setup)
+
+        for element in visual.elements:
+            yield from element.iter_create(**kwargs, visual=visual)
 
 class JupyterRenderer(PlainRenderer):
     def setup_render(self):
@@ -1,4 +1,7 @@
+import hashlib
+import os
 from collections import UserDict
+from contextlib import contextmanager
 
 from attrs import define, field
 
@@ -11,29 +14,311 @@ from easul import util
 
 LOG = logging.getLogger(__name__)
 
+METADATA_VERSION_KEY = "__easul_metadata_version__"
+METADATA_MAGIC = b"EASULMD\x03"
+METADATA_BLOCK_ALIGNMENT = 64
+
+def get_value_digest(value):
+    """
+    Digest of a metadata value. Values which have not yet been loaded from a metadata file use the digest stored in
+    the file.
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if isinstance(value, StoredMetadataEntry):
+        return value.value_digest
+
+    return hashlib.sha256(util.to_serialized(value)).hexdigest()
+
+class StoredMetadataEntry:
+    """
+    Reference to a metadata value in a metadata file (accessed through a MetadataFileReader) which is loaded when
+    first accessed. NumPy arrays are memory mapped rather than read.
+    """
+    def __init__(self, reader, kind, offset, length, value_digest):
+        self.reader = reader
+        self.kind = kind
+        self.offset = offset
+        self.length = length
+        self.value_digest = value_digest
+
+    def load(self):
+        with self.reader.open_entry(self.offset) as infile:
+            infile.seek(self.offset)
+            block = infile.read(self.length)
+
+            if self.kind == "npy":
+                return self._load_array(block, infile)
+
+        return util.from_serialized(block)
+
+    def _load_array(self, block, infile):
+        import io
+        import numpy as np
+        from numpy.lib import format as npy_format
+
+        block_file = io.BytesIO(block)
+        version = npy_format.read_magic(block_file)
+        read_header = npy_format.read_array_header_1_0 if version == (1, 0) else npy_format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(block_file)
+
+        if int(np.prod(shape)) == 0:
+            block_file.seek(0)
+            return npy_format.read_array(block_file, allow_pickle=False)
+
+        return np.memmap(infile, dtype=dtype, mode="r", offset=self.offset + block_file.tell(), shape=shape,
+                         order="F" if fortran_order else "C")
+
+    def __reduce__(self):
+        # entries are loaded when serialized (e.g. to send metadata to another process)
+        return _loaded_value, (_unmapped_value(self.load()),)
+
+def _loaded_value(value):
+    return value
+
+def _unmapped_value(value):
+    # memory mapped arrays are copied into memory as they cannot be serialized
+    import numpy as np
+
+    if isinstance(value, np.memmap):
+        return np.array(value)
+
+    return value
+
+class MetadataFileReader:
+    """
+    Shared handle to a metadata file used to load its stored entries. The file is kept open (so entries can still be
+    loaded if the file is removed or replaced) until all of the entries have been loaded, close() is called or the
+    reader is garbage collected. Entries loaded after the file has been closed reopen it, as long as it has not been
+    replaced since the index was read.
+    """
+    def __init__(self, filename, file, offsets):
+        import threading
+        import weakref
+
+        self.filename = filename
+        self._file = file
+        self._signature = _get_file_signature(file)
+        self._pending = set(offsets)
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, file.close)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    @contextmanager
+    def open_entry(self, offset):
+        """
+        Context manager which provides the open file for reading the entry at the offset. The file is closed afterwards
+        if no other entries are still to be loaded.
+        Args:
+            offset:
+
+        Returns:
+
+        """
+        with self._lock:
+            if self._file.closed:
+                self._reopen()
+
+            try:
+                yield self._file
+            finally:
+                self._pending.discard(offset)
+                if not self._pending:
+                    self.close()
+
+    def close(self):
+        self._finalizer()
+
+    def _reopen(self):
+        import weakref
+
+        file = open(self.filename, "rb")
+        if _get_file_signature(file) != self._signature:
+            file.close()
+            raise SystemError(f"Metadata file '{self.filename}' has changed since it was loaded")
+
+        self._file = file
+        self._finalizer = weakref.finalize(self, file.close)
+
+def _get_file_signature(file):
+    stat = os.fstat(file.fileno())
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
 class Metadata(UserDict):
     def __init__(self, algorithm=None, visual=None):
         super().__init__({})
         self.visual = visual
         self.algorithm = algorithm
         self.init = False
+        self._digest = None
+        # element path -> digests of the element config, algorithm and dataset used to generate its metadata and
+        # the metadata keys it generated
+        self.provenance = {}
+
+    def __setitem__(self, key, value):
+        self._digest = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._digest = None
+        super().__delitem__(key)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+
+        if isinstance(value, StoredMetadataEntry):
+            value = value.load()
+            self.data[key] = value
+
+        return value
+
+    @property
+    def digest(self):
+        """
+        Digest of the metadata contents, calculated when first needed and used to identify rendered assets which
+        depend on it.
+        """
+        if self._digest is None:
+            hasher = hashlib.sha256()
+            for key in sorted(self.data.keys()):
+                hasher.update(str(key).encode("utf-8"))
+                hasher.update(get_value_digest(self.data[key]).encode("utf-8"))
+
+            self._digest = hasher.hexdigest()
+
+        return self._digest
+
+    def replace_data(self, data, provenance=None):
+        """
+        Replace the metadata (e.g. with stored or separately calculated metadata).
+        Args:
+            data:
+            provenance:
+
+        Returns:
+
+        """
+        self.data = data
+        self.provenance = provenance if provenance else {}
+        self.init = True
+        self._digest = None
 
     def calculate(self, dataset):
+        """
+        Calculate metadata for all elements in the visual.
+        """
+        self.provenance = {}
+        self.calculate_stale(dataset)
+
+    def calculate_stale(self, dataset):
+        """
+        Calculate metadata only for elements which have changed or whose metadata was generated from a different
+        algorithm or dataset. Metadata from elements no longer in the visual is removed.
+        Args:
+            dataset:
+
+        Returns:
+            list of paths of the elements whose metadata was calculated
+        """
         if not self.visual:
             raise AttributeError("Cannot calculate metadata as instance has not been called with Visual object")
 
-        metadata = {}
+        from easul.algorithm.predictive import PredictionContext
+
+        algorithm_digest = self.algorithm.unique_digest
+        dataset_fingerprint = get_dataset_fingerprint(dataset)
+        prediction_context = PredictionContext(self.algorithm, dataset)
 
-        for element in self.visual.elements:
-            element_metadata = element.generate_metadata(algorithm=self.algorithm, dataset=dataset)
+        provenance = {}
+        calculated = []
 
-            if element_metadata:
-                metadata.update(element_metadata)
+        for path, element in self.metadata_elements:
+            element_provenance = {
+                "element_digest": element.config_digest,
+                "algorithm_digest": algorithm_digest,
+                "dataset_fingerprint": dataset_fingerprint
+            }
 
-        metadata["algorithm_digest"] = self.algorithm.unique_digest
+            existing = self.provenance.get(path)
+            if self.init and existing and all([existing.get(k) == v for k, v in element_provenance.items()]):
+                provenance[path] = existing
+                continue
+
+            element_metadata = element.generate_metadata(algorithm=self.algorithm, dataset=dataset, prediction_context=prediction_context)
+            if not element_metadata:
+                element_metadata = {}
+
+            self.data.update(element_metadata)
+            element_provenance["keys"] = list(element_metadata.keys())
+            provenance[path] = element_provenance
+            calculated.append(path)
+
+        current_keys = set([key for item in provenance.values() for key in item["keys"]])
+        for path, existing in self.provenance.items():
+            if path in provenance:
+                continue
+
+            for key in existing["keys"]:
+                if key not in current_keys:
+                    self.data.pop(key, None)
 
+        self.data["algorithm_digest"] = algorithm_digest
+        self.provenance = provenance
         self.init = True
-        self.data.update(metadata)
+        self._digest = None
+
+        return calculated
+
+    @property
+    def metadata_elements(self):
+        """
+        List of (path, element) tuples for the elements in the visual which generate metadata. Containers are
+        included in the list themselves if they generate their own metadata, otherwise their child elements are.
+        Paths are based on the element class and configuration (not position) so that adding, removing or moving
+        elements does not change the paths of the other elements. Repeated identical elements are numbered.
+        """
+        from easul.visual.element import Container
+
+        elements = []
+        path_counts = {}
+
+        def _add_elements(element_list):
+            for element in element_list:
+                if isinstance(element, Container) and type(element).generate_metadata is Container.generate_metadata:
+                    _add_elements(element.elements)
+                    continue
+
+                path = f"{element.__class__.__name__}:{element.config_digest[:16]}"
+                path_counts[path] = path_counts.get(path, 0) + 1
+
+                if path_counts[path] > 1:
+                    path = f"{path}#{path_counts[path]}"
+
+                elements.append((path, element))
+
+        _add_elements(self.visual.elements)
+
+        return elements
+
+def get_dataset_fingerprint(dataset):
+    """
+    Fingerprint of the dataset used to calculate metadata (uses DataInput.fingerprint if available).
+    Args:
+        dataset:
+
+    Returns:
+
+    """
+    if hasattr(dataset, "fingerprint"):
+        return dataset.fingerprint
+
+    return hashlib.sha256(util.to_serialized(dataset)).hexdigest()
 
 
 @define(kw_only=True)
@@ -94,10 +379,52 @@ class Visual:
 
         return result
 
+    def generate_batch_context(self, input_data, **kwargs):
+        """
+        Generate contexts for multiple rows of input data (e.g. a list of dictionaries or a MultiDataInput). Elements
+        generate the contexts for all of the rows together where they support it.
+        Args:
+            input_data:
+            **kwargs:
+
+        Returns:
+            list containing a context for each row
+        """
+        from easul.data import create_input_dataset
+
+        schema = self.algorithm.schema if self.algorithm else None
+        dataset = create_input_dataset(input_data, schema, allow_multiple=True)
+
+        results = [{} for _ in range(dataset.data.shape[0])]
+
+        for element in self.flattened_elements:
+            if not hasattr(element, "generate_batch_context"):
+                continue
+
+            contexts = element.generate_batch_context(algorithm=self.algorithm, input_data=dataset, visual=self, **kwargs)
+
+            for result, ctx in zip(results, contexts):
+                if ctx:
+                    result.update(ctx)
+
+        return results
+
     def render(self, driver=None, step=None, steps=None, result=None, context=None, renderer=None, **kwargs):
         if not renderer:
             renderer = PlainRenderer()
 
+        return renderer.create(visual=self, **self._get_render_kwargs(driver, step, steps, result, context, **kwargs))
+
+    def iter_render(self, driver=None, step=None, steps=None, result=None, context=None, renderer=None, **kwargs):
+        """
+        Render visual as a generator of HTML chunks (e.g. to stream a large visual to a response).
+        """
+        if not renderer:
+            renderer = PlainRenderer()
+
+        return renderer.iter_create(visual=self, **self._get_render_kwargs(driver, step, steps, result, context, **kwargs))
+
+    def _get_render_kwargs(self, driver, step, steps, result, context, **kwargs):
         if step and hasattr(step,"run_logic"):
             try:
                 cl_step = driver._client.get_step(step.name, journey_id=driver.journey_id)
@@ -123,45 +450,178 @@ class Visual:
         if "algorithm" not in kwargs:
             kwargs["algorithm"] = algorithm
 
-        return renderer.create(visual=self, driver=driver, steps=steps, step=step, result=result, context=context,
-                              **kwargs)
+        return dict(driver=driver, steps=steps, step=step, result=result, context=context, **kwargs)
 
     @property
     def flattened_elements(self):
+        # not cached as nested containers can change (callers flatten once for each context/render)
         return Visual._get_nested_elements(self)
 
     @classmethod
     def _get_nested_elements(cls, element):
-        if hasattr(element, "elements") is False:
-            return [element]
-
         elements = []
+        pending = [element]
+
+        while pending:
+            current = pending.pop()
 
-        for sub_element in element.elements:
-            elements.extend(cls._get_nested_elements(sub_element))
+            if hasattr(current, "elements") is False:
+                elements.append(current)
+                continue
+
+            pending.extend(reversed(current.elements))
 
         return elements
 
 class FileMetadata(Metadata):
+    """
+    Metadata stored in a file. The file starts with a small JSON index of the entries followed by the entry blocks.
+    Simple values are stored in the index, NumPy arrays as .npy blocks (memory mapped when loaded) and other values
+    (e.g. explainers) as serialized blocks which are only loaded when first accessed. The file is kept open until all
+    of the entries have been loaded or close() is called (also called when used as a context manager).
+    """
     def __init__(self, filename, algorithm, *args, **kwargs):
         super().__init__(algorithm, *args, **kwargs)
         self.filename = filename
         self.loaded_from = None
+        self._reader = None
 
     def load(self):
-        with open(self.filename, "rb") as infile:
-            obj_data = infile.read()
+        import json
 
-        self.data = util.from_serialized(obj_data)
+        self.close()
 
-        LOG.debug(f"Loaded metadata from '{self.filename}'")
+        infile = open(self.filename, "rb")
+
+        try:
+            magic = infile.read(len(METADATA_MAGIC))
+
+            if magic != METADATA_MAGIC:
+                infile.seek(0)
+                obj_data = infile.read()
+                infile.close()
+                self._load_serialized(obj_data)
+                return
+
+            index_length = int.from_bytes(infile.read(8), "little")
+            index = json.loads(infile.read(index_length).decode("utf-8"))
+        except Exception:
+            infile.close()
+            raise
+
+        stored_entries = {key: entry for key, entry in index["entries"].items() if entry["kind"] != "value"}
+
+        if stored_entries:
+            self._reader = MetadataFileReader(self.filename, infile, [index["data_offset"] + entry["offset"]
+                                                                      for entry in stored_entries.values()])
+        else:
+            infile.close()
+
+        data = {}
+        for key, entry in index["entries"].items():
+            if key in stored_entries:
+                data[key] = StoredMetadataEntry(self._reader, entry["kind"], index["data_offset"] + entry["offset"],
+                                                entry["length"], entry["digest"])
+            else:
+                data[key] = entry["value"]
+
+        self.replace_data(data, index["provenance"])
+
+        LOG.debug(f"Loaded metadata index from '{self.filename}'")
+
+        self.loaded_from = self.filename
+
+    def close(self):
+        """
+        Close the metadata file. Entries which have not been loaded yet reopen it when accessed.
+        """
+        if self._reader is not None:
+            self._reader.close()
+
+    def __getstate__(self):
+        # stored entries are loaded when serialized so the file is not needed
+        state = self.__dict__.copy()
+        state["_reader"] = None
+        state["data"] = {key: _unmapped_value(value) for key, value in self.data.items()}
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load_serialized(self, obj_data):
+        stored = util.from_serialized(obj_data)
+
+        # metadata stored before provenance was recorded only contains the metadata itself
+        if isinstance(stored, dict) and stored.get(METADATA_VERSION_KEY) == 2:
+            self.replace_data(stored["data"], stored["provenance"])
+        else:
+            self.replace_data(stored)
+
+        LOG.debug(f"Loaded serialized metadata from '{self.filename}'")
 
-        self.init = True
         self.loaded_from = self.filename
 
     def save(self):
         if self.init is False:
             raise ValueError("Not initialised, you must load or calculate metadata to save it")
 
-        with open(self.filename, "wb") as outfile:
-            outfile.write(util.to_serialized(self.data))
+        import io
+        import json
+        import numpy as np
+        from numpy.lib import format as npy_format
+
+        entries = {}
+        blocks = io.BytesIO()
+
+        for key in list(self.data.keys()):
+            value = self[key]
+
+            if value is None or isinstance(value, (bool, int, float, str)):
+                entries[key] = {"kind": "value", "value": value}
+                continue
+
+            offset = _pad_to_alignment(blocks)
+
+            if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+                npy_format.write_array(blocks, np.asarray(value), allow_pickle=False)
+                kind = "npy"
+            else:
+                blocks.write(util.to_serialized(value))
+                kind = "dill"
+
+            entries[key] = {"kind": kind, "offset": offset, "length": blocks.tell() - offset,
+                            "digest": get_value_digest(value)}
+
+        index = {"entries": entries, "provenance": self.provenance, "data_offset": 0}
+
+        # the data offset is part of the index so repeat until it allows for its own length
+        while True:
+            index_bytes = json.dumps(index).encode("utf-8")
+            header_length = len(METADATA_MAGIC) + 8 + len(index_bytes)
+            data_offset = header_length + (-header_length % METADATA_BLOCK_ALIGNMENT)
+
+            if data_offset == index["data_offset"]:
+                break
+
+            index["data_offset"] = data_offset
+
+        # written to a new file and then renamed as loaded arrays may be memory mapped from the existing file
+        temp_filename = f"{self.filename}.{os.getpid()}.tmp"
+
+        with open(temp_filename, "wb") as outfile:
+            outfile.write(METADATA_MAGIC)
+            outfile.write(len(index_bytes).to_bytes(8, "little"))
+            outfile.write(index_bytes)
+            outfile.write(b"\0" * (data_offset - header_length))
+            outfile.write(blocks.getvalue())
+
+        os.replace(temp_filename, self.filename)
+
+def _pad_to_alignment(buffer):
+    padding = -buffer.tell() % METADATA_BLOCK_ALIGNMENT
+    buffer.write(b"\0" * padding)
+
+    return buffer.tell()
@@ -33,12 +33,45 @@ def regenerate_test_models():
     generate_test_models()
 
 @app.command(help="Run EASUL engine according to provided configuration")
-def run_engine(plan_module:str, engine_module:str):
+def run_engine(plan_module:str, engine_module:str,
+               profile:str=typer.Option(None, help="Profile steps run by the engine ('deterministic' writes pstats files per step, 'sampling' writes a speedscope JSON file)"),
+               profile_steps:str=typer.Option(None, help="Comma-separated names of steps to profile (default is all steps)"),
+               profile_references:str=typer.Option(None, help="Comma-separated journey references to profile (default is all journeys)"),
+               profile_dir:str=typer.Option("profiles", help="Directory to write profiles to"),
+               profile_interval:float=typer.Option(0.001, help="Sampling interval in seconds"),
+               metrics_path:str=typer.Option(None, help="Record step metrics and write them to this file in the Prometheus text format (e.g. for the node exporter textfile collector)"),
+               metrics_interval:float=typer.Option(None, help="Seconds between writes of the metrics file while the engine is running (default is only at the end)")):
+    from contextlib import ExitStack
     from easul.util import create_package_class
     plan = create_package_class(plan_module)()
     engine = create_package_class(engine_module)()
 
-    engine.run(plan)
+    with ExitStack() as stack:
+        if metrics_path:
+            from easul.metrics import export_metrics
+            stack.enter_context(export_metrics(metrics_path, interval=metrics_interval))
+
+        if profile:
+            from easul.profiling import StepProfiler, set_profiler
+
+            profiler = StepProfiler(mode=profile, steps=profile_steps.split(",") if profile_steps else None,
+                                    references=profile_references.split(",") if profile_references else None,
+                                    directory=profile_dir, interval=profile_interval)
+            set_profiler(profiler)
+            stack.callback(profiler.write)
+            stack.callback(set_profiler, None)
+
+        engine.run(plan)
+
+@app.command(help="Run EASUL benchmarks (plan runs, engine replay, clients, codecs and visual rendering) and output the results as JSON")
+def benchmark(output:str=typer.Option(None, help="File to write JSON results to (default is stdout)"),
+              sizes:str=typer.Option("1000,10000,100000", help="Comma-separated synthetic cohort sizes for engine replay"),
+              repeat:int=typer.Option(20, help="Repeats for single journey, codec and render benchmarks"),
+              count:int=typer.Option(1000, help="Number of journeys written to each client")):
+    from easul.benchmark import run_benchmarks, write_benchmarks
+
+    results = run_benchmarks(sizes=[int(size) for size in sizes.split(",")], repeat=repeat, count=count)
+    write_benchmarks(results, output)
 
 @app.command(help="Monitor EASUL broker for supplied plan/engine")
 def monitor_broker(plan_module:str, engine_module:str):